@@ -0,0 +1,47 @@
+"""Compare per-box and vectorized coordinate conversion.
+
+'loop' and 'batch' start from and return the list-of-tuples results, 'array'
+converts boxes that are already in an (N, 4) array, e.g. OCRResult.bboxes.
+
+    python benchmarks/bench_coordinates.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from ocrmac.coordinates import (  # noqa: E402
+    convert_coordinates_pil,
+    convert_coordinates_pil_batch,
+    convert_coordinates_pyplot,
+    convert_coordinates_pyplot_batch,
+)
+
+
+def bench(func, number=3):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    print(f"{'boxes':>8}  {'conversion':<10}{'loop ms':>10}{'batch ms':>10}{'array ms':>10}")
+    for n in (10_000, 100_000):
+        bboxes = np.random.default_rng(0).uniform(0, 0.5, (n, 4))
+        results = [("text", 1.0, bbox) for bbox in bboxes.tolist()]
+        for name, scalar, batch in (
+            ("pil", convert_coordinates_pil, convert_coordinates_pil_batch),
+            ("pyplot", convert_coordinates_pyplot, convert_coordinates_pyplot_batch),
+        ):
+            loop = bench(lambda: [(t, c, scalar(b, 1920, 1080)) for t, c, b in results])
+            vectorized = bench(
+                lambda: list(zip(results, batch([b for _, _, b in results], 1920, 1080).tolist()))
+            )
+            array = bench(lambda: batch(bboxes, 1920, 1080))
+            print(f"{n:>8}  {name:<10}{loop * 1000:>10.1f}{vectorized * 1000:>10.1f}{array * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare the cost of preparing image data for the engine.
+
+Runs without the Apple frameworks:
+
+    python benchmarks/bench_encode.py [image ...]
+"""
+import os
+import sys
+import timeit
+
+from PIL import Image
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from ocrmac.images import image2buf, pil2buf  # noqa: E402
+
+DEFAULT_IMAGES = [
+    os.path.join(HERE, "..", "test.png"),
+    os.path.join(HERE, "..", "wikipedia_test.png"),
+]
+
+
+def bench(func, number=5):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main(paths):
+    print(f"{'image':<24}{'path':<18}{'ms':>10}{'bytes':>12}")
+    for path in paths:
+        image = Image.open(path)
+        image.load()
+        with open(path, "rb") as f:
+            data = f.read()
+
+        cases = {
+            "pil2buf (PNG)": lambda: pil2buf(image),
+            "raw bitmap": lambda: pil2buf(image, raw=True),
+            "file bytes": lambda: image2buf(path),
+            "bytes": lambda: image2buf(data),
+        }
+        name = os.path.basename(path)
+        for label, func in cases.items():
+            seconds = bench(func)
+            print(f"{name:<24}{label:<18}{seconds * 1000:>10.2f}{len(func()):>12}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_IMAGES)
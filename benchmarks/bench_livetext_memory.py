@@ -0,0 +1,59 @@
+"""Peak memory of preparing the LiveText input, measured with tracemalloc.
+
+Covers the encoding half that runs without the Apple frameworks. The copy
+that NSData.dataWithBytes_length_ used to make is modelled with a bytearray.
+
+    python benchmarks/bench_livetext_memory.py [image ...]
+"""
+import io
+import os
+import sys
+import tracemalloc
+
+from PIL import Image
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from ocrmac.images import image2buf  # noqa: E402
+
+DEFAULT_IMAGES = [
+    os.path.join(HERE, "..", "test.png"),
+    os.path.join(HERE, "..", "wikipedia_test.png"),
+]
+
+
+def previous_pil2nsimage(pil_image):
+    """The input path of livetext_from_image before it was reworked"""
+    image_bytes = io.BytesIO()
+    pil_image.save(image_bytes, format="TIFF")
+    data, length = image_bytes.getvalue(), len(image_bytes.getvalue())
+    return bytearray(data[:length])
+
+
+def peak(func, *args):
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(paths):
+    print(f"{'image':<24}{'input':<22}{'peak MB':>10}")
+    for path in paths:
+        image = Image.open(path)
+        image.load()
+        name = os.path.basename(path)
+        cases = {
+            "PIL, previous": (previous_pil2nsimage, image),
+            "PIL, raw bitmap": (image2buf, image),
+            "path, file bytes": (image2buf, path),
+        }
+        for label, (func, arg) in cases.items():
+            print(f"{name:<24}{label:<22}{peak(func, arg) / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_IMAGES)
@@ -0,0 +1,68 @@
+"""Measure how preprocessing reduces the cost of handing an image to the engine.
+
+The engines get the raw bitmap from `image2buf`. "handoff" times that conversion
+and "pipeline" the whole `Preprocessor.recognize` call with the stub engine, which
+builds the same bitmap.
+
+Runs without the Apple frameworks:
+
+    python benchmarks/bench_preprocess.py [image ...]
+"""
+import os
+import sys
+import timeit
+
+from PIL import Image
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from ocrmac.engines import StubEngine  # noqa: E402
+from ocrmac.images import image2buf  # noqa: E402
+from ocrmac.preprocess import Preprocessor  # noqa: E402
+
+DEFAULT_IMAGES = [
+    os.path.join(HERE, "..", "test.png"),
+    os.path.join(HERE, "..", "wikipedia_test.png"),
+]
+
+CASES = {
+    "none": None,
+    "grayscale": Preprocessor(grayscale=True),
+    "autocrop": Preprocessor(autocrop=True),
+    "max_size=1024": Preprocessor(max_size=1024),
+    "max_size=512": Preprocessor(max_size=512),
+    "all": Preprocessor(max_size=1024, grayscale=True, autocrop=True),
+}
+
+
+def bench(func, number=5):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main(paths):
+    engine = StubEngine(density=0.0)  # no synthetic results, only the handoff
+    print(f"{'image':<24}{'preprocess':<16}{'size':>12}{'prep ms':>10}{'handoff ms':>12}{'pipeline ms':>13}{'bytes':>12}")
+    for path in paths:
+        image = Image.open(path)
+        image.load()
+        name = os.path.basename(path)
+
+        for label, preprocess in CASES.items():
+            if preprocess is None:
+                processed, prep = image, 0.0
+                pipeline = bench(lambda: engine.recognize(image))
+            else:
+                processed, _ = preprocess(image)
+                prep = bench(lambda: preprocess(image))
+                pipeline = bench(lambda: preprocess.recognize(image, engine.recognize))
+            handoff = bench(lambda: image2buf(processed))
+            size = f"{processed.width}x{processed.height}"
+            print(
+                f"{name:<24}{label:<16}{size:>12}{prep * 1000:>10.2f}{handoff * 1000:>12.2f}"
+                f"{pipeline * 1000:>13.2f}{len(image2buf(processed)):>12}"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_IMAGES)
@@ -0,0 +1,81 @@
+"""Shared fixtures of the pytest-benchmark suite.
+
+Run with the stub engine (works everywhere) or the real frameworks (macOS)::
+
+    python -m pytest benchmarks --benchmark-json=benchmark.json
+    python -m pytest benchmarks --ocr-engine=vision --benchmark-json=benchmark.json
+
+Compare runs with `pytest-benchmark compare`.
+"""
+import os
+import random
+import sys
+
+import pytest
+from PIL import Image, ImageDraw
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from ocrmac.engines import create_engine, engine_names  # noqa: E402
+
+SIZES = {
+    "small": (640, 480),
+    "hd": (1920, 1080),
+    "4k": (3840, 2160),
+}
+# Fraction of the text lines of an image that are filled with words
+DENSITIES = {"sparse": 0.1, "dense": 0.9}
+LINE_HEIGHT = 16
+WORD_WIDTH = 60
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--ocr-engine",
+        choices=engine_names(),
+        default="stub",
+        help="Registered engine for the end-to-end benchmarks, vision and livetext need macOS.",
+    )
+
+
+def synthetic_image(width, height, density, seed=0, mode="RGB"):
+    """White image with black pseudo-words on `density` of the lines, deterministic for a seed"""
+    rng = random.Random(seed)
+    image = Image.new(mode, (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for top in range(4, height - LINE_HEIGHT, LINE_HEIGHT):
+        if rng.random() >= density:
+            continue
+        left = 4
+        while left + WORD_WIDTH < width:
+            word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 8)))
+            draw.text((left, top), word, fill="black")
+            left += WORD_WIDTH
+    return image
+
+
+def synthetic_results(count, seed=0):
+    """`count` detections in the format of `ocrmac.text_from_image`, deterministic for a seed"""
+    rng = random.Random(seed)
+    results = []
+    for i in range(count):
+        x, y = rng.random() * 0.9, rng.random() * 0.95
+        results.append((f"word{i}", rng.random(), [x, y, rng.random() * 0.1, rng.random() * 0.05]))
+    return results
+
+
+@pytest.fixture(scope="session")
+def images():
+    """Synthetic images keyed by (size, density)"""
+    return {
+        (size, density): synthetic_image(width, height, fraction)
+        for size, (width, height) in SIZES.items()
+        for density, fraction in DENSITIES.items()
+    }
+
+
+@pytest.fixture(scope="session")
+def ocr_engine(request):
+    """Engine selected with --ocr-engine"""
+    return create_engine(request.config.getoption("--ocr-engine"))
@@ -0,0 +1,28 @@
+"""Preparing image data for the frameworks."""
+import pytest
+
+from conftest import DENSITIES, SIZES, synthetic_image
+from ocrmac.images import image2buf, pil2buf
+
+CASES = [(size, density) for size in SIZES for density in DENSITIES]
+
+
+@pytest.mark.parametrize("size, density", CASES)
+def test_pil2buf_png(benchmark, images, size, density):
+    benchmark.group = f"encode {size}"
+    benchmark(pil2buf, images[size, density])
+
+
+@pytest.mark.parametrize("size, density", CASES)
+def test_pil2buf_raw(benchmark, images, size, density):
+    benchmark.group = f"encode {size}"
+    benchmark(pil2buf, images[size, density], raw=True)
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA"])
+@pytest.mark.parametrize("size", list(SIZES))
+def test_livetext_input(benchmark, size, mode):
+    """The data handed to NSImage for LiveText, BMP for RGB and TIFF for RGBA"""
+    benchmark.group = f"livetext input {size}"
+    image = synthetic_image(*SIZES[size], DENSITIES["dense"], mode=mode)
+    benchmark(image2buf, image)
@@ -0,0 +1,32 @@
+"""Incremental OCR of a screen recording, see `ocrmac.frames`."""
+import pytest
+from PIL import ImageDraw
+
+from ocrmac import frames
+
+FRAMES = 30
+
+
+@pytest.fixture(scope="module")
+def recording(images):
+    """A dense HD frame with a blinking cursor and a counter that changes every 10 frames"""
+    base = images["hd", "dense"]
+    stream = []
+    for index in range(FRAMES):
+        frame = base.copy()
+        draw = ImageDraw.Draw(frame)
+        if index % 2:
+            draw.rectangle((900, 500, 902, 516), fill="black")
+        draw.text((1800, 1050), str(index // 10), fill="black")
+        stream.append(frame)
+    return stream
+
+
+def test_frames_full(benchmark, recording, ocr_engine):
+    benchmark.group = "frames"
+    benchmark(lambda: [ocr_engine.recognize(frame) for frame in recording])
+
+
+def test_frames_incremental(benchmark, recording, ocr_engine):
+    benchmark.group = "frames"
+    benchmark(lambda: list(frames.ocr_frames(recording, engine=ocr_engine)))
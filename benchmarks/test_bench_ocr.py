@@ -0,0 +1,55 @@
+"""End-to-end OCR and annotation, with the engine selected by --ocr-engine."""
+import pytest
+
+from conftest import DENSITIES, SIZES, synthetic_results
+
+ocrmac = pytest.importorskip("ocrmac.ocrmac", reason="ocrmac.ocrmac needs the Apple frameworks.")
+
+CASES = [(size, density) for size in SIZES for density in DENSITIES]
+
+
+@pytest.mark.parametrize("size, density", CASES)
+def test_recognize(benchmark, images, ocr_engine, size, density):
+    benchmark.group = f"recognize {size}"
+    image = images[size, density]
+    benchmark(lambda: ocrmac.OCR(image, engine=ocr_engine).recognize())
+
+
+@pytest.mark.parametrize("size, density", CASES)
+def test_recognize_px(benchmark, images, ocr_engine, size, density):
+    benchmark.group = f"recognize {size}"
+    image = images[size, density]
+    benchmark(lambda: ocrmac.OCR(image, engine=ocr_engine).recognize(px=True))
+
+
+@pytest.mark.parametrize("count", [100, 1000])
+def test_annotate_pil(benchmark, images, count):
+    benchmark.group = "annotate"
+    ocr = ocrmac.OCR(images["hd", "dense"])
+    ocr.res = synthetic_results(count)
+    benchmark(ocr.annotate_PIL)
+
+
+@pytest.mark.parametrize("count", [100, 1000])
+def test_annotate_pil_preview(benchmark, images, count):
+    benchmark.group = "annotate"
+    ocr = ocrmac.OCR(images["4k", "dense"])
+    ocr.res = synthetic_results(count)
+    benchmark(ocr.annotate_PIL, max_size=512)
+
+
+@pytest.mark.parametrize("texts", [False, True])
+@pytest.mark.parametrize("count", [1000, 10000])
+def test_annotate_png(benchmark, images, count, texts):
+    pytest.importorskip("matplotlib")
+    benchmark.group = f"annotate png {count}"
+    ocr = ocrmac.OCR(images["hd", "dense"])
+    ocr.res = synthetic_results(count)
+    benchmark.pedantic(ocr.annotate_png, kwargs=dict(figsize=(19.2, 10.8), texts=texts), rounds=3)
+
+
+@pytest.mark.parametrize("framework", ["vision", "livetext"])
+def test_ocr_init(benchmark, images, framework):
+    benchmark.group = "init"
+    image = images["small", "sparse"]
+    benchmark(ocrmac.OCR, image, framework=framework)
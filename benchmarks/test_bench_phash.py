@@ -0,0 +1,54 @@
+"""Perceptual hashing and the near-duplicate search structures, see `ocrmac.phash`."""
+import random
+
+import pytest
+
+from ocrmac import phash
+
+COUNTS = [100_000, 1_000_000]
+QUERIES = 200
+MAX_DISTANCE = 4
+
+STRUCTURES = {
+    "bktree": phash.BKTree,
+    "multi_index": lambda: phash.MultiIndexHash(64, MAX_DISTANCE),
+}
+
+
+def random_hashes(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(count)]
+
+
+def build(structure, hashes):
+    index = STRUCTURES[structure]()
+    for value, hash in enumerate(hashes):
+        index.add(hash, value)
+    return index
+
+
+@pytest.mark.parametrize("size", ["small", "hd", "4k"])
+def test_dhash(benchmark, images, size):
+    benchmark.group = "dhash"
+    benchmark(phash.dhash, images[size, "dense"])
+
+
+@pytest.mark.parametrize("count", COUNTS)
+@pytest.mark.parametrize("structure", STRUCTURES)
+def test_index_build(benchmark, structure, count):
+    benchmark.group = f"index {count} hashes"
+    hashes = random_hashes(count)
+    benchmark.pedantic(build, args=(structure, hashes), rounds=1)
+
+
+@pytest.mark.parametrize("structure", STRUCTURES)
+def test_index_query(benchmark, structure):
+    """QUERIES lookups within MAX_DISTANCE in an index of 1M hashes, half of them near-duplicates"""
+    benchmark.group = f"query {COUNTS[-1]} hashes"
+    hashes = random_hashes(COUNTS[-1])
+    index = build(structure, hashes)
+    rng = random.Random(1)
+    queries = [hashes[rng.randrange(len(hashes))] ^ (1 << rng.randrange(64)) for _ in range(QUERIES // 2)]
+    queries += random_hashes(QUERIES // 2, seed=2)
+
+    benchmark.pedantic(lambda: [index.search(query, MAX_DISTANCE) for query in queries], rounds=1)
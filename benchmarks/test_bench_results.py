@@ -0,0 +1,40 @@
+"""Converting and constructing results."""
+import pytest
+
+from conftest import synthetic_results
+from ocrmac.coordinates import convert_coordinates_pil_batch, convert_coordinates_pyplot_batch
+from ocrmac.result import OCRResult
+
+COUNTS = [100, 10_000]
+
+
+@pytest.mark.parametrize("count", COUNTS)
+def test_convert_pil(benchmark, count):
+    benchmark.group = f"coordinates {count}"
+    bboxes = [bbox for _, _, bbox in synthetic_results(count)]
+    benchmark(convert_coordinates_pil_batch, bboxes, 1920, 1080)
+
+
+@pytest.mark.parametrize("count", COUNTS)
+def test_convert_pyplot(benchmark, count):
+    benchmark.group = f"coordinates {count}"
+    bboxes = [bbox for _, _, bbox in synthetic_results(count)]
+    benchmark(convert_coordinates_pyplot_batch, bboxes, 1920, 1080)
+
+
+@pytest.mark.parametrize("count", COUNTS)
+def test_result_from_list(benchmark, count):
+    benchmark.group = f"results {count}"
+    benchmark(OCRResult.from_list, synthetic_results(count))
+
+
+@pytest.mark.parametrize("count", COUNTS)
+def test_result_to_list(benchmark, count):
+    benchmark.group = f"results {count}"
+    benchmark(OCRResult.from_list(synthetic_results(count)).to_list)
+
+
+@pytest.mark.parametrize("count", COUNTS)
+def test_result_to_pixels(benchmark, count):
+    benchmark.group = f"results {count}"
+    benchmark(OCRResult.from_list(synthetic_results(count)).to_pixels, 1920, 1080)
@@ -0,0 +1,59 @@
+"""Bridge from completion-handler based analyzers to asyncio."""
+
+import asyncio
+
+
+async def analyze(analyzer, request, timeout=10.0, pump=None, poll_interval=0.005):
+    """
+    Await the completion handler of an analyzer without blocking the event loop.
+
+    Calls `analyzer.processRequest_progressHandler_completionHandler_` (the
+    VKCImageAnalyzer interface) and resolves a future once the completion handler
+    fires. The handler may be called from any thread.
+
+    :param analyzer: Object implementing `processRequest_progressHandler_completionHandler_`.
+    :param request: Request passed to the analyzer.
+    :param timeout: Seconds to wait for the completion handler, None waits forever.
+        Defaults to 10.0.
+    :param pump: Callable that is called repeatedly while waiting, e.g. to run one
+        iteration of the CFRunLoop that delivers the completion handler. Defaults to None.
+    :param poll_interval: Seconds between two calls of `pump`. Defaults to 0.005.
+
+    :returns: The analysis passed to the completion handler.
+    :raises RuntimeError: If the completion handler reports an error.
+    :raises asyncio.TimeoutError: If the handler is not called within `timeout`.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(analysis, error):
+        if future.done():
+            return
+        if error:
+            future.set_exception(RuntimeError("Error during analysis: " + str(error)))
+        else:
+            future.set_result(analysis)
+
+    def completion_handler(analysis, error):
+        try:
+            loop.call_soon_threadsafe(settle, analysis, error)
+        except RuntimeError:
+            pass  # loop already closed, nobody is waiting anymore
+
+    async def wait():
+        if pump is None:
+            return await future
+        while not future.done():
+            pump()
+            await asyncio.wait([future], timeout=poll_interval)
+        return future.result()
+
+    analyzer.processRequest_progressHandler_completionHandler_(
+        request, lambda progress: None, completion_handler
+    )
+
+    try:
+        return await asyncio.wait_for(wait(), timeout)
+    finally:
+        if not future.done():
+            future.cancel()
@@ -0,0 +1,182 @@
+"""Drawing OCR results onto images with PIL or matplotlib.
+
+Matplotlib is imported on first use, it is an optional dependency.
+"""
+
+import functools
+import io
+import math
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from .coordinates import convert_coordinates_pil_batch, convert_coordinates_pyplot_batch
+from .images import normalize_image
+
+DEFAULT_FONT = "Arial Unicode.ttf"
+
+
+@functools.lru_cache(maxsize=32)
+def load_font(path=DEFAULT_FONT, size=12, fallback=None):
+    """
+    Load a TrueType font once per (path, size).
+
+    :param path: Font file or name of an installed font. Defaults to 'Arial Unicode.ttf',
+        which ships with macOS.
+    :param size: Font size. Defaults to 12.
+    :param fallback: Font tried if `path` can't be loaded. Defaults to None, which
+        uses the font bundled with Pillow.
+    """
+    for candidate in (path, fallback):
+        if candidate is None:
+            continue
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            pass
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()  # Pillow < 10.1 has no scalable default font
+
+
+def preview_image(image, max_size):
+    """
+    Downscaled copy of an image input for previews.
+
+    For files and bytes the full-resolution image is not kept in memory, JPEGs are
+    decoded at reduced size directly.
+
+    :param image: Image input, see `ocrmac.text_from_image`.
+    :param max_size: Maximum length of the long edge in pixels.
+    """
+    image = normalize_image(image)
+    if not isinstance(image, Image.Image):
+        with Image.open(io.BytesIO(image) if isinstance(image, bytes) else image) as opened:
+            opened.draft("RGB", (max_size, max_size))
+            opened.load()
+        opened.thumbnail((max_size, max_size))
+        return opened
+
+    scale = max_size / max(image.size)
+    if scale >= 1:
+        return image.copy()
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.BICUBIC, reducing_gap=3.0)
+
+
+def annotate_image(image, results, color="red", fontsize=12, font=DEFAULT_FONT, fallback_font=None):
+    """
+    Draw boxes and texts onto an image, in place.
+
+    :param image: PIL image.
+    :param results: List of (text, confidence, [x, y, w, h]) as returned by `ocrmac.text_from_image`.
+    :param color: Color of boxes and texts. Defaults to 'red'.
+    :param fontsize: Font size. Defaults to 12.
+    :param font: Font path or name, see `load_font`. Defaults to 'Arial Unicode.ttf'.
+    :param fallback_font: Font used if `font` is not available, see `load_font`. Defaults to None.
+
+    :returns: The image.
+    """
+    if not results:
+        return image
+
+    draw = ImageDraw.Draw(image)
+    font = load_font(font, fontsize, fallback_font)
+    boxes = convert_coordinates_pil_batch([bbox for _, _, bbox in results], image.width, image.height).tolist()
+
+    for (x1, y1, x2, y2) in boxes:
+        draw.rectangle((x1, y1, x2, y2), outline=color)
+    for (text, _, _), (x1, _, _, y2) in zip(results, boxes):
+        draw.text((x1, y2), text, font=font, align="left", fill=color)
+    return image
+
+
+def contact_sheet(ocrs, columns=4, tile_size=256, color="red", fontsize=10, background="white", padding=4, **kwargs):
+    """
+    Render the annotated previews of many OCR objects into one image.
+
+    :param ocrs: Iterable of `ocrmac.OCR` objects, recognized on demand.
+    :param columns: Number of previews per row. Defaults to 4.
+    :param tile_size: Long edge of each preview in pixels. Defaults to 256.
+    :param color: Color of boxes and texts. Defaults to 'red'.
+    :param fontsize: Font size. Defaults to 10.
+    :param background: Color between the previews. Defaults to 'white'.
+    :param padding: Pixels between the previews. Defaults to 4.
+    :param kwargs: Further arguments of `annotate_image`, e.g. font.
+
+    :returns: PIL image with the previews row by row, each centered in its cell.
+    """
+    previews = [ocr.annotate_PIL(color=color, fontsize=fontsize, max_size=tile_size, **kwargs) for ocr in ocrs]
+    if not previews:
+        raise ValueError("Please pass at least one OCR object.")
+
+    columns = min(columns, len(previews))
+    rows = math.ceil(len(previews) / columns)
+    cell = tile_size + padding
+    sheet = Image.new("RGB", (columns * cell + padding, rows * cell + padding), background)
+
+    for index, preview in enumerate(previews):
+        row, column = divmod(index, columns)
+        left = padding + column * cell + (tile_size - preview.width) // 2
+        top = padding + row * cell + (tile_size - preview.height) // 2
+        sheet.paste(preview.convert("RGB"), (left, top))
+    return sheet
+
+
+def annotate_figure(image, results, figsize=(20, 20), color="red", alpha=0.5, fontsize=12, texts=True, figure=None):
+    """
+    Draw an image with boxes and texts into a matplotlib figure, without pyplot.
+
+    The boxes are added as one LineCollection instead of one patch per box. The
+    figure is not registered with pyplot, so it is garbage collected like any other
+    object once it is no longer referenced.
+
+    :param image: PIL image.
+    :param results: List of (text, confidence, [x, y, w, h]) as returned by `ocrmac.text_from_image`.
+    :param figsize: Figure size in inches. Defaults to (20, 20).
+    :param color: Color of boxes and texts. Defaults to 'red'.
+    :param alpha: Opacity of the image. Defaults to 0.5.
+    :param fontsize: Font size. Defaults to 12.
+    :param texts: Draw the texts. Each text is its own artist, so leaving them out is
+        much faster for thousands of boxes. Defaults to True.
+    :param figure: Figure to draw into, e.g. one created with pyplot. Defaults to None,
+        which creates a new figure with an Agg canvas.
+
+    :returns: The figure.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+
+    if figure is None:
+        figure = Figure(figsize=figsize)
+        FigureCanvasAgg(figure)
+
+    ax = figure.subplots()
+    ax.imshow(image, alpha=alpha)
+    if not results:
+        return figure
+
+    # Pyplot coordinates are (x, y, width, height) with y at the lower edge and a negative height
+    x1, y1, width, height = convert_coordinates_pyplot_batch([bbox for _, _, bbox in results], image.width, image.height).T
+    x2, y2 = x1 + width, y1 + height
+    segments = np.stack([np.stack(corner, axis=1) for corner in ((x1, y1), (x2, y1), (x2, y2), (x1, y2), (x1, y1))], axis=1)
+    ax.add_collection(LineCollection(segments, colors=color, linewidths=1), autolim=False)
+
+    if texts:
+        for (text, _, _), x, y in zip(results, x1.tolist(), y1.tolist()):
+            ax.text(x, y, text, fontsize=fontsize, color=color)
+    return figure
+
+
+def figure_to_png(figure, dpi=None):
+    """
+    Render a figure to PNG bytes with the Agg renderer.
+
+    :param figure: Matplotlib figure.
+    :param dpi: Resolution in dots per inch. Defaults to None, the figure's resolution.
+    """
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=dpi if dpi is not None else "figure")
+    return buffer.getvalue()
@@ -0,0 +1,179 @@
+"""Content-addressed cache for OCR results."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+
+from PIL import Image
+
+from .images import normalize_image
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "disk_hits", "evictions", "entries", "size"])
+
+
+def cache_key(image, **options) -> str:
+    """
+    Get the cache key for an image and the options it is recognized with.
+
+    The key is the SHA-256 of the encoded image data (the file content for paths)
+    and of the options, so identical images share a key independent of their name.
+    PIL images are hashed by mode, size and pixel data.
+    """
+    image = normalize_image(image)
+    digest = hashlib.sha256()
+
+    if isinstance(image, str):
+        with open(image, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    elif isinstance(image, Image.Image):
+        digest.update(f"{image.mode}:{image.size}".encode())
+        digest.update(image.tobytes())
+    else:
+        digest.update(image)
+
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def keyed_input(image, **options):
+    """
+    Prepare an image input for recognition and get its cache key.
+
+    Paths are read once and returned as bytes, so the file is not read again for
+    the recognition. All callers of a cache must build their keys this way.
+
+    :returns: Tuple of the image and its key.
+    """
+    image = normalize_image(image)
+    if isinstance(image, str):
+        with open(image, "rb") as f:
+            image = f.read()
+    return image, cache_key(image, **options)
+
+
+def _dumps(results):
+    return json.dumps(results, ensure_ascii=False)
+
+
+def _loads(payload):
+    # JSON has no tuples, restore the (text, confidence, bbox) items
+    return [item if isinstance(item, str) else tuple(item) for item in json.loads(payload)]
+
+
+class ResultCache:
+    """In-memory LRU cache for OCR results with an optional sqlite tier on disk.
+
+    The cache is thread-safe. Results are returned as stored, don't modify them.
+
+    Args:
+        max_entries (int, optional): Maximum number of results kept in memory. Defaults to 1024.
+        max_bytes (int, optional): Maximum size of the results kept in memory, measured
+            as their JSON size. Defaults to None (no limit).
+        path (str, optional): Path of a sqlite database used as second tier. Results are
+            written through to it and survive restarts. Defaults to None (memory only).
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+
+        self._entries = OrderedDict()  # key -> (results, size)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._disk_hits = self._evictions = 0
+
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+
+    def get(self, key):
+        """Get the results for a key, None if they are not cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    results = _loads(row[0])
+                    self._insert(key, results, len(row[0]))
+                    self._hits += 1
+                    self._disk_hits += 1
+                    return results
+
+            self._misses += 1
+            return None
+
+    def put(self, key, results):
+        """Store the results for a key"""
+        payload = _dumps(results)
+        with self._lock:
+            self._insert(key, results, len(payload))
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, payload))
+                self._db.commit()
+
+    def recognize(self, image, recognize, **options):
+        """
+        Get the cached results for an image or compute and store them.
+
+        :param image: Image input, paths are read once and handed to `recognize` as bytes.
+        :param recognize: Callable taking the image and returning the results.
+        :param options: Everything that influences the results, e.g. framework,
+            recognition_level, language_preference, confidence_threshold, detail and unit.
+        """
+        image, key = keyed_input(image, **options)
+        results = self.get(key)
+        if results is None:
+            results = recognize(image)
+            self.put(key, results)
+        return results
+
+    def cache_info(self) -> CacheInfo:
+        """Hit and miss statistics, in the style of functools.lru_cache"""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._disk_hits, self._evictions, len(self._entries), self._size)
+
+    def clear(self):
+        """Remove all entries from memory and disk and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._hits = self._misses = self._disk_hits = self._evictions = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def close(self):
+        """Close the database of the disk tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _insert(self, key, results, size):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= old[1]
+        self._entries[key] = (results, size)
+        self._size += size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._size > self.max_bytes)
+        ):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self._evictions += 1
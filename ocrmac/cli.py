@@ -1,21 +1,247 @@
 """Console script for ocrmac."""
+import functools
+import glob
+import importlib
+import json
+import os
 import sys
+import time
+
 import click
 
+from . import engines, parallel
+from .instrument import percentile
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".gif", ".heic", ".webp")
+
 
-@click.command()
-def main(args=None):
+@click.group()
+def main():
     """Console script for ocrmac."""
 
+
+def iter_paths(inputs, extensions=IMAGE_EXTENSIONS):
+    """Lazily expand files, directories (recursively) and glob patterns into image paths"""
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(extensions):
+                        yield os.path.join(root, name)
+        elif os.path.exists(item):
+            yield item
+        else:
+            matched = False
+            for path in glob.iglob(item, recursive=True):
+                matched = True
+                if os.path.isfile(path):
+                    yield path
+            if not matched:
+                raise click.BadParameter(f"No such file, directory or pattern: {item}", param_hint="PATHS")
+
+
+def completed_paths(output):
+    """Paths that already have a successful record in a JSONL output file"""
+    done = set()
+    if output == "-" or not os.path.exists(output):
+        return done
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # e.g. a line cut off by an interrupted run
+            if "error" not in record:
+                done.add(record["path"])
+    return done
+
+
+def load_engine_factory(spec):
+    """Import an engine factory given as 'module:callable'"""
+    module_name, _, name = spec.partition(":")
+    if not name:
+        raise click.BadParameter("Engine must be given as a registered name or as 'module:callable'.", param_hint="--engine")
+    return getattr(importlib.import_module(module_name), name)
+
+
+def split_engine(engine, framework):
+    """Resolve --engine: registered names select the framework, everything else is a factory
+
+    :returns: (engine, framework)
+    """
+    if engine in engines.engine_names():
+        return None, engine
+    return engine, framework
+
+
+class _TimedEngine:
+    """Wraps an engine to report the time spent per image"""
+
+    def __init__(self, engine_factory):
+        self.engine = engine_factory()
+
+    def recognize(self, image):
+        start = time.perf_counter()
+        results = self.engine.recognize(image)
+        return time.perf_counter() - start, results
+
+
+def _record(path, value):
+    if isinstance(value, Exception):
+        return {"path": path, "error": f"{type(value).__name__}: {value}"}
+
+    seconds, results = value
+    return {
+        "path": path,
+        "seconds": round(seconds, 6),
+        "results": [
+            {"text": item} if isinstance(item, str) else {"text": item[0], "confidence": item[1], "bbox": list(item[2])}
+            for item in results
+        ],
+    }
+
+
+@main.command()
+@click.argument("paths", nargs=-1, required=True)
+@click.option("-o", "--output", default="-", show_default=True, help="JSONL output file, '-' for stdout.")
+@click.option("--resume", is_flag=True, help="Skip images that already have a record in the output file.")
+@click.option("-j", "--workers", default=1, show_default=True, help="Number of worker processes.")
+@click.option("--ordered/--unordered", default=False, show_default=True, help="Write records in input order.")
+@click.option("--framework", type=click.Choice(engines.engine_names()), default="vision", show_default=True)
+@click.option("--recognition-level", type=click.Choice(["accurate", "fast"]), default="accurate", show_default=True)
+@click.option("-l", "--language", "languages", multiple=True, help="Language preference, e.g. en-US. Repeatable.")
+@click.option("--confidence-threshold", default=0.0, show_default=True)
+@click.option("--unit", type=click.Choice(["token", "line"]), default="token", show_default=True, help="LiveText only.")
+@click.option(
+    "--engine",
+    default=None,
+    help="Name of a registered engine (e.g. 'stub'), same as --framework, or an engine factory as 'module:callable', which replaces the framework options.",
+)
+def run(paths, output, resume, workers, ordered, framework, recognition_level, languages, confidence_threshold, unit, engine):
+    """OCR images and write one JSON record per image.
+
+    PATHS can be files, directories (searched recursively for images) and glob
+    patterns. Records are written as soon as an image is done. Throughput and
+    latency statistics are printed to stderr at the end.
+    """
+    if resume and output == "-":
+        raise click.BadParameter("--resume needs an output file.", param_hint="--resume")
+
+    engine, framework = split_engine(engine, framework)
+    if engine is not None:
+        engine_factory = load_engine_factory(engine)
+    else:
+        engine_factory = functools.partial(
+            parallel.default_engine,
+            framework=framework,
+            recognition_level=recognition_level,
+            language_preference=list(languages) or None,
+            confidence_threshold=confidence_threshold,
+            unit=unit,
+        )
+
+    done = completed_paths(output) if resume else set()
+    skipped = 0
+
+    def pending():
+        nonlocal skipped
+        for path in iter_paths(paths):
+            if path in done:
+                skipped += 1
+            else:
+                yield path, path
+
+    timed_factory = functools.partial(_TimedEngine, engine_factory)
+    if workers > 1:
+        results = parallel.parallel_recognize(
+            pending(), workers=workers, ordered=ordered, errors="return", engine_factory=timed_factory
+        )
+    else:
+        results = _run_inline(pending(), timed_factory)
+
+    out = sys.stdout if output == "-" else open(output, "a" if resume else "w", encoding="utf-8")
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    try:
+        for path, value in results:
+            record = _record(path, value)
+            if "error" in record:
+                errors += 1
+            else:
+                latencies.append(record["seconds"])
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    count = len(latencies) + errors
+    latencies.sort()
     click.echo(
-        "No CMD tool implemented yet. Consider creating an issue or a pull request if this would be useful for you."
+        f"{count} images in {elapsed:.2f} s ({count / elapsed if elapsed else 0.0:.2f} images/s), "
+        f"latency p50 {percentile(latencies, 50) * 1000:.1f} ms, p95 {percentile(latencies, 95) * 1000:.1f} ms, "
+        f"{errors} errors, {skipped} skipped",
+        err=True,
     )
+    return 0
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to listen on.")
+@click.option("-p", "--port", default=8080, show_default=True, help="Port to listen on.")
+@click.option("-j", "--workers", default=1, show_default=True, help="Number of worker threads, each with a warm engine.")
+@click.option("--max-batch", default=8, show_default=True, help="Maximum number of images a worker takes at once.")
+@click.option("--batch-window", default=0.005, show_default=True, help="Seconds to wait for more images to fill a batch, only when others are queued.")
+@click.option("--max-queue", default=64, show_default=True, help="Waiting requests before answering 503.")
+@click.option("--framework", type=click.Choice(engines.engine_names()), default="vision", show_default=True)
+@click.option("--recognition-level", type=click.Choice(["accurate", "fast"]), default="accurate", show_default=True)
+@click.option("-l", "--language", "languages", multiple=True, help="Language preference, e.g. en-US. Repeatable.")
+@click.option("--confidence-threshold", default=0.0, show_default=True)
+@click.option("--unit", type=click.Choice(["token", "line"]), default="token", show_default=True, help="LiveText only.")
+@click.option(
+    "--engine",
+    default=None,
+    help="Name of a registered engine (e.g. 'stub'), same as --framework, or an engine factory as 'module:callable', which replaces the framework options.",
+)
+def serve(host, port, workers, max_batch, batch_window, max_queue, framework, recognition_level, languages, confidence_threshold, unit, engine):
+    """Run an HTTP server that keeps the engines warm.
+
+    POST an encoded image to /ocr to get the results as JSON (add ?px=1 for
+    pixel coordinates). GET /metrics reports queue depth, counters and latency.
+    """
+    from .server import OCRServer
 
-    if False:
-        click.echo("Replace this message by putting your code into " "ocrmac.cli.main")
-        click.echo("See click documentation at https://click.palletsprojects.com/")
+    engine, framework = split_engine(engine, framework)
+    if engine is not None:
+        options = dict(engine_factory=load_engine_factory(engine))
+    else:
+        options = dict(
+            framework=framework,
+            recognition_level=recognition_level,
+            language_preference=list(languages) or None,
+            confidence_threshold=confidence_threshold,
+            unit=unit,
+        )
+
+    server = OCRServer(
+        host=host, port=port, workers=workers, max_batch=max_batch, batch_window=batch_window, max_queue=max_queue, **options
+    )
+    host, port = server.address
+    click.echo(f"Serving OCR on http://{host}:{port} with {workers} worker(s), press Ctrl+C to stop.", err=True)
+    server.serve_forever()
     return 0
 
 
+def _run_inline(items, engine_factory):
+    engine = engine_factory()
+    for input_id, image in items:
+        try:
+            yield input_id, engine.recognize(image)
+        except Exception as e:
+            yield input_id, e
+
+
 if __name__ == "__main__":
     sys.exit(main())  # pragma: no cover
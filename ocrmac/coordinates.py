@@ -0,0 +1,84 @@
+"""Conversions between the bounding box coordinate systems.
+
+Vision boxes are normalized (x, y, width, height) with the origin in the bottom-left
+corner, see `ocrmac.text_from_image`. The `*_batch` functions are vectorized and
+take and return arrays of shape (N, 4).
+"""
+
+import itertools
+
+import numpy as np
+
+
+def _as_boxes(bboxes):
+    if isinstance(bboxes, np.ndarray):
+        return bboxes.astype(np.float64, copy=False).reshape(-1, 4)
+    if not hasattr(bboxes, "__len__"):
+        bboxes = list(bboxes)
+    # Flattening with fromiter is about twice as fast as np.asarray on a list of lists
+    flat = np.fromiter(itertools.chain.from_iterable(bboxes), dtype=np.float64, count=4 * len(bboxes))
+    return flat.reshape(-1, 4)
+
+
+def convert_coordinates_pyplot(bbox, im_width, im_height):
+    """Convert vision coordinates to matplotlib coordinates"""
+    x, y, w, h = bbox
+    x1 = x * im_width
+    y1 = (1 - y) * im_height
+
+    x2 = w * im_width
+    y2 = -h * im_height
+    return x1, y1, x2, y2
+
+
+def convert_coordinates_pil(bbox, im_width, im_height):
+    """Convert vision coordinates to PIL coordinates"""
+    x, y, w, h = bbox
+    x1 = x * im_width
+    y2 = (1 - y) * im_height
+
+    x2 = x1 + w * im_width
+    y1 = y2 - h * im_height
+
+    return x1, y1, x2, y2
+
+
+def convert_coordinates_pil_batch(bboxes, im_width, im_height):
+    """Convert vision coordinates to PIL coordinates (x1, y1, x2, y2), see `convert_coordinates_pil`"""
+    x, y, w, h = _as_boxes(bboxes).T
+    x1 = x * im_width
+    y2 = (1 - y) * im_height
+
+    x2 = x1 + w * im_width
+    y1 = y2 - h * im_height
+
+    return np.stack([x1, y1, x2, y2], axis=1)
+
+
+def convert_coordinates_pyplot_batch(bboxes, im_width, im_height):
+    """Convert vision coordinates to matplotlib coordinates, see `convert_coordinates_pyplot`"""
+    x, y, w, h = _as_boxes(bboxes).T
+    x1 = x * im_width
+    y1 = (1 - y) * im_height
+
+    x2 = w * im_width
+    y2 = -h * im_height
+    return np.stack([x1, y1, x2, y2], axis=1)
+
+
+def convert_pil_to_vision_batch(boxes, im_width, im_height):
+    """Convert PIL coordinates (x1, y1, x2, y2) in pixels back to vision coordinates"""
+    x1, y1, x2, y2 = _as_boxes(boxes).T
+    return np.stack(
+        [x1 / im_width, 1 - y2 / im_height, (x2 - x1) / im_width, (y2 - y1) / im_height], axis=1
+    )
+
+
+def flip_y_batch(bboxes):
+    """Convert between a bottom-left (Vision) and a top-left (LiveText) origin
+
+    Maps y to 1 - y - height, so the conversion is its own inverse.
+    """
+    boxes = _as_boxes(bboxes).copy()
+    boxes[:, 1] = 1 - boxes[:, 1] - boxes[:, 3]
+    return boxes
@@ -0,0 +1,86 @@
+"""OCR for multi-page documents (PDF and multi-frame images such as TIFF)."""
+
+import os
+
+from PIL import Image
+
+from . import parallel
+
+
+def iter_pages(path, dpi=200):
+    """
+    Decode the pages of a document one at a time.
+
+    :param path: Path to a PDF or an image. Multi-frame images (e.g. TIFF) yield one
+        page per frame, other images a single page.
+    :param dpi: Resolution PDF pages are rendered at. Defaults to 200.
+
+    :returns: Generator yielding each page as PIL image (frames) or encoded image
+        data (bytes, rendered PDF pages). Only one page is held in memory at a time.
+    """
+    path = os.fspath(path)
+    if path.lower().endswith(".pdf"):
+        yield from _pdf_pages(path, dpi)
+        return
+
+    with Image.open(path) as image:
+        for index in range(getattr(image, "n_frames", 1)):
+            image.seek(index)
+            yield image.copy()
+
+
+def _pdf_pages(path, dpi):
+    try:
+        import objc
+        import Quartz
+        from Foundation import NSURL
+    except ImportError:
+        raise ImportError(
+            "PDF support needs PDFKit. Please install pyobjc-framework-Quartz on macOS to use this feature."
+        )
+
+    document = Quartz.PDFDocument.alloc().initWithURL_(NSURL.fileURLWithPath_(path))
+    if document is None:
+        raise ValueError(f"Could not open PDF: {path}")
+
+    scale = dpi / 72.0  # PDF units are points
+    for index in range(document.pageCount()):
+        with objc.autorelease_pool():
+            page = document.pageAtIndex_(index)
+            bounds = page.boundsForBox_(Quartz.kPDFDisplayBoxMediaBox)
+            size = (bounds.size.width * scale, bounds.size.height * scale)
+            rendered = page.thumbnailOfSize_forBox_(size, Quartz.kPDFDisplayBoxMediaBox)
+            data = bytes(rendered.TIFFRepresentation())
+        yield data
+
+
+def ocr_document(path, dpi=200, workers=1, max_in_flight=None, engine=None, engine_factory=None, **options):
+    """
+    OCR a document page by page.
+
+    Pages are decoded lazily, so memory stays flat for long documents. With workers > 1
+    pages are dispatched to a process pool (see `ocrmac.parallel`) and at most
+    `max_in_flight` pages are decoded but not yet yielded.
+
+    :param path: Path to a PDF or a (multi-frame) image.
+    :param dpi: Resolution PDF pages are rendered at. Defaults to 200.
+    :param workers: Number of worker processes, 1 runs in the current process. Defaults to 1.
+    :param max_in_flight: Maximum number of pages in flight with workers > 1.
+        Defaults to 2 * workers.
+    :param engine: Engine to use with workers=1. Defaults to None.
+    :param engine_factory: Picklable engine factory for the workers, see
+        `ocrmac.parallel.parallel_recognize`. Defaults to None.
+    :param options: Options for the default engine, e.g. framework or recognition_level.
+
+    :returns: Generator yielding (page_index, results) in page order.
+    """
+    pages = enumerate(iter_pages(path, dpi))
+
+    if workers > 1:
+        return parallel.parallel_recognize(
+            pages, workers=workers, max_in_flight=max_in_flight, engine_factory=engine_factory, **options
+        )
+
+    if engine is None:
+        engine = engine_factory() if engine_factory is not None else parallel.default_engine(**options)
+    return ((index, engine.recognize(page)) for index, page in pages)
@@ -0,0 +1,239 @@
+"""Registry of OCR engines.
+
+An engine is any object with a ``recognize(image)`` method returning results in the
+format of `ocrmac.text_from_image`. Engines are registered under a name together
+with the options they support. `ocrmac.OCR`, the batch helpers, `ocrmac.parallel`,
+the server and the command line look them up by that name, the ``framework``
+argument.
+
+Built in are 'vision', 'livetext' and 'stub', a deterministic stand-in that returns
+synthetic detections on every platform, e.g. to test and benchmark batching, caching
+and parallelism on Linux.
+"""
+
+import json
+import random
+import string
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+
+from .images import image2buf, image_size, normalize_image
+
+EngineSpec = namedtuple("EngineSpec", ["name", "factory", "options", "check"])
+
+# Options understood by `ocrmac.OCR` and `create_engine`, and their defaults
+DEFAULT_OPTIONS = dict(
+    recognition_level="accurate",
+    language_preference=None,
+    confidence_threshold=0.0,
+    detail=True,
+    unit="token",
+    regions=None,
+    timeout=10.0,
+)
+
+_registry = {}
+_shared = threading.local()
+
+
+def register_engine(name, factory, options=(), check=None, replace=False):
+    """
+    Register an engine under a name.
+
+    With the 'spawn' start method (the default on macOS), worker processes of
+    `ocrmac.parallel` only know the engines registered on import of a module.
+
+    :param name: Name of the engine, passed as `framework`.
+    :param factory: Callable creating the engine, called with the supported options
+        as keyword arguments.
+    :param options: Names of the options of `DEFAULT_OPTIONS` the engine supports.
+        All other options must keep their default value.
+    :param check: Callable validating the supported options without creating the
+        engine, called with them as keyword arguments. Defaults to None.
+    :param replace: Replace an engine registered under the same name. Defaults to False.
+    """
+    unknown = set(options) - set(DEFAULT_OPTIONS)
+    if unknown:
+        raise ValueError(f"Invalid options {sorted(unknown)}. Options must be in {sorted(DEFAULT_OPTIONS)}.")
+    if name in _registry and not replace:
+        raise ValueError(f"Engine '{name}' is already registered, pass replace=True to replace it.")
+    _registry[name] = EngineSpec(name, factory, frozenset(options), check)
+
+
+def unregister_engine(name):
+    """Remove an engine from the registry"""
+    get_spec(name)
+    del _registry[name]
+
+
+def engine_names():
+    """Names of the registered engines, sorted"""
+    return sorted(_registry)
+
+
+def get_spec(name):
+    """The `EngineSpec` registered under a name"""
+    try:
+        return _registry[name]
+    except KeyError:
+        names = ", ".join(f"'{name}'" for name in engine_names())
+        raise ValueError(f"Invalid framework selected. Framework must be one of {names}.") from None
+
+
+def supports(name, option):
+    """Whether the engine registered under `name` supports an option"""
+    return option in get_spec(name).options
+
+
+def check_options(name, **options):
+    """
+    Validate the options for an engine, without creating it.
+
+    :returns: The options supported by the engine, to be passed to its factory.
+    """
+    spec = get_spec(name)
+    for option, value in options.items():
+        if option not in DEFAULT_OPTIONS:
+            raise TypeError(f"Unknown option '{option}'.")
+        if option not in spec.options and value != DEFAULT_OPTIONS[option]:
+            label = option.replace("_", " ").capitalize()
+            raise ValueError(
+                f"{label} is not supported for {name.capitalize()} framework. "
+                f"Please use the default value `{DEFAULT_OPTIONS[option]}` or don't pass an argument."
+            )
+
+    supported = {option: value for option, value in options.items() if option in spec.options}
+    if spec.check is not None:
+        spec.check(**supported)
+    return supported
+
+
+def create_engine(name="vision", **options):
+    """Create a new engine, the options are validated once here"""
+    return get_spec(name).factory(**check_options(name, **options))
+
+
+def shared_engine(name="vision", **options):
+    """
+    An engine for the options that is created once per thread and then reused.
+
+    Engines are not necessarily thread-safe (e.g. `ocrmac.VisionEngine`), so every
+    thread gets its own. The 8 most recently used configurations are kept.
+    """
+    engines = getattr(_shared, "engines", None)
+    if engines is None:
+        engines = _shared.engines = OrderedDict()
+
+    key = (name, json.dumps(options, sort_keys=True, default=str))
+    engine = engines.get(key)
+    if engine is None:
+        engine = engines[key] = create_engine(name, **options)
+        if len(engines) > 8:
+            engines.popitem(last=False)
+    else:
+        engines.move_to_end(key)
+    return engine
+
+
+class StubEngine:
+    """Deterministic stand-in for the frameworks, available on every platform.
+
+    Gets the image data the same way the real engines do (`image2buf`) and returns
+    synthetic detections on a grid of text lines: each line of `line_height` pixels
+    is filled with words of `word_width` pixels with probability `density`. Texts,
+    confidences and the filled lines are derived from the image data, so the same
+    image always gives the same results.
+
+    Args:
+        recognition_level (str, optional): Accepted for compatibility, no effect. Defaults to 'accurate'.
+        language_preference (list, optional): Accepted for compatibility, no effect. Defaults to None.
+        confidence_threshold (float, optional): Drop detections below it. Defaults to 0.0.
+        detail (bool, optional): Whether to return the bounding box or not. Defaults to True.
+        unit (str, optional): 'token' for one entry per word, 'line' for one per line. Defaults to 'token'.
+        density (float, optional): Fraction of lines with text. Defaults to 0.5.
+        line_height (int, optional): Height of a text line in pixels. Defaults to 16.
+        word_width (int, optional): Width of a word in pixels. Defaults to 60.
+        delay (float, optional): Seconds to sleep per image, to simulate the cost of a
+            real engine. Defaults to 0.0.
+    """
+
+    def __init__(
+        self,
+        recognition_level="accurate",
+        language_preference=None,
+        confidence_threshold=0.0,
+        detail=True,
+        unit="token",
+        density=0.5,
+        line_height=16,
+        word_width=60,
+        delay=0.0,
+    ):
+        _check_unit(unit)
+        self.recognition_level = recognition_level
+        self.language_preference = language_preference
+        self.confidence_threshold = confidence_threshold
+        self.detail = detail
+        self.unit = unit
+        self.density = density
+        self.line_height = line_height
+        self.word_width = word_width
+        self.delay = delay
+
+    def recognize(self, image):
+        """Synthetic results for an image, in the format of `ocrmac.text_from_image`"""
+        image = normalize_image(image)
+        rng = random.Random(zlib.crc32(image2buf(image)))
+        width, height = image_size(image)
+        if self.delay:
+            time.sleep(self.delay)
+
+        results = []
+        for top in range(0, height - self.line_height + 1, self.line_height):
+            if rng.random() >= self.density:
+                continue
+            y, h = 1 - (top + self.line_height) / height, self.line_height / height
+            words = [
+                ("".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 8))), rng.random(), [left / width, y, self.word_width / width, h])
+                for left in range(0, width - self.word_width + 1, self.word_width)
+            ]
+            if not words:
+                continue
+            if self.unit == "line":
+                text = " ".join(word for word, _, _ in words)
+                confidence = min(confidence for _, confidence, _ in words)
+                words = [(text, confidence, [0.0, y, len(words) * self.word_width / width, h])]
+            results.extend(word for word in words if word[1] >= self.confidence_threshold)
+
+        if not self.detail:
+            return [text for text, _, _ in results]
+        return results
+
+
+def _check_unit(unit="token", **options):
+    if unit not in {"token", "line"}:
+        raise ValueError("Invalid unit. Must be 'token' or 'line'.")
+
+
+def _vision(recognition_level, language_preference, confidence_threshold, detail, unit="token", regions=None):
+    from .ocrmac import VisionEngine
+
+    # Vision has no token / line distinction, unit is accepted and ignored
+    return VisionEngine(recognition_level, language_preference, confidence_threshold, detail, regions)
+
+
+def _livetext(language_preference, detail, unit, timeout=10.0):
+    from .ocrmac import LiveTextEngine
+
+    return LiveTextEngine(language_preference, detail=detail, unit=unit, timeout=timeout)
+
+
+register_engine(
+    "vision", _vision, ["recognition_level", "language_preference", "confidence_threshold", "detail", "unit", "regions"]
+)
+register_engine("livetext", _livetext, ["language_preference", "detail", "unit", "timeout"], check=_check_unit)
+register_engine(
+    "stub", StubEngine, ["recognition_level", "language_preference", "confidence_threshold", "detail", "unit"], check=_check_unit
+)
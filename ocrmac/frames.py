@@ -0,0 +1,245 @@
+"""Incremental OCR for video frames and screen recordings.
+
+Consecutive frames of a recording are mostly identical. Each frame is compared block
+by block with the last recognized frame: unchanged frames reuse the previous results,
+and for small changes only the changed regions are recognized and merged into the
+results carried forward. Bounding boxes use the normalized Vision convention, see
+`ocrmac.text_from_image`.
+"""
+
+import numpy as np
+
+from . import parallel
+from .coordinates import convert_coordinates_pil_batch
+from .images import open_image
+from .tiling import remap_bbox
+
+
+def changed_blocks(previous, current, block_size=16, tolerance=24, min_pixels=1):
+    """
+    Compare two grayscale frames block by block.
+
+    :param previous: 2D uint8 array.
+    :param current: 2D uint8 array of the same shape.
+    :param block_size: Edge length of the blocks in pixels. Defaults to 16.
+    :param tolerance: Gray value difference a pixel needs to count as changed, so that
+        compression noise is ignored. Defaults to 24.
+    :param min_pixels: Changed pixels a block needs to count as changed. Defaults to 1.
+
+    :returns: Boolean array with one entry per block, shape (ceil(h / block_size), ceil(w / block_size)).
+    """
+    if previous.shape != current.shape:
+        raise ValueError("Invalid frames. Both frames must have the same size.")
+
+    difference = np.maximum(previous, current)
+    difference -= np.minimum(previous, current)
+    changed = difference > tolerance
+
+    height, width = changed.shape
+    rows, columns = -(-height // block_size), -(-width // block_size)
+    if (height, width) != (rows * block_size, columns * block_size):
+        padded = np.zeros((rows * block_size, columns * block_size), dtype=bool)
+        padded[:height, :width] = changed
+        changed = padded
+    # Summing the rows of each block first keeps the reduction on contiguous memory
+    counts = changed.reshape(rows, block_size, -1).sum(axis=1, dtype=np.int32)
+    counts = counts.reshape(rows, columns, block_size).sum(axis=2)
+    return counts >= min_pixels
+
+
+def block_regions(mask, block_size, width, height):
+    """
+    Bounding boxes of the connected groups of changed blocks.
+
+    :param mask: Boolean block array, see `changed_blocks`.
+    :param block_size: Edge length of the blocks in pixels.
+    :param width: Frame width in pixels.
+    :param height: Frame height in pixels.
+
+    :returns: List of (left, top, right, bottom) pixel boxes, clipped to the frame.
+    """
+    rows, columns = mask.shape
+    seen = np.zeros_like(mask, dtype=bool)
+    regions = []
+    for row, column in zip(*np.nonzero(mask)):
+        if seen[row, column]:
+            continue
+        seen[row, column] = True
+        stack = [(row, column)]
+        top, left, bottom, right = row, column, row, column
+        while stack:
+            r, c = stack.pop()
+            top, left, bottom, right = min(top, r), min(left, c), max(bottom, r), max(right, c)
+            for nr in range(max(r - 1, 0), min(r + 2, rows)):
+                for nc in range(max(c - 1, 0), min(c + 2, columns)):
+                    if mask[nr, nc] and not seen[nr, nc]:
+                        seen[nr, nc] = True
+                        stack.append((nr, nc))
+        regions.append(
+            (
+                int(left * block_size),
+                int(top * block_size),
+                int(min((right + 1) * block_size, width)),
+                int(min((bottom + 1) * block_size, height)),
+            )
+        )
+    return regions
+
+
+def _intersects(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _hits(boxes, region):
+    """Mask of the (N, 4) pixel boxes that intersect a region"""
+    left, top, right, bottom = region
+    return (boxes[:, 0] < right) & (left < boxes[:, 2]) & (boxes[:, 1] < bottom) & (top < boxes[:, 3])
+
+
+def _union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def _grow_regions(regions, boxes):
+    """Grow the regions until no box is cut by a region and no two regions overlap"""
+    while True:
+        grown = []
+        for region in regions:
+            hit = boxes[_hits(boxes, region)]
+            if len(hit):
+                region = _union(region, (*hit[:, :2].min(axis=0).tolist(), *hit[:, 2:].max(axis=0).tolist()))
+            for index, other in enumerate(grown):
+                if _intersects(region, other):
+                    grown[index] = _union(region, other)
+                    break
+            else:
+                grown.append(region)
+        if grown == regions:
+            return regions
+        regions = grown
+
+
+class IncrementalOCR:
+    """OCR a sequence of frames, recognizing only what changed.
+
+    Each frame is compared with the last recognized state (see `changed_blocks`):
+
+    - no changed block: the previous results are returned without OCR,
+    - more than `max_changed` of the blocks changed: the full frame is recognized,
+    - otherwise the changed blocks are grouped into regions, grown to cover the
+      detections they touch (so that text is always re-read as a whole) and
+      recognized as crops. Detections outside the regions are carried forward.
+
+    Slow drifts are not lost: skipped blocks keep the pixels they were recognized
+    with, so small differences add up until the block counts as changed.
+
+    `stats` counts the frames per outcome (skipped, partial, full).
+
+    Args:
+        recognize (callable): Takes a PIL image and returns results with bounding boxes,
+            e.g. the `recognize` method of an engine.
+        block_size (int, optional): Edge length of the compared blocks in pixels. Defaults to 16.
+        tolerance (int, optional): Gray value difference of a changed pixel. Defaults to 24.
+        min_pixels (int, optional): Changed pixels of a changed block. Defaults to 1.
+        max_changed (float, optional): Fraction of changed blocks above which the full
+            frame is recognized. Defaults to 0.5.
+        margin (int, optional): Pixels added around each region, so that the engine
+            sees some context. Defaults to 8.
+    """
+
+    def __init__(self, recognize, block_size=16, tolerance=24, min_pixels=1, max_changed=0.5, margin=8):
+        if block_size < 1:
+            raise ValueError("Invalid block_size. Must be at least 1.")
+        if not 0 <= max_changed <= 1:
+            raise ValueError("Invalid max_changed. Must be between 0 and 1.")
+
+        self.recognize = recognize
+        self.block_size = block_size
+        self.tolerance = tolerance
+        self.min_pixels = min_pixels
+        self.max_changed = max_changed
+        self.margin = margin
+        self.stats = dict(skipped=0, partial=0, full=0)
+        self.reset()
+
+    def reset(self):
+        """Forget the previous frame, the next frame is recognized in full"""
+        self.results = None
+        self._reference = None
+        self._mergeable = False
+
+    def update(self, frame):
+        """
+        Recognize the next frame.
+
+        :param frame: Image input, see `ocrmac.text_from_image`.
+
+        :returns: List of (text, confidence, bbox) for the frame. Results of
+            partially recognized frames are sorted top to bottom, then left to right.
+        """
+        image = open_image(frame)
+        gray = np.asarray(image.convert("L"))
+
+        if self._reference is None or self._reference.shape != gray.shape or not self._mergeable:
+            return self._full(image, gray)
+
+        mask = changed_blocks(self._reference, gray, self.block_size, self.tolerance, self.min_pixels)
+        if not mask.any():
+            self.stats["skipped"] += 1
+            return list(self.results)
+        if mask.mean() > self.max_changed:
+            return self._full(image, gray)
+
+        width, height = image.size
+        regions = [
+            (max(left - self.margin, 0), max(top - self.margin, 0), min(right + self.margin, width), min(bottom + self.margin, height))
+            for left, top, right, bottom in block_regions(mask, self.block_size, width, height)
+        ]
+        boxes = convert_coordinates_pil_batch([bbox for _, _, bbox in self.results], width, height).reshape(-1, 4)
+        boxes = np.concatenate([np.floor(boxes[:, :2]), np.ceil(boxes[:, 2:])], axis=1).astype(int)
+        regions = _grow_regions(regions, boxes)
+
+        keep = ~np.any([_hits(boxes, region) for region in regions], axis=0)
+        results = [item for item, kept in zip(self.results, keep.tolist()) if kept]
+        reference = self._reference.copy()
+        for crop in regions:
+            left, top, right, bottom = crop
+            for text, confidence, bbox in self.recognize(image.crop(crop)):
+                results.append((text, confidence, remap_bbox(bbox, crop, width, height)))
+            reference[top:bottom, left:right] = gray[top:bottom, left:right]
+
+        results.sort(key=lambda item: (-(item[2][1] + item[2][3]), item[2][0]))
+        self._reference = reference
+        self.results = results
+        self.stats["partial"] += 1
+        return list(results)
+
+    def _full(self, image, gray):
+        self.results = list(self.recognize(image))
+        self._reference = gray
+        # Results without boxes (detail=False) can't be merged by position
+        self._mergeable = not any(isinstance(item, str) for item in self.results)
+        self.stats["full"] += 1
+        return list(self.results)
+
+
+def ocr_frames(frames, engine=None, engine_factory=None, block_size=16, tolerance=24, max_changed=0.5, **options):
+    """
+    OCR a stream of frames incrementally, see `IncrementalOCR`.
+
+    :param frames: Iterable of image inputs, e.g. PIL images decoded from a video.
+    :param engine: Engine to use. Defaults to None.
+    :param engine_factory: Callable creating the engine if none is given. Defaults to None.
+    :param block_size: Edge length of the compared blocks in pixels. Defaults to 16.
+    :param tolerance: Gray value difference of a changed pixel. Defaults to 24.
+    :param max_changed: Fraction of changed blocks above which the full frame is
+        recognized. Defaults to 0.5.
+    :param options: Options for the default engine, e.g. framework or recognition_level.
+
+    :returns: Generator yielding (frame_index, results) in frame order.
+    """
+    if engine is None:
+        engine = engine_factory() if engine_factory is not None else parallel.default_engine(**options)
+    incremental = IncrementalOCR(engine.recognize, block_size=block_size, tolerance=tolerance, max_changed=max_changed)
+    for index, frame in enumerate(frames):
+        yield index, incremental.update(frame)
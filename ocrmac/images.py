@@ -0,0 +1,96 @@
+"""Image input handling, independent of the Apple frameworks."""
+
+import io
+import os
+
+from PIL import Image
+
+from . import instrument
+
+# Modes that round-trip through uncompressed BMP, everything else (e.g. alpha) goes to uncompressed TIFF
+_BMP_MODES = {"1", "L", "P", "RGB"}
+
+INVALID_IMAGE = (
+    "Invalid image format. Image must be a path, bytes, a file-like object, "
+    "a numpy array or a PIL image."
+)
+
+
+def pil2buf(pil_image: Image.Image, raw=False):
+    """Convert PIL image to buffer
+
+    By default the image is encoded as PNG. With raw=True an uncompressed bitmap
+    (BMP, or TIFF for modes BMP can't store) is written instead, which skips the
+    zlib compression and is several times faster to encode for large images.
+    """
+    buffer = io.BytesIO()
+    with instrument.stage("encode"):
+        if not raw:
+            pil_image.save(buffer, format="PNG")
+        elif pil_image.mode in _BMP_MODES:
+            pil_image.save(buffer, format="BMP")
+        else:
+            pil_image.save(buffer, format="TIFF")
+    return buffer.getvalue()
+
+
+def normalize_image(image):
+    """Bring an image input into one of the forms the engines work with
+
+    Paths (str or os.PathLike) are returned as str without opening the file,
+    bytes-like objects and file-like objects as bytes, numpy arrays as PIL image.
+    PIL images are passed through.
+    """
+    if isinstance(image, str):
+        return image
+    if isinstance(image, os.PathLike):
+        return os.fspath(image)
+    if isinstance(image, bytes):
+        return image
+    if isinstance(image, (bytearray, memoryview)):
+        return bytes(image)
+    if isinstance(image, Image.Image):
+        return image
+    if hasattr(image, "read"):
+        return image.read()
+    if hasattr(image, "__array_interface__"):
+        return Image.fromarray(image)
+    raise ValueError(INVALID_IMAGE)
+
+
+def image2buf(image) -> bytes:
+    """Get the encoded image data to hand to the engine
+
+    Paths are read as is, so already encoded files are not decoded and re-encoded.
+    Bytes are passed through unchanged and PIL images are written as raw bitmap.
+    """
+    image = normalize_image(image)
+    if isinstance(image, str):
+        with instrument.stage("load"), open(image, "rb") as f:
+            return f.read()
+    if isinstance(image, bytes):
+        return image
+    return pil2buf(image, raw=True)
+
+
+def open_image(image) -> Image.Image:
+    """Decode an image input into a PIL image, the file handle is closed right away"""
+    image = normalize_image(image)
+    if isinstance(image, Image.Image):
+        return image
+    if isinstance(image, bytes):
+        image = io.BytesIO(image)
+    with instrument.stage("load"), Image.open(image) as pil_image:
+        pil_image.load()
+    return pil_image
+
+
+def image_size(image):
+    """Get (width, height) of an image input, for files only the header is read"""
+    image = normalize_image(image)
+    if isinstance(image, Image.Image):
+        return image.size
+    if isinstance(image, bytes):
+        image = io.BytesIO(image)
+    with Image.open(image) as pil_image:
+        return pil_image.size
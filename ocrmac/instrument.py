@@ -0,0 +1,167 @@
+"""Opt-in timing of the stages of an OCR call.
+
+The stages are:
+
+- load: reading or decoding the image input
+- encode: encoding a PIL image for the framework (`pil2buf`)
+- handler: creating the request handler (VNImageRequestHandler, LiveText image and request)
+- perform: running the Vision requests (performRequests_error_)
+- marshal: converting the framework results into Python objects
+- livetext_wait: waiting for the LiveText completion handler
+
+Nothing is measured until a hook or a tracer is registered, so instrumentation costs
+a single check per stage when it is off::
+
+    from ocrmac import instrument
+
+    with instrument.recording() as recorder:
+        ocrmac.OCR("test.png").recognize()
+    print(recorder.summary())
+"""
+
+import contextlib
+import threading
+import time
+from collections import deque
+
+STAGES = ("load", "encode", "handler", "perform", "marshal", "livetext_wait")
+
+_hooks = []
+_tracer = None
+_enabled = False
+_DISABLED = contextlib.nullcontext()
+
+
+def _update():
+    global _enabled
+    _enabled = bool(_hooks) or _tracer is not None
+
+
+def add_hook(hook):
+    """Register a callable `hook(stage, seconds)` that is called after every stage"""
+    _hooks.append(hook)
+    _update()
+
+
+def remove_hook(hook):
+    """Remove a hook registered with `add_hook`"""
+    _hooks.remove(hook)
+    _update()
+
+
+def set_tracer(tracer):
+    """
+    Emit a span per stage.
+
+    :param tracer: Object with a `start_as_current_span(name)` context manager, e.g.
+        `opentelemetry.trace.get_tracer("ocrmac")`. Spans are named 'ocrmac.<stage>'.
+        None disables the spans. Defaults to None.
+    """
+    global _tracer
+    _tracer = tracer
+    _update()
+
+
+def stage(name):
+    """Context manager timing one stage, does nothing unless a hook or tracer is set"""
+    if not _enabled:
+        return _DISABLED
+    return _Stage(name)
+
+
+class _Stage:
+    __slots__ = ("name", "span", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.span = None
+
+    def __enter__(self):
+        if _tracer is not None:
+            self.span = _tracer.start_as_current_span(f"ocrmac.{self.name}")
+            self.span.__enter__()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        if self.span is not None:
+            self.span.__exit__(*exc_info)
+        for hook in list(_hooks):
+            hook(self.name, seconds)
+        return False
+
+
+class Recorder:
+    """Hook that aggregates the stage timings into histograms.
+
+    Count and total are exact, percentiles are computed from the last `max_samples`
+    timings of each stage. Safe to use from several threads.
+
+    Args:
+        max_samples (int, optional): Timings kept per stage for the percentiles.
+            Defaults to 10000.
+    """
+
+    def __init__(self, max_samples=10000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __call__(self, stage, seconds):
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.max_samples)
+                self._counts[stage] = 0
+                self._totals[stage] = 0.0
+            self._samples[stage].append(seconds)
+            self._counts[stage] += 1
+            self._totals[stage] += seconds
+
+    def reset(self):
+        """Drop all recorded timings"""
+        with self._lock:
+            self._samples = {}
+            self._counts = {}
+            self._totals = {}
+
+    def summary(self):
+        """
+        Aggregate the recorded timings.
+
+        :returns: Dict mapping each recorded stage to a dict with count, total, p50,
+            p95 and p99 in seconds.
+        """
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+            counts, totals = dict(self._counts), dict(self._totals)
+
+        return {
+            stage: dict(
+                count=counts[stage],
+                total=totals[stage],
+                p50=percentile(values, 50),
+                p95=percentile(values, 95),
+                p99=percentile(values, 99),
+            )
+            for stage, values in samples.items()
+        }
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile q (0 to 100) of sorted values, 0.0 if there are none"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+@contextlib.contextmanager
+def recording(max_samples=10000):
+    """Record the stage timings inside the block, yields the `Recorder`"""
+    recorder = Recorder(max_samples)
+    add_hook(recorder)
+    try:
+        yield recorder
+    finally:
+        remove_hook(recorder)
@@ -1,9 +1,33 @@
 """Main module."""
 
-import io
-import objc
-
-from PIL import ImageFont, ImageDraw, Image
+import asyncio
+import functools
+import time
+
+import numpy as np
+
+from PIL import Image
+
+from . import aio, engines, instrument, parallel
+from .annotate import DEFAULT_FONT, annotate_figure, annotate_image, figure_to_png, preview_image
+from .cache import keyed_input
+from .document import ocr_document  # noqa: F401, re-exported
+from .frames import ocr_frames  # noqa: F401, re-exported
+from .coordinates import (  # noqa: F401, re-exported as part of the module API
+    convert_coordinates_pil,
+    convert_coordinates_pyplot,
+    convert_coordinates_pil_batch,
+    convert_coordinates_pyplot_batch,
+    convert_pil_to_vision_batch,
+    flip_y_batch,
+)
+from .images import pil2buf, image2buf, normalize_image, open_image, image_size
+from .pool import Pool
+from .preprocess import make_preprocessor
+from .regions import check_region_options, check_regions, recognize_regions, remap_results
+from .result import OCRResult
+from .structure import StructuredResult
+from .tiling import recognize_tiled
 
 import sys 
 
@@ -12,28 +36,21 @@ if sys.version_info < (3, 9):
 else:
     List, Tuple = list, tuple
 
-import Vision
-import inspect
 
-try:
-    import matplotlib
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as patches
+# The Apple frameworks and matplotlib are imported on first use of a backend, so that
+# importing ocrmac is fast and the framework independent parts work on every platform.
 
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
 
+@functools.lru_cache(maxsize=None)
+def _livetext_available():
+    """Import the LiveText dependencies and register the analyzer metadata, once"""
+    try:
+        import objc
+        import AppKit  # noqa: F401
+        import CoreFoundation  # noqa: F401
+    except ImportError:
+        return False
 
-try:
-    from AppKit import NSData, NSImage
-    from CoreFoundation import (
-        CFRunLoopRunInMode,
-        kCFRunLoopDefaultMode,
-        CFRunLoopStop,
-        CFRunLoopGetCurrent,
-    )
-    
     objc.registerMetaDataForSelector(
             b"VKCImageAnalyzer",
             b"processRequest:progressHandler:completionHandler:",
@@ -61,53 +78,60 @@ try:
                 }
             },
         )
-    
-    LIVETEXT_AVAILABLE = True
-except ImportError:
-    LIVETEXT_AVAILABLE = False
+    return True
 
 
-def pil2buf(pil_image: Image.Image):
-    """Convert PIL image to buffer"""
-    buffer = io.BytesIO()
-    pil_image.save(buffer, format="PNG")
-    return buffer.getvalue()
+@functools.lru_cache(maxsize=None)
+def _matplotlib_available():
+    try:
+        import matplotlib  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 
-def convert_coordinates_pyplot(bbox, im_width, im_height):
-    """Convert vision coordinates to matplotlib coordinates"""
-    x, y, w, h = bbox
-    x1 = x * im_width
-    y1 = (1 - y) * im_height
-
-    x2 = w * im_width
-    y2 = -h * im_height
-    return x1, y1, x2, y2
+def _check_matplotlib():
+    if not _matplotlib_available():
+        raise ImportError(
+            "Matplotlib is not available. Please install matplotlib to use this feature."
+        )
 
 
-def convert_coordinates_pil(bbox, im_width, im_height):
-    """Convert vision coordinates to PIL coordinates"""
-    x, y, w, h = bbox
-    x1 = x * im_width
-    y2 = (1 - y) * im_height
+def __getattr__(name):
+    # LIVETEXT_AVAILABLE and MATPLOTLIB_AVAILABLE are computed on first access
+    if name == "LIVETEXT_AVAILABLE":
+        return _livetext_available()
+    if name == "MATPLOTLIB_AVAILABLE":
+        return _matplotlib_available()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    x2 = x1 + w * im_width
-    y1 = y2 - h * im_height
 
-    return x1, y1, x2, y2
+def _to_pixels(res, im_width, im_height):
+    """Convert the boxes of a result list to PIL pixel coordinates"""
+    boxes = convert_coordinates_pil_batch([bbox for _, _, bbox in res], im_width, im_height)
+    return [(text, conf, tuple(box)) for (text, conf, _), box in zip(res, boxes.tolist())]
 
 
 def text_from_image(
-    image, recognition_level="accurate", language_preference=None, confidence_threshold=0.0, detail = True
+    image, recognition_level="accurate", language_preference=None, confidence_threshold=0.0, detail = True, cache=None, preprocess=None, regions=None
 ) -> List[Tuple[str, float, Tuple[float, float, float, float]]]:
     """
     Helper function to call VNRecognizeTextRequest from Apple's vision framework.
 
-    :param image: Path to image (str) or PIL Image.Image.
+    :param image: Path to image (str or pathlib.Path), encoded image data (bytes),
+        file-like object, numpy array or PIL Image.Image.
+        Files and bytes are handed to the framework without re-encoding.
     :param recognition_level: Recognition level. Defaults to 'accurate'.
     :param language_preference: Language preference. Defaults to None.
     :param confidence_threshold: Confidence threshold. Defaults to 0.0.
     :param detail: Whether to return the bounding box or not. Defaults to True.
+    :param cache: `ocrmac.cache.ResultCache` to look up and store the results. Defaults to None.
+    :param preprocess: `ocrmac.preprocess.Preprocessor` or dict of its options to downscale,
+        convert or crop the image first. Bounding boxes still refer to the original image.
+        Defaults to None.
+    :param regions: Only OCR these regions, a list of normalized (x, y, width, height)
+        in the coordinates of the bounding boxes. All regions are recognized in one pass
+        of the framework and the boxes refer to the full image. Defaults to None.
 
     :returns: List of tuples containing the text, the confidence and the bounding box.
         Each tuple looks like (text, confidence, (x, y, width, height))
@@ -118,77 +142,224 @@ def text_from_image(
         and https://developer.apple.com/documentation/vision/vnrectangleobservation?language=objc
     """
 
-    if isinstance(image, str):
-        image = Image.open(image)
-    elif not isinstance(image, Image.Image):
-        raise ValueError("Invalid image format. Image must be a path or a PIL image.")
-
-    if recognition_level not in {"accurate", "fast"}:
-        raise ValueError(
-            "Invalid recognition level. Recognition level must be 'accurate' or 'fast'."
+    image = normalize_image(image)
+    preprocess = make_preprocessor(preprocess)
+    regions = check_region_options(regions, preprocess)
+
+    def recognize(image):
+        engine = VisionEngine(recognition_level, language_preference, confidence_threshold, detail, regions)
+        if preprocess is not None:
+            return preprocess.recognize(image, engine.recognize)
+        return engine.recognize(image)
+
+    if cache is not None:
+        return cache.recognize(
+            image,
+            recognize,
+            **_cache_options("vision", recognition_level, language_preference, confidence_threshold, detail, "token", preprocess, regions)
         )
+    return recognize(image)
 
-    if language_preference is not None and not isinstance(language_preference, list):
-        raise ValueError(
-            "Invalid language preference format. Language preference must be a list."
-        )
 
-    with objc.autorelease_pool():
+def _engine_key(framework, engine):
+    """The framework, or the class of a custom engine, as used in cache keys"""
+    if engine is None:
+        return framework
+    return f"{type(engine).__module__}.{type(engine).__qualname__}"
+
+
+def _cache_options(framework, recognition_level, language_preference, confidence_threshold, detail, unit, preprocess=None, regions=None):
+    """Everything that changes the results besides the image, used in the cache key"""
+    options = dict(
+        framework=framework,
+        recognition_level=recognition_level,
+        language_preference=language_preference,
+        confidence_threshold=confidence_threshold,
+        detail=detail,
+        unit=unit,
+    )
+    if preprocess is not None:
+        options["preprocess"] = preprocess.options()
+    if regions is not None:
+        options["regions"] = check_regions(regions)
+    return options
+
+
+class VisionEngine:
+    """Reusable backend for VNRecognizeTextRequest from Apple's vision framework.
+
+    The configuration is validated and the request is built once, so that many
+    images can be processed without repeating the setup for every call.
+    An engine is not thread-safe, use one engine per thread.
+
+    Args:
+        recognition_level (str, optional): Recognition level. Defaults to 'accurate'.
+        language_preference (list, optional): Language preference. Defaults to None.
+        confidence_threshold (float, optional): Confidence threshold. Defaults to 0.0.
+        detail (bool, optional): Whether to return the bounding box or not. Defaults to True.
+        regions (list, optional): Only OCR these normalized (x, y, width, height) regions.
+            One request with a regionOfInterest is built per region and all of them run
+            in a single handler pass. Defaults to None (full image).
+    """
+
+    def __init__(self, recognition_level="accurate", language_preference=None, confidence_threshold=0.0, detail=True, regions=None):
+        if recognition_level not in {"accurate", "fast"}:
+            raise ValueError(
+                "Invalid recognition level. Recognition level must be 'accurate' or 'fast'."
+            )
+
+        if language_preference is not None and not isinstance(language_preference, list):
+            raise ValueError(
+                "Invalid language preference format. Language preference must be a list."
+            )
+
+        self.recognition_level = recognition_level
+        self.language_preference = language_preference
+        self.confidence_threshold = confidence_threshold
+        self.detail = detail
+        self.regions = check_regions(regions) if regions is not None else None
+
+        import objc
+
+        with objc.autorelease_pool():
+            if self.regions is None:
+                self._requests = [self._build_request()]
+            else:
+                self._requests = [self._build_request(region) for region in self.regions]
+
+    def _build_request(self, region=None):
+        import Vision
+
         req = Vision.VNRecognizeTextRequest.alloc().init()
 
-        if recognition_level == "fast":
+        if self.recognition_level == "fast":
             req.setRecognitionLevel_(1)
         else:
             req.setRecognitionLevel_(0)
 
-
-
-        if language_preference is not None:
-            
+        if self.language_preference is not None:
             available_languages = req.supportedRecognitionLanguagesAndReturnError_(None)[0]
 
-            if not set(language_preference).issubset(set(available_languages)):
+            if not set(self.language_preference).issubset(set(available_languages)):
                 raise ValueError(
                     f"Invalid language preference. Language preference must be a subset of {available_languages}."
                 )
-            req.setRecognitionLanguages_(language_preference)
+            req.setRecognitionLanguages_(self.language_preference)
 
-        handler = Vision.VNImageRequestHandler.alloc().initWithData_options_(
-            pil2buf(image), None
-        )
+        if region is not None:
+            x, y, w, h = region
+            req.setRegionOfInterest_(((x, y), (w, h)))
 
-        ret = handler.performRequests_error_([req], None)
-        # PyObjC returns either a bool or a (bool, NSError|None) tuple depending on the signature mapping.
-        if isinstance(ret, tuple):
-            ok, err = ret
-        else:
-            ok, err = bool(ret), None
+        return req
+
+    def recognize(self, image) -> List[Tuple[str, float, Tuple[float, float, float, float]]]:
+        """Run the configured request on a single image.
+
+        Args:
+            image: Path, encoded image data, file-like object, numpy array or PIL image.
+
+        Returns:
+            list: Same format as `text_from_image`.
+        """
+        import objc
+        import Vision
+
+        data = image2buf(image)
+
+        with objc.autorelease_pool():
+            with instrument.stage("handler"):
+                handler = Vision.VNImageRequestHandler.alloc().initWithData_options_(
+                    data, None
+                )
+
+            with instrument.stage("perform"):
+                ret = handler.performRequests_error_(self._requests, None)
+            # PyObjC returns either a bool or a (bool, NSError|None) tuple depending on the signature mapping.
+            if isinstance(ret, tuple):
+                ok, err = ret
+            else:
+                ok, err = bool(ret), None
+            res = []
+            if ok and err is None:
+                with instrument.stage("marshal"):
+                    res = self._marshal()
+
+            return res
+
+    def _marshal(self):
+        res = []
+        for index, request in enumerate(self._requests):
+            region_res = self._results(request)
+            if self.regions is not None:
+                # boxes of a request with a regionOfInterest are relative to the region
+                region_res = remap_results(region_res, self.regions[index])
+            res.extend(region_res)
+        return res
+
+    def _results(self, request):
         res = []
-        if ok and err is None:
-            for result in req.results():
-                confidence = result.confidence()
-                if confidence >= confidence_threshold:
-                    if detail:
-                        bbox = result.boundingBox()
-                        x, y = bbox.origin.x, bbox.origin.y
-                        w, h = bbox.size.width, bbox.size.height
-                        res.append((result.text(), confidence, [x, y, w, h]))
-                    else:
-                        res.append(result.text())
-            
+        for result in request.results():
+            confidence = result.confidence()
+            if confidence >= self.confidence_threshold:
+                if self.detail:
+                    bbox = result.boundingBox()
+                    x, y = bbox.origin.x, bbox.origin.y
+                    w, h = bbox.size.width, bbox.size.height
+                    res.append((result.text(), confidence, [x, y, w, h]))
+                else:
+                    res.append(result.text())
         return res
 
 
-def livetext_from_image(image, language_preference=None, detail=True, unit='token'):
+def batch_text_from_images(
+    images, recognition_level="accurate", language_preference=None, confidence_threshold=0.0, detail=True, engine=None, dedupe=None
+):
+    """
+    Helper function to run VNRecognizeTextRequest on many images.
+
+    The configuration is validated once and a single request is reused for all images.
+
+    :param images: Iterable of images, see `text_from_image` for the supported inputs.
+    :param recognition_level: Recognition level. Defaults to 'accurate'.
+    :param language_preference: Language preference. Defaults to None.
+    :param confidence_threshold: Confidence threshold. Defaults to 0.0.
+    :param detail: Whether to return the bounding box or not. Defaults to True.
+    :param engine: Engine to use instead of a new `VisionEngine`. Any object with a
+        `recognize(image)` method works. Defaults to None.
+    :param dedupe: `ocrmac.phash.NearDuplicateIndex` to reuse the results of
+        near-duplicate images. Defaults to None.
+
+    :returns: Generator yielding one result list per image, in input order.
+        See `text_from_image` for the format of each list.
+    """
+    if dedupe is not None:
+        options = _cache_options(
+            _engine_key("vision", engine), recognition_level, language_preference, confidence_threshold, detail, "token"
+        )
+    if engine is None:
+        engine = VisionEngine(recognition_level, language_preference, confidence_threshold, detail)
+
+    if dedupe is not None:
+        return (dedupe.recognize(image, engine.recognize, **options) for image in images)
+    return (engine.recognize(image) for image in images)
+
+
+def livetext_from_image(image, language_preference=None, detail=True, unit='token', timeout=10.0, cache=None, preprocess=None):
     """
     Helper function to call VKCImageAnalyzer from Apple's livetext framework.
 
-    :param image: Path to image (str) or PIL Image.Image.
+    :param image: Path to image (str or pathlib.Path), encoded image data (bytes),
+        file-like object, numpy array or PIL Image.Image.
+        Files and bytes are handed to the framework without re-encoding.
     :param language_preference: Language preference. Defaults to None.
     :param detail: Whether to return the bounding box or not. Defaults to True.
     :param unit: Output granularity for flat results. 'token' (default)
         returns the finest-grained children (often characters for CJK),
         'line' returns one entry per line (full line text and its bbox).
+    :param timeout: Seconds to wait for the analysis. Defaults to 10.0.
+    :param cache: `ocrmac.cache.ResultCache` to look up and store the results. Defaults to None.
+    :param preprocess: `ocrmac.preprocess.Preprocessor` or dict of its options, see
+        `text_from_image`. Defaults to None.
 
     :returns: List of tuples containing the text and the bounding box.
         Each tuple looks like (text, (x, y, width, height))
@@ -197,102 +368,342 @@ def livetext_from_image(image, language_preference=None, detail=True, unit='toke
         You can use the `convert_coordinates_*` functions to convert them to pixels.
         For more info, see https://developer.apple.com/documentation/vision/vndetectedobjectobservation/2867227-boundingbox?language=objc
         and https://developer.apple.com/documentation/vision/vnrectangleobservation?language=objc
+    :raises TimeoutError: If the analysis takes longer than `timeout`.
     """
 
-    if not LIVETEXT_AVAILABLE:
-        raise ImportError(
-            "Invalid framework selected, Livetext is not available. \
-            Please makesure your system is running MacOS Sonoma or later, and essential packages are installed."
-        )
+    preprocess = make_preprocessor(preprocess)
+    if preprocess is not None:
+        image = normalize_image(image)
 
-    if isinstance(image, str):
-        image = Image.open(image)
-    elif not isinstance(image, Image.Image):
-        raise ValueError("Invalid image format. Image must be a path or a PIL image.")
+        def recognize(image):
+            return preprocess.recognize(
+                image, lambda processed: livetext_from_image(processed, language_preference, detail, unit, timeout)
+            )
 
-    if language_preference is not None and not isinstance(language_preference, list):
-        raise ValueError(
-            "Invalid language preference format. Language preference must be a list."
+        if cache is not None:
+            return cache.recognize(
+                image, recognize, **_cache_options("livetext", "accurate", language_preference, 0.0, detail, unit, preprocess)
+            )
+        return recognize(image)
+
+    if cache is not None:
+        _check_livetext_options(language_preference, unit)
+        # Keyed like the input itself (see `ocrmac.cache.keyed_input`), not like the bitmap handed to LiveText
+        return cache.recognize(
+            image,
+            lambda image: _livetext(_livetext_input(image, language_preference, unit), language_preference, detail, unit, timeout),
+            **_cache_options("livetext", "accurate", language_preference, 0.0, detail, unit)
         )
-    
-    if unit not in {"token", "line"}:
-        raise ValueError("Invalid unit. Must be 'token' or 'line'.")
+    return _livetext(_livetext_input(image, language_preference, unit), language_preference, detail, unit, timeout)
 
-    def pil2nsimage(pil_image: Image.Image):
-        image_bytes = io.BytesIO()
-        pil_image.save(image_bytes, format="TIFF")
-        ns_data = NSData.dataWithBytes_length_(
-            image_bytes.getvalue(), len(image_bytes.getvalue())
-        )
-        return NSImage.alloc().initWithData_(ns_data)
 
-    result = []
-    with objc.autorelease_pool():
-        ns_image = pil2nsimage(image)
-
-        # Initialize the image analyzer
-        analyzer = objc.lookUpClass("VKCImageAnalyzer").alloc().init()
-        request = (
-            objc.lookUpClass("VKCImageAnalyzerRequest")
-            .alloc()
-            .initWithImage_requestType_(ns_image, 1)  # VKAnalysisTypeText
-        )
+def _livetext(data, language_preference, detail, unit, timeout, pool=None):
+    if pool is None:
+        pool = _analyzer_pool()
 
-        # Set the language preference
-        if language_preference is not None:
-            request.setLocales_(language_preference)
+    analyzer = pool.get()
+    completed = False
+    try:
+        results, completed = _analyze(analyzer, data, language_preference, detail, unit, timeout)
+    finally:
+        # An analyzer that timed out may still deliver its result later, don't reuse it
+        pool.release(analyzer, reuse=completed)
+
+    if not completed:
+        # Raise instead of returning no text, so caches don't keep the empty result
+        raise TimeoutError(f"LiveText analysis did not complete within {timeout} seconds.")
+    return results
+
+
+def _analyze(analyzer, data, language_preference, detail, unit, timeout):
+    """Run one analysis, returns the results and whether the analysis completed"""
+    import objc
+    from CoreFoundation import CFRunLoopRunInMode, CFRunLoopStop, CFRunLoopGetCurrent, kCFRunLoopDefaultMode
+
+    analyses = []
+    errors = []
+    # The completion handler may be called on another thread, it must stop the run loop of this one
+    run_loop = CFRunLoopGetCurrent()
+    with objc.autorelease_pool():
+        request = _livetext_request(data, language_preference)
 
         # Analysis callback functions
         def process_handler(analysis, error):
             if error:
-                raise RuntimeError("Error during analysis: " + str(error))
+                errors.append(error)
             else:
-                lines = analysis.allLines()
-                if lines:
-                    for line in lines:
-                        if unit == 'line':
-                            line_text = line.string()
-                            if detail:
-                                bounding_box = line.quad().boundingBox()
-                                x, y = bounding_box.origin.x, bounding_box.origin.y
-                                w, h = bounding_box.size.width, bounding_box.size.height
-                                y = 1 - y - h  # align with Vision coordinate system
-                                result.append((line_text, 1.0, [x, y, w, h]))
-                            else:
-                                result.append(line_text)
-                        else:
-                            for char in line.children():
-                                char_text = char.string()
-                                if detail:
-                                    bounding_box = char.quad().boundingBox()
-                                    x, y = bounding_box.origin.x, bounding_box.origin.y
-                                    w, h = bounding_box.size.width, bounding_box.size.height
-                                    # More process on y, it differs from the vision framework
-                                    y = 1 - y - h
-                                    result.append((char_text, 1.0, [x, y, w, h]))
-                                else:
-                                    result.append(char_text)
-
-                CFRunLoopStop(CFRunLoopGetCurrent())
+                analyses.append(analysis)
+            CFRunLoopStop(run_loop)
 
         # Do the analysis
         analyzer.processRequest_progressHandler_completionHandler_(
             request, lambda progress: None, process_handler
         )
 
-        # Loops until the OCR is completed
-        CFRunLoopRunInMode(kCFRunLoopDefaultMode, 10.0, False)
+        # Loops until the OCR is completed. A stop that arrives before the loop runs is
+        # lost, so the loop runs in slices and checks for the result in between.
+        deadline = time.monotonic() + timeout
+        with instrument.stage("livetext_wait"):
+            while not analyses and not errors:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                CFRunLoopRunInMode(kCFRunLoopDefaultMode, min(remaining, 0.1), False)
+
+        if errors:
+            raise RuntimeError("Error during analysis: " + str(errors[0]))
+        if not analyses:
+            return [], False
+        return _livetext_results(analyses[0], detail, unit), True
+
+
+async def alivetext_from_image(image, language_preference=None, detail=True, unit='token', timeout=10.0, semaphore=None):
+    """
+    Asynchronous version of `livetext_from_image`.
+
+    The completion handler of VKCImageAnalyzer is bridged to an asyncio future, so
+    the event loop is not blocked and many analyses can run at the same time.
+
+    :param image: See `livetext_from_image`.
+    :param language_preference: Language preference. Defaults to None.
+    :param detail: Whether to return the bounding box or not. Defaults to True.
+    :param unit: 'token' (default) or 'line', see `livetext_from_image`.
+    :param timeout: Seconds to wait for the analysis. Defaults to 10.0.
+    :param semaphore: asyncio.Semaphore limiting the number of concurrent analyses.
+        Defaults to None (no limit).
+
+    :returns: Same format as `livetext_from_image`.
+    :raises asyncio.TimeoutError: If the analysis takes longer than `timeout`.
+    """
+    if semaphore is None:
+        return await _alivetext(image, language_preference, detail, unit, timeout)
+    async with semaphore:
+        return await _alivetext(image, language_preference, detail, unit, timeout)
+
+
+async def alivetext_from_images(images, language_preference=None, detail=True, unit='token', timeout=10.0, max_concurrency=4):
+    """
+    Run `alivetext_from_image` on many images, with at most `max_concurrency` analyses at once.
+
+    :returns: List with the results for each image, in input order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    return await asyncio.gather(
+        *(
+            alivetext_from_image(image, language_preference, detail, unit, timeout, semaphore)
+            for image in images
+        )
+    )
+
+
+async def _alivetext(image, language_preference, detail, unit, timeout):
+    import objc
+
+    data = _livetext_input(image, language_preference, unit)
+    pool = _analyzer_pool()
+
+    analyzer = pool.get()
+    completed = False
+    try:
+        # Autorelease pools are per thread, so they must not span an await
+        with objc.autorelease_pool():
+            request = _livetext_request(data, language_preference)
+
+        with instrument.stage("livetext_wait"):
+            analysis = await aio.analyze(analyzer, request, timeout=timeout, pump=_pump_run_loop)
+        completed = True
+    finally:
+        pool.release(analyzer, reuse=completed)
+
+    with objc.autorelease_pool():
+        return _livetext_results(analysis, detail, unit)
+
+
+def _pump_run_loop():
+    from CoreFoundation import CFRunLoopRunInMode, kCFRunLoopDefaultMode
+
+    # Deliver pending completion handlers scheduled on the current run loop
+    CFRunLoopRunInMode(kCFRunLoopDefaultMode, 0, True)
+
+
+def _livetext_input(image, language_preference, unit):
+    """Check the LiveText arguments and get the image data"""
+    _check_livetext_options(language_preference, unit)
+    image = normalize_image(image)
+
+    # Files are used as is, PIL images are written once as raw bitmap.
+    # PyObjC hands bytes to Objective-C as an NSData proxy, so no further copy is made.
+    return image2buf(image)
+
+
+@functools.lru_cache(maxsize=None)
+def _livetext_classes():
+    """The analyzer and request classes, looked up once"""
+    import objc
+
+    return objc.lookUpClass("VKCImageAnalyzer"), objc.lookUpClass("VKCImageAnalyzerRequest")
+
+
+def _new_analyzer():
+    # Creating an analyzer is expensive, they are reused through `_analyzer_pool`
+    analyzer_class, _ = _livetext_classes()
+    return analyzer_class.alloc().init()
+
+
+@functools.lru_cache(maxsize=None)
+def _analyzer_pool():
+    """Warm analyzers shared by all LiveText calls that don't bring their own pool"""
+    return Pool(_new_analyzer, max_idle=4)
+
+
+def _check_livetext_options(language_preference, unit):
+    if not _livetext_available():
+        raise ImportError(
+            "Invalid framework selected, Livetext is not available. \
+            Please makesure your system is running MacOS Sonoma or later, and essential packages are installed."
+        )
+
+    if language_preference is not None and not isinstance(language_preference, list):
+        raise ValueError(
+            "Invalid language preference format. Language preference must be a list."
+        )
+
+    if unit not in {"token", "line"}:
+        raise ValueError("Invalid unit. Must be 'token' or 'line'.")
+
+
+def _livetext_request(data, language_preference):
+    with instrument.stage("handler"):
+        return _build_livetext_request(data, language_preference)
+
+
+def _build_livetext_request(data, language_preference):
+    from AppKit import NSImage
+
+    ns_image = NSImage.alloc().initWithData_(data)
+
+    _, request_class = _livetext_classes()
+    request = request_class.alloc().initWithImage_requestType_(ns_image, 1)  # VKAnalysisTypeText
+
+    # Set the language preference
+    if language_preference is not None:
+        request.setLocales_(language_preference)
+
+    return request
+
 
-    return result
+def _livetext_results(analysis, detail, unit):
+    with instrument.stage("marshal"):
+        return _marshal_livetext(analysis, detail, unit)
+
+
+def _marshal_livetext(analysis, detail, unit):
+    if unit == "structured":
+        return _marshal_livetext_structured(analysis)
+
+    texts, boxes = [], []
+    lines = analysis.allLines()
+    if lines:
+        for line in lines:
+            items = [line] if unit == 'line' else line.children()
+            for item in items:
+                texts.append(item.string())
+                if detail:
+                    boxes.append(_quad_box(item))
+
+    if not detail:
+        return texts
+
+    # LiveText has the origin in the top-left corner, align with the Vision coordinate system
+    boxes = flip_y_batch(boxes).tolist()
+    return [(text, 1.0, bbox) for text, bbox in zip(texts, boxes)]
+
+
+def _quad_box(item):
+    bounding_box = item.quad().boundingBox()
+    return (
+        bounding_box.origin.x, bounding_box.origin.y,
+        bounding_box.size.width, bounding_box.size.height,
+    )
+
+
+def _marshal_livetext_structured(analysis):
+    """Lines and their tokens from a single traversal of the analysis"""
+    line_texts, line_boxes = [], []
+    token_texts, token_boxes = [], []
+    offsets = [0]
+    for line in analysis.allLines() or []:
+        line_texts.append(line.string())
+        line_boxes.append(_quad_box(line))
+        for token in line.children():
+            token_texts.append(token.string())
+            token_boxes.append(_quad_box(token))
+        offsets.append(len(token_texts))
+
+    # LiveText has the origin in the top-left corner, align with the Vision coordinate system
+    lines = OCRResult(line_texts, np.ones(len(line_texts)), flip_y_batch(line_boxes))
+    tokens = OCRResult(token_texts, np.ones(len(token_texts)), flip_y_batch(token_boxes))
+    return StructuredResult(tokens, lines, offsets)
+
+
+class LiveTextEngine:
+    """Reusable backend for VKCImageAnalyzer from Apple's LiveText framework.
+
+    Creating an analyzer loads its models, so analyzers are kept in a pool and reused
+    for later images instead of creating one per image. The pool hands each concurrent
+    call its own analyzer, so an engine can be shared by several threads. Analyzers
+    whose analysis timed out are dropped instead of being reused.
+
+    Args:
+        language_preference (list, optional): Language preference. Defaults to None.
+        detail (bool, optional): Whether to return the bounding box or not. Defaults to True.
+        unit (str, optional): 'token' or 'line', see `livetext_from_image`. Defaults to 'token'.
+        timeout (float, optional): Seconds to wait for an analysis. Defaults to 10.0.
+        pool (Pool, optional): `ocrmac.pool.Pool` of analyzers. Defaults to the pool
+            shared by all LiveText calls.
+    """
+
+    def __init__(self, language_preference=None, detail=True, unit="token", timeout=10.0, pool=None):
+        _check_livetext_options(language_preference, unit)
+
+        self.language_preference = language_preference
+        self.detail = detail
+        self.unit = unit
+        self.timeout = timeout
+        self.pool = pool if pool is not None else _analyzer_pool()
+
+    def recognize(self, image):
+        """Run the analysis on a single image, returns the same format as `livetext_from_image`"""
+        data = image2buf(image)
+        return _livetext(data, self.language_preference, self.detail, self.unit, self.timeout, pool=self.pool)
+
+
+def create_engine(framework="vision", recognition_level="accurate", language_preference=None, confidence_threshold=0.0, detail=True, unit="token", timeout=10.0):
+    """Create the engine registered for a framework, the options are validated once here.
+
+    See `ocrmac.engines` for the registered engines and how to add one.
+    """
+    return engines.create_engine(
+        framework,
+        recognition_level=recognition_level,
+        language_preference=language_preference,
+        confidence_threshold=confidence_threshold,
+        detail=detail,
+        unit=unit,
+        timeout=timeout,
+    )
 
 
 class OCR:
-    def __init__(self, image, framework="vision", recognition_level="accurate", language_preference=None, confidence_threshold=0.0, detail=True, unit='token'):
+    def __init__(self, image, framework="vision", recognition_level="accurate", language_preference=None, confidence_threshold=0.0, detail=True, unit='token', engine=None, cache=None, tile_size=None, overlap=0, tile_workers=1, preprocess=None, regions=None, dedupe=None, timeout=10.0):
         """OCR class to extract text from images.
 
         Args:
-            image (str or PIL image): Path to image or PIL image.
-            framework (str, optional): Framework to use. Defaults to 'vision'.
+            image: Path to image (str or pathlib.Path), encoded image data (bytes),
+                file-like object, numpy array or PIL image. Files are not decoded
+                unless pixel data is needed, e.g. for the annotate functions.
+            framework (str, optional): Name of a registered engine, e.g. 'vision', 'livetext'
+                or 'stub', see `ocrmac.engines`. Defaults to 'vision'.
             recognition_level (str, optional): Recognition level. Defaults to 'accurate'.
             language_preference (list, optional): Language preference. Defaults to None.
             param confidence_threshold: Confidence threshold. Defaults to 0.0.
@@ -300,33 +711,54 @@ class OCR:
             unit (str, optional): LiveText-only flat output granularity.
                 'token' (default) returns fine-grained children, 'line' returns
                 one entry per line. Ignored for Vision.
+            engine (optional): Engine to run instead of the selected framework.
+                Any object with a `recognize(image)` method works. Defaults to None.
+            cache (ResultCache, optional): `ocrmac.cache.ResultCache` to look up and store
+                the results. Defaults to None.
+            tile_size (int or tuple, optional): Split the image into tiles of this size in
+                pixels and OCR them separately, for very large images that would otherwise
+                be downscaled by the framework. Defaults to None (no tiling).
+            overlap (int, optional): Overlap of neighbouring tiles in pixels, should be
+                larger than the text height. Duplicates in the overlap are merged. Defaults to 0.
+            tile_workers (int or WorkerPool, optional): Number of processes to OCR the tiles
+                in parallel. Every `recognize` call then starts the processes and their
+                engines, which can cost more than it saves for a single image. Pass an
+                `ocrmac.parallel.WorkerPool` configured like this OCR to reuse warm workers
+                across calls. Ignored when an engine is passed. Defaults to 1.
+            preprocess (Preprocessor or dict, optional): Downscale, convert or crop the image
+                before the OCR, see `ocrmac.preprocess.Preprocessor`. Bounding boxes still
+                refer to the original image. Defaults to None.
+            regions (list, optional): Only OCR these regions, a list of normalized
+                (x, y, width, height) in the coordinates of the bounding boxes. Vision runs
+                all regions in one pass, other frameworks and engines OCR a crop per region.
+                Can't be combined with tiling or a cropping preprocess. Defaults to None.
+            dedupe (NearDuplicateIndex, optional): `ocrmac.phash.NearDuplicateIndex` to
+                reuse the results of near-duplicate images, e.g. screenshots that differ
+                only by a blinking cursor. Defaults to None.
+            timeout (float, optional): LiveText-only, seconds to wait for an analysis
+                before `TimeoutError` is raised. Defaults to 10.0.
         """
 
-        if isinstance(image, str):
-            image = Image.open(image)
-        elif not isinstance(image, Image.Image):
-            raise ValueError(
-                "Invalid image format. Image must be a path or a PIL image."
-            )
-        
-        if framework not in {"vision", "livetext"}:
-            raise ValueError("Invalid framework selected. Framework must be 'vision' or 'livetext'.")
-        
-        if framework == 'livetext':
-            sig = inspect.signature(self.__init__)
+        image = normalize_image(image)
+        engines.check_options(
+            framework,
+            recognition_level=recognition_level,
+            language_preference=language_preference,
+            confidence_threshold=confidence_threshold,
+            detail=detail,
+            unit=unit,
+            timeout=timeout,
+        )
 
-            default_recognition_level = sig.parameters['recognition_level'].default
-            default_confidence_threshold = sig.parameters['confidence_threshold'].default
+        if tile_size is not None and not detail:
+            raise ValueError("Tiled OCR needs bounding boxes, please set detail=True.")
 
-            if recognition_level != default_recognition_level:
-                raise ValueError(f"Recognition level is not supported for Livetext framework. Please use the default value `{default_recognition_level}` or don't pass an argument.")
-            if confidence_threshold != default_confidence_threshold:
-                raise ValueError(f"Confidence threshold is not supported for Livetext framework. Please use the default value `{default_confidence_threshold}` or don't pass an argument.")
-            
-            if unit not in {"token", "line"}:
-                raise ValueError("Invalid unit. Must be 'token' or 'line'.")
+        preprocess = make_preprocessor(preprocess)
+        regions = check_region_options(regions, preprocess, tile_size)
 
-        self.image = image
+        self.source = image
+        self._image = None
+        self._size = None
         self.framework = framework
         self.recognition_level = recognition_level
         self.language_preference = language_preference
@@ -334,97 +766,330 @@ class OCR:
         self.res = None
         self.detail = detail
         self.unit = unit
+        self.engine = engine
+        self.cache = cache
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.tile_workers = tile_workers
+        self.preprocess = preprocess
+        self.regions = regions
+        self.dedupe = dedupe
+        self.timeout = timeout
+
+    @property
+    def image(self) -> Image.Image:
+        """The decoded PIL image, loaded on first access"""
+        if self._image is None:
+            self._image = open_image(self.source)
+        return self._image
+
+    @image.setter
+    def image(self, image):
+        self.source = normalize_image(image)
+        self._image = None
+        self._size = None
+
+    @property
+    def size(self):
+        """(width, height) of the image, read from the file header if not decoded yet"""
+        if self._size is None:
+            if self._image is not None:
+                self._size = self._image.size
+            else:
+                self._size = image_size(self.source)
+        return self._size
 
     def recognize(
-        self, px=False
+        self, px=False, columnar=False, structured=False
     ) -> List[Tuple[str, float, Tuple[float, float, float, float]]]:
-        if self.framework == "vision":
-            res = text_from_image(
-                self.image, self.recognition_level, self.language_preference, self.confidence_threshold, detail=self.detail
-            )
-        elif self.framework == "livetext":
-            res = livetext_from_image(
-                self.image, self.language_preference, detail=self.detail, unit=self.unit
-            )
+        """Run the OCR on the image.
+
+        Args:
+            px (bool, optional): Whether to return the bounding boxes in pixels. Defaults to False.
+            columnar (bool, optional): Return an `OCRResult` backed by NumPy arrays instead
+                of a list, use `OCRResult.to_pixels` for pixel coordinates. Defaults to False.
+            structured (bool, optional): Return a `StructuredResult` with lines, their tokens
+                and paragraphs. LiveText lines and tokens are read from one analysis, other
+                results are grouped into lines by geometry. Defaults to False.
+        """
+        if px and (columnar or structured):
+            raise ValueError("px is not supported with columnar or structured results, please use OCRResult.to_pixels.")
+
+        if structured:
+            return self._recognize_structured()
+
+        if self.cache is not None:
+            res = self.cache.recognize(self.source, self._recognize_deduplicated, **self._cache_options())
         else:
-            raise ValueError("Invalid framework selected. Framework must be 'vision' or 'livetext'.")
+            res = self._recognize_deduplicated(self.source)
+
+        if columnar:
+            self.res = res
+            return OCRResult.from_list(res)
+        return self._finish(res, px)
+
+    def _recognize_structured(self):
+        if not self.detail:
+            raise ValueError("Structured results need bounding boxes, please set detail=True.")
+
+        plain = (
+            self.tile_size is None and self.regions is None and self.preprocess is None and self.cache is None and self.dedupe is None
+        )
+        if self.engine is None and self.framework == "livetext" and plain:
+            data = _livetext_input(self.source, self.language_preference, self.unit)
+            structured = _livetext(data, self.language_preference, True, "structured", self.timeout)
+            self.res = structured.tokens.to_list()
+            return structured
+
+        return StructuredResult.from_results(self.recognize())
+
+    async def arecognize(
+        self, px=False, timeout=None, semaphore=None
+    ) -> List[Tuple[str, float, Tuple[float, float, float, float]]]:
+        """Asynchronous version of `recognize`.
+
+        LiveText is awaited without blocking the event loop, see `alivetext_from_image`.
+        Vision, custom engines and LiveText with tiles, regions or dedupe are synchronous
+        and run in the default executor.
+
+        Args:
+            px (bool, optional): Whether to return the bounding boxes in pixels. Defaults to False.
+            timeout (float, optional): Seconds to wait for a LiveText analysis. Defaults to
+                None, the timeout of the OCR.
+            semaphore (asyncio.Semaphore, optional): Limits concurrent LiveText analyses. Defaults to None.
+        """
+        native = self.tile_size is None and self.regions is None and self.dedupe is None
+        if self.engine is None and self.framework == "livetext" and native:
+            if timeout is None:
+                timeout = self.timeout
+            image, key, res = self.source, None, None
+            if self.cache is not None:
+                # Same key as `recognize`, e.g. PIL images are keyed by their pixels, not by image2buf
+                image, key = keyed_input(image, **self._cache_options())
+                res = self.cache.get(key)
+            if res is None:
+                res = await self._alivetext(image, timeout, semaphore)
+                if key is not None:
+                    self.cache.put(key, res)
+            return self._finish(res, px)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.recognize, px)
+
+    async def _alivetext(self, image, timeout, semaphore):
+        if self.preprocess is not None:
+            image = open_image(image)
+            processed, crop = self.preprocess(image)
+            res = await alivetext_from_image(
+                processed, self.language_preference, detail=self.detail, unit=self.unit, timeout=timeout, semaphore=semaphore
+            )
+            return self.preprocess.restore(res, crop, image.width, image.height)
+
+        return await alivetext_from_image(
+            image, self.language_preference, detail=self.detail, unit=self.unit, timeout=timeout, semaphore=semaphore
+        )
+
+    def _recognize_deduplicated(self, image):
+        if self.dedupe is None:
+            return self._recognize(image)
+        return self.dedupe.recognize(image, self._recognize, **self._cache_options())
+
+    def _recognize(self, image):
+        if self.preprocess is not None:
+            return self.preprocess.recognize(image, self._recognize_image)
+        return self._recognize_image(image)
+
+    def _recognize_image(self, image):
+        if self.tile_size is not None:
+            return self._recognize_tiled(image)
+        if self.regions is not None and (self.engine is not None or not engines.supports(self.framework, "regions")):
+            # Crop the regions for engines without native support
+            return recognize_regions(image, self._recognize_full, self.regions)
+        return self._recognize_full(image)
+
+    def _recognize_full(self, image):
+        if self.engine is not None:
+            return self.engine.recognize(image)
+
+        options = self._engine_options()
+        framework = options.pop("framework")
+        if self.regions is not None and engines.supports(framework, "regions"):
+            options["regions"] = self.regions
+        return engines.shared_engine(framework, **options).recognize(image)
+
+    def _engine_options(self):
+        return dict(
+            framework=self.framework,
+            recognition_level=self.recognition_level,
+            language_preference=self.language_preference,
+            confidence_threshold=self.confidence_threshold,
+            detail=self.detail,
+            unit=self.unit,
+            timeout=self.timeout,
+        )
+
+    def _recognize_tiled(self, image):
+        if self.engine is None and isinstance(self.tile_workers, parallel.WorkerPool):
+
+            def tile_map(_, tiles):
+                return (res for _, res in self.tile_workers.recognize(tiles))
+
+            return recognize_tiled(image, None, self.tile_size, self.overlap, map=tile_map)
+
+        if self.engine is None and self.tile_workers > 1:
+            engine_factory = functools.partial(parallel.default_engine, **self._engine_options())
+
+            def tile_map(_, tiles):
+                results = parallel.parallel_recognize(tiles, workers=self.tile_workers, engine_factory=engine_factory)
+                return (res for _, res in results)
+
+            return recognize_tiled(image, None, self.tile_size, self.overlap, map=tile_map)
 
+        engine = self.engine
+        if engine is None:
+            engine = create_engine(**self._engine_options())
+        return recognize_tiled(image, engine.recognize, self.tile_size, self.overlap)
+
+    def _cache_options(self):
+        options = _cache_options(
+            _engine_key(self.framework, self.engine), self.recognition_level, self.language_preference, self.confidence_threshold, self.detail, self.unit, self.preprocess, self.regions
+        )
+        if self.tile_size is not None:
+            options.update(tile_size=self.tile_size, overlap=self.overlap)
+        return options
+
+    def _finish(self, res, px):
         self.res = res
-        
+
         if px:
-            return [(text, conf, convert_coordinates_pil(bbox, self.image.width, self.image.height)) for text, conf, bbox in res]
+            width, height = self.size
+            return _to_pixels(res, width, height)
 
         else:
             return res
 
+    @classmethod
+    def recognize_batch(
+        cls, images, framework="vision", recognition_level="accurate", language_preference=None, confidence_threshold=0.0, detail=True, unit='token', px=False, engine=None, dedupe=None
+    ):
+        """Recognize text in many images with a single engine.
+
+        The options are validated once and the configured engine (e.g. one
+        VNRecognizeTextRequest) is reused for every image.
+
+        Args:
+            images (iterable): Images, see `OCR` for the supported inputs.
+            px (bool, optional): Whether to return the bounding boxes in pixels. Defaults to False.
+            engine (optional): Engine to use instead of creating one for the framework. Defaults to None.
+            dedupe (NearDuplicateIndex, optional): Reuse the results of near-duplicate
+                images, see `OCR`. Defaults to None.
+            The remaining arguments are the same as for `OCR`.
+
+        Yields:
+            list: The results for each image, in input order.
+        """
+        if dedupe is not None:
+            options = _cache_options(
+                _engine_key(framework, engine), recognition_level, language_preference, confidence_threshold, detail, unit
+            )
+        if engine is None:
+            engine = create_engine(framework, recognition_level, language_preference, confidence_threshold, detail, unit)
+
+        recognize = engine.recognize
+        if dedupe is not None:
+            recognize = functools.partial(dedupe.recognize, recognize=engine.recognize, **options)
+        return cls._iter_batch(images, recognize, px)
+
+    @staticmethod
+    def _iter_batch(images, recognize, px):
+        for image in images:
+            image = normalize_image(image)
+            res = recognize(image)
+            if px:
+                width, height = image_size(image)
+                res = _to_pixels(res, width, height)
+            yield res
+
     def annotate_matplotlib(
-        self, figsize=(20, 20), color="red", alpha=0.5, fontsize=12
+        self, figsize=(20, 20), color="red", alpha=0.5, fontsize=12, texts=True, pyplot=True
     ):
-        """_summary_
+        """Draw the image with bounding boxes and texts into a matplotlib figure.
+
+        Runs `recognize` first if there are no results yet.
 
         Args:
-            figsize (tuple, optional): _description_. Defaults to (20,20).
-            color (str, optional): _description_. Defaults to 'red'.
-            alpha (float, optional): _description_. Defaults to 0.5.
-            fontsize (int, optional): _description_. Defaults to 12.
+            figsize (tuple, optional): Figure size in inches. Defaults to (20,20).
+            color (str, optional): Color of boxes and texts. Defaults to 'red'.
+            alpha (float, optional): Opacity of the image. Defaults to 0.5.
+            fontsize (int, optional): Font size. Defaults to 12.
+            texts (bool, optional): Draw the texts, leaving them out is much faster for
+                thousands of boxes. Defaults to True.
+            pyplot (bool, optional): Create the figure with pyplot, so that `plt.show`
+                displays it. Pyplot keeps every figure until it is closed, in long-running
+                processes use pyplot=False or `annotate_png`. Defaults to True.
 
         Returns:
-            _type_: _description_
+            matplotlib.figure.Figure: The figure.
 
         """
-        if not MATPLOTLIB_AVAILABLE:
-            raise ImportError(
-                "Matplotlib is not available. Please install matplotlib to use this feature."
-            )
-        
+        figure = None
+        if pyplot:
+            _check_matplotlib()
+            import matplotlib.pyplot as plt
+
+            figure = plt.figure(figsize=figsize)
+        return self._annotate_figure(figsize, color, alpha, fontsize, texts, figure)
+
+    def annotate_png(self, figsize=(20, 20), color="red", alpha=0.5, fontsize=12, texts=True, dpi=None) -> bytes:
+        """Render the matplotlib annotation straight to PNG bytes, without pyplot.
+
+        Args:
+            figsize, color, alpha, fontsize, texts: See `annotate_matplotlib`.
+            dpi (float, optional): Resolution in dots per inch. Defaults to None (100).
+
+        Returns:
+            bytes: The encoded PNG.
+        """
+        return figure_to_png(self._annotate_figure(figsize, color, alpha, fontsize, texts), dpi)
+
+    def _annotate_figure(self, figsize, color, alpha, fontsize, texts, figure=None):
+        _check_matplotlib()
         if not self.detail:
             raise ValueError("Please set detail=True to use this feature.")
 
         if self.res is None:
             self.recognize()
 
-        fig, ax = plt.subplots(figsize=figsize)
-        ax.imshow(self.image, alpha=alpha)
-        for _ in self.res:
-            text, conf, bbox = _
-            x1, y1, x2, y2 = convert_coordinates_pyplot(
-                bbox, self.image.width, self.image.height
-            )
-            rect = patches.Rectangle(
-                (x1, y1), x2, y2, linewidth=1, edgecolor=color, facecolor="none"
-            )
-            plt.text(x1, y1, text, fontsize=fontsize, color=color)
-            ax.add_patch(rect)
+        return annotate_figure(self.image, self.res, figsize, color, alpha, fontsize, texts, figure)
 
-        return fig
+    def annotate_PIL(self, color="red", fontsize=12, max_size=None, font=DEFAULT_FONT, fallback_font=None) -> Image.Image:
+        """Draw the bounding boxes and texts onto a copy of the image.
 
-    def annotate_PIL(self, color="red", fontsize=12) -> Image.Image:
-        """_summary_
+        Runs `recognize` first if there are no results yet.
 
         Args:
-            color (str, optional): _description_. Defaults to 'red'.
-            fontsize (int, optional): _description_. Defaults to 12.
+            color (str, optional): Color of boxes and texts. Defaults to 'red'.
+            fontsize (int, optional): Font size. Defaults to 12.
+            max_size (int, optional): Draw onto a preview whose long edge is at most this
+                many pixels, instead of a full-resolution copy. Defaults to None.
+            font (str, optional): Font file or name, fonts are loaded once per size.
+                Defaults to 'Arial Unicode.ttf'.
+            fallback_font (str, optional): Font used if `font` is not available, e.g. on
+                Linux. Defaults to None (the font bundled with Pillow).
 
         Returns:
-            _type_: _description_
+            Image.Image: The annotated image.
         """
         
         if not self.detail:
             raise ValueError("Please set detail=True to use this feature.")
 
-        annotated_image = self.image.copy()
-
         if self.res is None:
             self.recognize()
 
-        draw = ImageDraw.Draw(annotated_image)
-        font = ImageFont.truetype("Arial Unicode.ttf", fontsize)
-
-        for text, conf, bbox in self.res:
-            x1, y1, x2, y2 = convert_coordinates_pil(
-                bbox, annotated_image.width, annotated_image.height
-            )
-            draw.rectangle((x1, y1, x2, y2), outline=color)
-            draw.text((x1, y2), text, font=font, align="left", fill=color)
+        if max_size is not None:
+            annotated_image = preview_image(self._image if self._image is not None else self.source, max_size)
+        else:
+            annotated_image = self.image.copy()
 
-        return annotated_image
+        return annotate_image(annotated_image, self.res, color, fontsize, font, fallback_font)
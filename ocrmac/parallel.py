@@ -0,0 +1,216 @@
+"""Process pool runner to OCR many images in parallel.
+
+Starting the worker processes and creating their engines costs more than
+recognizing a few images. `parallel_recognize` starts a pool for each call, keep a
+`WorkerPool` to reuse the warm workers for many calls.
+"""
+
+import concurrent.futures
+import functools
+import itertools
+import os
+from collections import deque
+
+from .images import normalize_image
+
+# Engine of the current worker process, created once by `_init_worker`
+_engine = None
+_engine_error = None
+
+
+def default_engine(**options):
+    """Engine factory used by the workers unless another one is passed.
+
+    Takes the same keyword arguments as `ocrmac.create_engine`.
+    """
+    from .ocrmac import create_engine
+
+    return create_engine(**options)
+
+
+def _init_worker(engine_factory):
+    global _engine, _engine_error
+    try:
+        _engine = engine_factory()
+    except Exception as e:
+        # Re-raised with the first chunk, a failing initializer would only break the pool
+        _engine_error = e
+
+
+def _run_chunk(chunk):
+    if _engine_error is not None:
+        raise _engine_error
+
+    results = []
+    for input_id, image in chunk:
+        try:
+            results.append((input_id, _engine.recognize(image), None))
+        except Exception as e:
+            results.append((input_id, None, e))
+    return results
+
+
+def _with_ids(images):
+    for index, item in enumerate(images):
+        if isinstance(item, tuple):
+            input_id, image = item
+        else:
+            image = item
+            input_id = None
+        image = normalize_image(image)
+        if input_id is None:
+            input_id = image if isinstance(image, str) else index
+        yield input_id, image
+
+
+def _chunked(items, chunksize):
+    while True:
+        chunk = list(itertools.islice(items, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _engine_factory(engine_factory, options):
+    if engine_factory is None:
+        return functools.partial(default_engine, **options)
+    if options:
+        raise ValueError("Options can't be combined with an engine_factory.")
+    return engine_factory
+
+
+class WorkerPool:
+    """Worker processes with warm engines, reused by many calls of `parallel_recognize`.
+
+    Each worker creates its engine once when the pool starts. Pass the pool as `pool`
+    to `parallel_recognize` or as `tile_workers` to `ocrmac.OCR`, and close it when
+    done (or use it as context manager).
+
+    Args:
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        engine_factory (callable, optional): Picklable callable without arguments that
+            creates the engine in each worker. Defaults to `default_engine` called with `options`.
+        mp_context (optional): Multiprocessing context for the pool. Defaults to None.
+        options: Options for `default_engine`, e.g. framework or recognition_level.
+    """
+
+    def __init__(self, workers=None, engine_factory=None, mp_context=None, **options):
+        engine_factory = _engine_factory(engine_factory, options)
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            self.workers, mp_context=mp_context, initializer=_init_worker, initargs=(engine_factory,)
+        )
+
+    def recognize(self, images, ordered=True, chunksize=1, max_in_flight=None, errors="raise"):
+        """`parallel_recognize` on the workers of this pool"""
+        return parallel_recognize(
+            images, ordered=ordered, chunksize=chunksize, max_in_flight=max_in_flight, errors=errors, pool=self
+        )
+
+    def close(self):
+        """Stop the workers, running calls are cancelled"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def parallel_recognize(
+    images, workers=None, ordered=True, chunksize=1, max_in_flight=None, errors="raise", engine_factory=None, mp_context=None, pool=None, **options
+):
+    """
+    Run OCR on many images with a pool of worker processes.
+
+    Each worker creates its engine once (e.g. the configured VNRecognizeTextRequest)
+    and reuses it for all images it processes. Images are read lazily from `images`,
+    at most `max_in_flight` of them are submitted and not yet yielded at any time.
+
+    :param images: Iterable of images or (input_id, image) tuples.
+        Paths are used as id if none is given, otherwise the position in the input.
+    :param workers: Number of worker processes. Defaults to the number of CPUs.
+    :param ordered: Yield results in input order. With False results are yielded
+        as soon as they are done. Defaults to True.
+    :param chunksize: Number of images sent to a worker at once. Defaults to 1.
+    :param max_in_flight: Maximum number of images submitted but not yet yielded.
+        Defaults to 2 * workers * chunksize.
+    :param errors: 'raise' to re-raise the first error of an image, 'return' to
+        yield the exception in place of the results. Defaults to 'raise'.
+    :param engine_factory: Picklable callable without arguments that creates the
+        engine in each worker. Defaults to `default_engine` called with `options`.
+    :param mp_context: Multiprocessing context for the pool. Defaults to None.
+    :param pool: `WorkerPool` to run on. Its workers and engines are reused and it
+        stays open, workers, engine_factory, mp_context and options must not be
+        given. Defaults to None, a pool is started for this call.
+    :param options: Options for `default_engine`, e.g. framework or recognition_level.
+
+    :returns: Generator yielding (input_id, results) tuples.
+    """
+    if errors not in {"raise", "return"}:
+        raise ValueError("Invalid errors. Must be 'raise' or 'return'.")
+
+    if chunksize < 1:
+        raise ValueError("Invalid chunksize. Must be at least 1.")
+
+    if pool is not None:
+        if workers is not None or engine_factory is not None or mp_context is not None or options:
+            raise ValueError("Worker options can't be combined with a pool, pass them to the WorkerPool.")
+        workers = pool.workers
+    else:
+        engine_factory = _engine_factory(engine_factory, options)
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+    if max_in_flight is None:
+        max_in_flight = 2 * workers * chunksize
+
+    return _run(
+        _with_ids(images), pool, workers, engine_factory, mp_context, ordered, chunksize, max_in_flight, errors
+    )
+
+
+def _run(items, worker_pool, workers, engine_factory, mp_context, ordered, chunksize, max_in_flight, errors):
+    chunks = _chunked(items, chunksize)
+    max_chunks = max(1, max_in_flight // chunksize)
+
+    owned = worker_pool is None
+    if owned:
+        worker_pool = WorkerPool(workers, engine_factory, mp_context)
+    pool = worker_pool._executor
+    pending = deque()
+
+    def submit():
+        chunk = next(chunks, None)
+        if chunk is not None:
+            pending.append(pool.submit(_run_chunk, chunk))
+
+    try:
+        for _ in range(max_chunks):
+            submit()
+
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                future = next(f for f in pending if f in done)
+                pending.remove(future)
+
+            for input_id, res, err in future.result():
+                if err is not None:
+                    if errors == "raise":
+                        raise err
+                    res = err
+                yield input_id, res
+
+            # Only now the images of the chunk are yielded, submitting earlier would exceed max_in_flight
+            submit()
+    finally:
+        if owned:
+            worker_pool.close()
+        else:
+            # Leave the shared workers to the next call
+            for future in pending:
+                future.cancel()
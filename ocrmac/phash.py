@@ -0,0 +1,342 @@
+"""Near-duplicate detection with perceptual hashes.
+
+Screenshots of the same page that differ only by a blinking cursor or a changed
+timestamp have different bytes, so `ocrmac.cache.ResultCache` misses them, but almost
+identical difference hashes (dHash). `NearDuplicateIndex` finds earlier images
+within a Hamming distance, so their results can be reused instead of running the
+OCR again.
+
+Two search structures are available: `MultiIndexHash` answers queries for a fixed
+maximum distance with a few dict lookups and is what the index uses, `BKTree`
+answers queries for any distance but visits many more entries.
+"""
+
+import io
+import json
+import threading
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+from .images import normalize_image
+
+Match = namedtuple("Match", ["key", "distance", "results"])
+
+POLICIES = {"reuse", "ocr"}
+
+if hasattr(int, "bit_count"):
+
+    def hamming(a, b):
+        """Number of differing bits of two hashes"""
+        return (a ^ b).bit_count()
+
+else:  # Python < 3.10
+
+    def hamming(a, b):
+        """Number of differing bits of two hashes"""
+        return bin(a ^ b).count("1")
+
+
+def dhash(image, hash_size=8):
+    """
+    Difference hash of an image.
+
+    The image is reduced to (hash_size + 1) x hash_size gray pixels and every bit
+    tells whether a pixel is brighter than its right neighbour. Small local changes
+    flip few bits, so similar images have a small Hamming distance.
+
+    :param image: Image input, see `ocrmac.text_from_image`. JPEGs are decoded at
+        reduced size.
+    :param hash_size: Rows of the hash, the hash has hash_size ** 2 bits. Defaults to 8.
+
+    :returns: The hash as int.
+    """
+    image = normalize_image(image)
+    size = (hash_size + 1, hash_size)
+    if isinstance(image, Image.Image):
+        small = _shrink(image, size)
+    else:
+        with Image.open(io.BytesIO(image) if isinstance(image, bytes) else image) as opened:
+            opened.draft("L", (size[0] * 8, size[1] * 8))
+            small = _shrink(opened, size)
+
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    # packbits pads to whole bytes, drop the padding so the hash has exactly hash_size ** 2 bits
+    return int.from_bytes(np.packbits(bits).tobytes(), "big") >> (-bits.size % 8)
+
+
+def _shrink(image, size):
+    if image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("L")  # e.g. palette images can't be resized with BOX
+    # Shrinking first is cheaper than converting all pixels, reducing_gap lets PIL reduce by whole factors
+    return image.resize(size, Image.BOX, reducing_gap=2.0).convert("L")
+
+
+class BKTree:
+    """BK-tree of integer hashes for nearest-neighbour search by Hamming distance.
+
+    Every child of a node is stored under its distance to the node. By the triangle
+    inequality, a search within `max_distance` of a hash at distance d from a node
+    only needs the children stored under d - max_distance to d + max_distance.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self):
+        self._root = None  # [hash, value, {distance: child}]
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, hash, value):
+        """Insert a hash with a value, e.g. the key of the image"""
+        self._size += 1
+        node = [hash, value, {}]
+        if self._root is None:
+            self._root = node
+            return
+
+        current = self._root
+        while True:
+            distance = hamming(hash, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, hash, max_distance):
+        """
+        All entries within `max_distance` of a hash.
+
+        :returns: List of (distance, hash, value), sorted by distance.
+        """
+        found = []
+        if self._root is None:
+            return found
+
+        stack = [self._root]
+        while stack:
+            node_hash, value, children = stack.pop()
+            distance = hamming(hash, node_hash)
+            if distance <= max_distance:
+                found.append((distance, node_hash, value))
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for d, child in children.items() if low <= d <= high)
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, hash, max_distance):
+        """The closest entry within `max_distance` as (distance, hash, value), None if there is none"""
+        found = self.search(hash, max_distance)
+        return found[0] if found else None
+
+
+class MultiIndexHash:
+    """Multi-index hashing for Hamming distance queries up to a fixed distance.
+
+    The hashes are split into max_distance + 1 substrings with one dict per
+    substring. Two hashes within max_distance differ in at most max_distance
+    substrings, so they share at least one substring exactly, and only the entries
+    stored under one of the substrings of a query need to be compared.
+
+    Args:
+        bits (int, optional): Number of bits of the hashes. Defaults to 64.
+        max_distance (int, optional): Largest distance that can be searched. Defaults to 4.
+    """
+
+    __slots__ = ("bits", "max_distance", "_parts", "_tables", "_entries")
+
+    def __init__(self, bits=64, max_distance=4):
+        if not 0 <= max_distance < bits:
+            raise ValueError("Invalid max_distance. Must be at least 0 and less than bits.")
+
+        self.bits = bits
+        self.max_distance = max_distance
+        count = max_distance + 1
+        bounds = [bits * i // count for i in range(count + 1)]
+        self._parts = [(low, (1 << (high - low)) - 1) for low, high in zip(bounds[:-1], bounds[1:])]
+        self._tables = [{} for _ in self._parts]
+        self._entries = []  # (hash, value)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, hash, value):
+        """Insert a hash with a value, e.g. the key of the image"""
+        index = len(self._entries)
+        self._entries.append((hash, value))
+        for (shift, mask), table in zip(self._parts, self._tables):
+            bucket = table.get((hash >> shift) & mask)
+            if bucket is None:
+                table[(hash >> shift) & mask] = [index]
+            else:
+                bucket.append(index)
+
+    def search(self, hash, max_distance=None):
+        """
+        All entries within `max_distance` of a hash.
+
+        :param max_distance: Defaults to None, the max_distance of the index.
+
+        :returns: List of (distance, hash, value), sorted by distance.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        elif max_distance > self.max_distance:
+            raise ValueError(f"Invalid max_distance. The index supports up to {self.max_distance}.")
+
+        candidates = set()
+        for (shift, mask), table in zip(self._parts, self._tables):
+            bucket = table.get((hash >> shift) & mask)
+            if bucket:
+                candidates.update(bucket)
+
+        found = []
+        for index in candidates:
+            entry_hash, value = self._entries[index]
+            distance = hamming(hash, entry_hash)
+            if distance <= max_distance:
+                found.append((distance, entry_hash, value))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, hash, max_distance=None):
+        """The closest entry within `max_distance` as (distance, hash, value), None if there is none"""
+        found = self.search(hash, max_distance)
+        return found[0] if found else None
+
+
+class NearDuplicateIndex:
+    """Index of recognized images that finds near-duplicates before the OCR runs.
+
+    Pass it as `dedupe` to `ocrmac.OCR`, `OCR.recognize_batch` or
+    `batch_text_from_images`. Entries are separated by the recognition options, an
+    image only matches images recognized with the same options. The index is
+    thread-safe. Results are returned as stored, don't modify them.
+
+    Near-duplicates are found with `dhash` and a `MultiIndexHash`. `links` maps the key of
+    every near-duplicate recognized with a key to (key of the match, distance).
+
+    Args:
+        max_distance (int, optional): Maximum Hamming distance of a near-duplicate.
+            Defaults to 4 (of 64 bits).
+        policy (str, optional): 'reuse' returns the results of the match without
+            running the OCR. 'ocr' runs the OCR anyway and only records the link,
+            e.g. to tune max_distance. Defaults to 'reuse'.
+        hash_size (int, optional): See `dhash`. Defaults to 8.
+    """
+
+    def __init__(self, max_distance=4, policy="reuse", hash_size=8):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid policy. Must be one of {sorted(POLICIES)}.")
+        if max_distance < 0:
+            raise ValueError("Invalid max_distance. Must be at least 0.")
+
+        self.max_distance = max_distance
+        self.policy = policy
+        self.hash_size = hash_size
+        self.links = {}
+        self.hits = self.misses = 0
+
+        self._hashes = {}  # options -> MultiIndexHash of hash -> entry index
+        self._entries = []  # (key, results)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def match(self, image, **options):
+        """
+        Find the closest earlier image.
+
+        :param image: Image input or a hash from `dhash`.
+        :param options: Recognition options, see `recognize`.
+
+        :returns: `Match` (key, distance, results), None if there is no near-duplicate.
+        """
+        hash = image if isinstance(image, int) else dhash(image, self.hash_size)
+        with self._lock:
+            return self._match(hash, _options_key(options))
+
+    def add(self, image, results, key=None, **options):
+        """
+        Index the results of an image.
+
+        :param image: Image input or a hash from `dhash`.
+        :param results: The OCR results.
+        :param key: Key of the image, e.g. its path. Defaults to None, the number of
+            the entry.
+        :param options: Recognition options, see `recognize`.
+
+        :returns: The key.
+        """
+        hash = image if isinstance(image, int) else dhash(image, self.hash_size)
+        with self._lock:
+            return self._add(hash, results, key, _options_key(options))
+
+    def recognize(self, image, recognize, key=None, **options):
+        """
+        Get the results of a near-duplicate or run `recognize` and index the results.
+
+        :param image: Image input, see `ocrmac.text_from_image`.
+        :param recognize: Callable taking the image and returning the results.
+        :param key: Key of the image. Defaults to None, the path for paths and the
+            number of the entry otherwise.
+        :param options: Everything that influences the results, e.g. framework,
+            recognition_level, language_preference, confidence_threshold, detail and unit.
+        """
+        image = normalize_image(image)
+        if isinstance(image, str):
+            if key is None:
+                key = image
+            with open(image, "rb") as f:
+                image = f.read()
+
+        hash = dhash(image, self.hash_size)
+        options = _options_key(options)
+        with self._lock:
+            match = self._match(hash, options)
+            if match is not None:
+                self.hits += 1
+                if self.policy == "reuse":
+                    if key is not None:
+                        self.links[key] = (match.key, match.distance)
+                    return match.results
+            else:
+                self.misses += 1
+
+        results = recognize(image)
+        with self._lock:
+            key = self._add(hash, results, key, options)
+            if match is not None:
+                self.links[key] = (match.key, match.distance)
+        return results
+
+    def _match(self, hash, options):
+        hashes = self._hashes.get(options)
+        if hashes is None:
+            return None
+        found = hashes.nearest(hash)
+        if found is None:
+            return None
+        distance, _, index = found
+        key, results = self._entries[index]
+        return Match(key, distance, results)
+
+    def _add(self, hash, results, key, options):
+        if key is None:
+            key = len(self._entries)
+        hashes = self._hashes.get(options)
+        if hashes is None:
+            hashes = self._hashes[options] = MultiIndexHash(self.hash_size**2, self.max_distance)
+        hashes.add(hash, len(self._entries))
+        self._entries.append((key, results))
+        return key
+
+
+def _options_key(options):
+    return json.dumps(options, sort_keys=True, default=str)
@@ -0,0 +1,67 @@
+"""Pool of expensive, reusable objects such as LiveText analyzers."""
+
+import contextlib
+import threading
+
+
+class Pool:
+    """Thread-safe pool of reusable objects.
+
+    `get` hands out an idle object or creates a new one, it never blocks, so the
+    number of objects in use is limited by the callers (e.g. a semaphore or the
+    number of threads). `release` puts an object back for the next caller, at most
+    `max_idle` objects are kept. Objects that may be in a bad state (e.g. an analyzer
+    whose analysis timed out) are released with reuse=False and dropped.
+
+    Args:
+        factory (callable): Creates a new object, called without arguments.
+        max_idle (int, optional): Maximum number of idle objects kept. Defaults to 4.
+    """
+
+    def __init__(self, factory, max_idle=4):
+        if max_idle < 0:
+            raise ValueError("Invalid max_idle. Must be at least 0.")
+
+        self.factory = factory
+        self.max_idle = max_idle
+        self.created = 0
+        self.reused = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Take an idle object, or create one if there is none"""
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            self.created += 1
+        return self.factory()
+
+    def release(self, obj, reuse=True):
+        """Give an object back, with reuse=False it is dropped"""
+        if not reuse:
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(obj)
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """Context manager around `get` and `release`, objects are dropped if the block raises"""
+        obj = self.get()
+        try:
+            yield obj
+        except BaseException:
+            self.release(obj, reuse=False)
+            raise
+        self.release(obj)
+
+    def clear(self):
+        """Drop all idle objects"""
+        with self._lock:
+            self._idle = []
+
+    def __len__(self):
+        """Number of idle objects"""
+        return len(self._idle)
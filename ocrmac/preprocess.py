@@ -0,0 +1,139 @@
+"""Optional preprocessing of images before OCR.
+
+Shrinking and cropping the image before it is handed to the framework reduces the
+encoding cost and the amount of data passed to it. Bounding boxes are mapped back to
+the normalized coordinates of the original image, so pixel conversion and the
+annotate functions line up as without preprocessing.
+"""
+
+from PIL import Image, ImageChops
+
+from .images import open_image
+from .tiling import region_to_crop, remap_bbox
+
+
+def content_box(image, tolerance=8, padding=2):
+    """
+    Find the content of an image surrounded by a uniform border.
+
+    The color of the top-left pixel is taken as border color.
+
+    :param image: PIL image.
+    :param tolerance: Maximum gray value difference to the border color that still
+        counts as border. Defaults to 8.
+    :param padding: Pixels kept around the content. Defaults to 2.
+
+    :returns: (left, top, right, bottom) pixel box of the content, the full image
+        if it is uniform.
+    """
+    gray = image if image.mode == "L" else image.convert("L")
+    background = Image.new("L", gray.size, gray.getpixel((0, 0)))
+    mask = ImageChops.difference(gray, background).point(lambda p: 255 if p > tolerance else 0)
+    box = mask.getbbox()
+    if box is None:
+        return 0, 0, image.width, image.height
+
+    left, top, right, bottom = box
+    return (
+        max(left - padding, 0),
+        max(top - padding, 0),
+        min(right + padding, image.width),
+        min(bottom + padding, image.height),
+    )
+
+
+class Preprocessor:
+    """Prepare images for OCR and map the results back to the original image.
+
+    Args:
+        max_size (int, optional): Downscale images so that the long edge is at most
+            this many pixels. Defaults to None (keep the size).
+        grayscale (bool, optional): Convert to grayscale. Defaults to False.
+        autocrop (bool, optional): Crop uniform borders, see `content_box`. Defaults to False.
+        roi (tuple, optional): Only OCR this region, given as normalized (x, y, width, height)
+            with the origin in the bottom-left corner. Defaults to None (full image).
+        tolerance (int, optional): Border tolerance for autocrop. Defaults to 8.
+    """
+
+    def __init__(self, max_size=None, grayscale=False, autocrop=False, roi=None, tolerance=8):
+        if max_size is not None and max_size < 1:
+            raise ValueError("Invalid max_size. Must be a positive number of pixels.")
+
+        self.max_size = max_size
+        self.grayscale = grayscale
+        self.autocrop = autocrop
+        self.roi = tuple(roi) if roi is not None else None
+        self.tolerance = tolerance
+
+    def options(self):
+        """The settings as dict, e.g. for cache keys"""
+        return dict(
+            max_size=self.max_size,
+            grayscale=self.grayscale,
+            autocrop=self.autocrop,
+            roi=self.roi,
+            tolerance=self.tolerance,
+        )
+
+    def __repr__(self):
+        options = ", ".join(f"{name}={value!r}" for name, value in self.options().items())
+        return f"Preprocessor({options})"
+
+    def __call__(self, image):
+        """
+        Preprocess a PIL image.
+
+        :returns: The processed image and the (left, top, right, bottom) pixel box of
+            the original image it covers.
+        """
+        crop = (0, 0, image.width, image.height)
+        if self.roi is not None:
+            crop = region_to_crop(self.roi, image.width, image.height)
+            image = image.crop(crop)
+
+        if self.grayscale and image.mode != "L":
+            image = image.convert("L")
+
+        if self.autocrop:
+            box = content_box(image, self.tolerance)
+            if box != (0, 0, image.width, image.height):
+                image = image.crop(box)
+                crop = (crop[0] + box[0], crop[1] + box[1], crop[0] + box[2], crop[1] + box[3])
+
+        if self.max_size is not None and max(image.size) > self.max_size:
+            scale = self.max_size / max(image.size)
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size, Image.BICUBIC, reducing_gap=3.0)
+
+        return image, crop
+
+    @staticmethod
+    def restore(results, crop, width, height):
+        """Map results of a processed image back to the original image of size (width, height)"""
+        if crop == (0, 0, width, height):
+            return results  # scaling alone doesn't change normalized coordinates
+        return [
+            item if isinstance(item, str) else (item[0], item[1], remap_bbox(item[2], crop, width, height))
+            for item in results
+        ]
+
+    def recognize(self, image, recognize):
+        """
+        Preprocess an image, run `recognize` on it and restore the bounding boxes.
+
+        :param image: Image input, see `ocrmac.text_from_image`.
+        :param recognize: Callable taking a PIL image and returning results, e.g. the
+            `recognize` method of an engine.
+        """
+        image = open_image(image)
+        processed, crop = self(image)
+        return self.restore(recognize(processed), crop, image.width, image.height)
+
+
+def make_preprocessor(preprocess):
+    """Accept a `Preprocessor`, a dict with its arguments or None"""
+    if preprocess is None or isinstance(preprocess, Preprocessor):
+        return preprocess
+    if isinstance(preprocess, dict):
+        return Preprocessor(**preprocess)
+    raise ValueError("Invalid preprocess. Must be a Preprocessor, a dict of its options or None.")
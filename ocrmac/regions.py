@@ -0,0 +1,105 @@
+"""OCR restricted to regions of an image.
+
+Regions use the normalized Vision convention: (x, y, width, height) between 0 and 1
+with the origin in the bottom-left corner, see `ocrmac.text_from_image`.
+"""
+
+from .images import open_image
+from .tiling import region_to_crop, remap_bbox
+
+
+def check_regions(regions):
+    """
+    Validate regions of interest.
+
+    :param regions: Iterable of normalized (x, y, width, height).
+
+    :returns: List of (x, y, width, height) tuples.
+    """
+    checked = []
+    for region in regions:
+        x, y, w, h = region
+        if w <= 0 or h <= 0:
+            raise ValueError(f"Invalid region {region}. Width and height must be positive.")
+        if x < 0 or y < 0 or x + w > 1 or y + h > 1:
+            raise ValueError(f"Invalid region {region}. Regions must lie within the image (0 to 1).")
+        checked.append((float(x), float(y), float(w), float(h)))
+
+    if not checked:
+        raise ValueError("Invalid regions. Pass at least one region or None for the full image.")
+    return checked
+
+
+def check_region_options(regions, preprocess=None, tile_size=None):
+    """
+    Validate regions of interest together with the options of the OCR call.
+
+    Regions refer to the full image, so they can't be combined with tiles or with a
+    preprocess that crops the image.
+
+    :param regions: Iterable of normalized (x, y, width, height) or None.
+    :param preprocess: `ocrmac.preprocess.Preprocessor` or None.
+    :param tile_size: Tile size of a tiled OCR or None.
+
+    :returns: List of (x, y, width, height) tuples, None if no regions are given.
+    """
+    if regions is None:
+        return None
+
+    regions = check_regions(regions)
+    if tile_size is not None:
+        raise ValueError("Regions can't be combined with tiled OCR.")
+    if preprocess is not None and (preprocess.roi is not None or preprocess.autocrop):
+        raise ValueError("Regions can't be combined with a cropping preprocess, please use the roi option instead.")
+    return regions
+
+
+def remap_to_region(bbox, region):
+    """
+    Map a bbox relative to a region into coordinates of the full image.
+
+    Vision reports boxes of a request with a regionOfInterest relative to that region.
+
+    :param bbox: Normalized (x, y, width, height) relative to the region.
+    :param region: Normalized (x, y, width, height) of the region in the full image.
+
+    :returns: [x, y, width, height] relative to the full image.
+    """
+    x, y, w, h = bbox
+    rx, ry, rw, rh = region
+    return [rx + x * rw, ry + y * rh, w * rw, h * rh]
+
+
+def remap_results(results, region):
+    """Apply `remap_to_region` to the boxes of a result list, texts without box are kept"""
+    return [
+        item if isinstance(item, str) else (item[0], item[1], remap_to_region(item[2], region))
+        for item in results
+    ]
+
+
+def recognize_regions(image, recognize, regions):
+    """
+    OCR regions by cropping them, for engines without native region support (e.g. LiveText).
+
+    :param image: Image input, see `ocrmac.text_from_image`.
+    :param recognize: Callable taking a PIL image and returning results, e.g. the
+        `recognize` method of an engine.
+    :param regions: Iterable of normalized (x, y, width, height).
+
+    :returns: The results of all regions in region order, boxes relative to the full
+        image. Text in overlapping regions is returned once per region.
+    """
+    image = open_image(image)
+    width, height = image.size
+
+    results = []
+    for region in check_regions(regions):
+        crop = region_to_crop(region, width, height)
+        for item in recognize(image.crop(crop)):
+            if isinstance(item, str):
+                results.append(item)
+            else:
+                # remap the pixel crop, which is the region rounded to whole pixels
+                results.append((item[0], item[1], remap_bbox(item[2], crop, width, height)))
+    return results
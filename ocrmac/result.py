@@ -0,0 +1,132 @@
+"""Columnar container for OCR results."""
+
+import numpy as np
+
+from .coordinates import convert_coordinates_pil_batch
+
+
+class OCRResult:
+    """Compact, columnar OCR results.
+
+    Stores the texts in a list and confidences and bounding boxes in float32 NumPy
+    arrays instead of one tuple and list per detection. Iterating yields the usual
+    (text, confidence, [x, y, width, height]) tuples, so an OCRResult can be used
+    wherever the list returned by `ocrmac.text_from_image` is used.
+
+    Args:
+        texts (list): Recognized texts.
+        confidences (array-like): Confidence per text, shape (N,).
+        bboxes (array-like): Normalized (x, y, width, height) per text with the origin
+            in the bottom-left corner, shape (N, 4).
+    """
+
+    __slots__ = ("texts", "confidences", "bboxes")
+
+    def __init__(self, texts, confidences, bboxes):
+        self.texts = list(texts)
+        self.confidences = np.asarray(confidences, dtype=np.float32).reshape(-1)
+        # Column-major, so that each coordinate is a contiguous column for pandas / arrow
+        self.bboxes = np.asfortranarray(np.asarray(bboxes, dtype=np.float32).reshape(-1, 4))
+
+        if not len(self.texts) == len(self.confidences) == len(self.bboxes):
+            raise ValueError("texts, confidences and bboxes must have the same length.")
+
+    @classmethod
+    def from_list(cls, results):
+        """Create from a list of (text, confidence, bbox) tuples"""
+        if any(isinstance(item, str) for item in results):
+            raise ValueError("OCRResult needs bounding boxes, please set detail=True.")
+        texts = [text for text, _, _ in results]
+        confidences = np.fromiter((conf for _, conf, _ in results), dtype=np.float32, count=len(results))
+        bboxes = np.array([bbox for _, _, bbox in results], dtype=np.float32).reshape(-1, 4)
+        return cls(texts, confidences, bboxes)
+
+    def to_list(self):
+        """Convert to the list of (text, confidence, [x, y, width, height]) tuples"""
+        return list(self)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        return zip(self.texts, self.confidences.tolist(), self.bboxes.tolist())
+
+    def __getitem__(self, index):
+        """An int returns one tuple, slices, masks and index arrays return an OCRResult"""
+        if isinstance(index, (int, np.integer)):
+            return self.texts[index], float(self.confidences[index]), self.bboxes[index].tolist()
+
+        indices = np.arange(len(self))[index]
+        return OCRResult([self.texts[i] for i in indices], self.confidences[indices], self.bboxes[indices])
+
+    def __eq__(self, other):
+        if isinstance(other, (OCRResult, list)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"OCRResult({self.to_list()!r})"
+
+    def to_pixels(self, width, height):
+        """
+        Convert all bounding boxes to PIL pixel coordinates at once.
+
+        :returns: float array of shape (N, 4) with (x1, y1, x2, y2) per box,
+            the same values `convert_coordinates_pil` returns for a single box.
+        """
+        return convert_coordinates_pil_batch(self.bboxes, width, height)
+
+    def filter(self, min_confidence=None, region=None):
+        """
+        Select detections by confidence and / or region.
+
+        :param min_confidence: Keep detections with at least this confidence.
+        :param region: Normalized (x, y, width, height) with bottom-left origin, keep
+            detections whose box center lies inside.
+
+        :returns: OCRResult with the selected detections.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if min_confidence is not None:
+            mask &= self.confidences >= min_confidence
+        if region is not None:
+            rx, ry, rw, rh = region
+            cx = self.bboxes[:, 0] + self.bboxes[:, 2] / 2
+            cy = self.bboxes[:, 1] + self.bboxes[:, 3] / 2
+            mask &= (cx >= rx) & (cx <= rx + rw) & (cy >= ry) & (cy <= ry + rh)
+        return self[mask]
+
+    def _columns(self):
+        return {
+            "text": self.texts,
+            "confidence": self.confidences,
+            "x": self.bboxes[:, 0],
+            "y": self.bboxes[:, 1],
+            "width": self.bboxes[:, 2],
+            "height": self.bboxes[:, 3],
+        }
+
+    def to_pandas(self):
+        """Convert to a pandas DataFrame with columns text, confidence, x, y, width, height"""
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas is not available. Please install pandas to use this feature.")
+
+        return pd.DataFrame(self._columns(), copy=False)
+
+    def to_arrow(self):
+        """Convert to a pyarrow Table, the numeric columns are not copied"""
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("pyarrow is not available. Please install pyarrow to use this feature.")
+
+        columns = self._columns()
+        # No-op for the column-major bbox array, only copies if it was replaced by a strided one
+        return pa.table(
+            {
+                name: pa.array(values if name == "text" else np.ascontiguousarray(values))
+                for name, values in columns.items()
+            }
+        )
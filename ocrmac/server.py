@@ -0,0 +1,328 @@
+"""Long-running OCR server with warm engines.
+
+Starting Python and loading the frameworks costs more than recognizing a typical
+screenshot. The server keeps one engine per worker thread alive and answers requests
+over HTTP:
+
+- ``POST /ocr`` with the encoded image as body returns the results as JSON,
+  ``?px=1`` returns the bounding boxes in pixels.
+- ``GET /metrics`` returns queue depth, counters and latency percentiles in the
+  Prometheus text format.
+- ``GET /health`` returns ``ok``.
+
+Requests wait in a bounded queue, when it is full the server answers 503 right away
+so that clients can back off. A worker that finds more requests queued takes those
+that arrive within `batch_window` (up to `max_batch`) as one batch. Identical images
+in a batch, e.g. retries or the same screenshot sent by several clients, are
+recognized once. Requests that timed out while queued are dropped.
+"""
+
+import functools
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from . import parallel
+from .instrument import Recorder
+
+# Options that configure the engine, everything else is passed to `ocrmac.OCR`
+ENGINE_OPTIONS = {"framework", "recognition_level", "language_preference", "confidence_threshold", "detail", "unit"}
+
+
+class _Job:
+    __slots__ = ("image", "px", "enqueued", "done", "result", "error", "cancelled")
+
+    def __init__(self, image, px):
+        self.image = image
+        self.px = px
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.cancelled = False
+
+
+class OCRServer:
+    """HTTP server running OCR on a pool of warm engines.
+
+    Args:
+        engine_factory (callable, optional): Callable without arguments creating an
+            engine, called once per worker. Defaults to `ocrmac.create_engine` with the
+            engine options.
+        host (str, optional): Address to listen on. Defaults to '127.0.0.1'.
+        port (int, optional): Port to listen on, 0 picks a free port. Defaults to 8080.
+        workers (int, optional): Number of worker threads, each with its own engine. Defaults to 1.
+        max_batch (int, optional): Maximum number of requests a worker takes at once. Defaults to 8.
+        batch_window (float, optional): Seconds a worker waits for more requests to
+            fill a batch. A request that finds no other queued is processed right
+            away. Defaults to 0.005.
+        max_queue (int, optional): Maximum number of waiting requests, more are
+            rejected with 503. Defaults to 64.
+        timeout (float, optional): Seconds a request may take before 504 is returned,
+            requests still queued by then are not processed. Defaults to 30.0.
+        options: Options of `ocrmac.OCR`, e.g. framework, recognition_level or preprocess.
+    """
+
+    def __init__(
+        self, engine_factory=None, host="127.0.0.1", port=8080, workers=1, max_batch=8, batch_window=0.005, max_queue=64, timeout=30.0, **options
+    ):
+        if workers < 1:
+            raise ValueError("Invalid workers. Must be at least 1.")
+        if max_batch < 1:
+            raise ValueError("Invalid max_batch. Must be at least 1.")
+
+        engine_options = {name: value for name, value in options.items() if name in ENGINE_OPTIONS}
+        if engine_factory is None:
+            engine_factory = functools.partial(parallel.default_engine, **engine_options)
+        elif engine_options:
+            raise ValueError("Engine options can't be combined with an engine_factory.")
+
+        self.engine_factory = engine_factory
+        self.ocr_options = {name: value for name, value in options.items() if name not in ENGINE_OPTIONS}
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.timeout = timeout
+
+        self._queue = queue.Queue(max_queue)
+        self._threads = []
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.ocr_server = self
+
+        self.latency = Recorder()
+        self._lock = threading.Lock()
+        self._counters = dict(requests=0, rejected=0, errors=0, timeouts=0, dropped=0, batches=0, batched=0, deduplicated=0)
+
+    @property
+    def address(self):
+        """(host, port) the server listens on"""
+        return self._httpd.server_address[:2]
+
+    @property
+    def queue_depth(self):
+        """Number of requests waiting for a worker"""
+        return self._queue.qsize()
+
+    def start(self):
+        """Create the engines and start the workers and the HTTP server in background threads"""
+        # Engines are created up front, so that configuration errors surface right away
+        engines = [self.engine_factory() for _ in range(self.workers)]
+        for engine in engines:
+            self._start_thread(self._work, engine)
+        self._start_thread(self._httpd.serve_forever)
+        return self
+
+    def serve_forever(self):
+        """Start the server and block until interrupted"""
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Stop accepting requests, finish the queued ones and stop the workers"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        for _ in range(self.workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def _start_thread(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def submit(self, image, px=False):
+        """
+        Queue an image, without waiting for the result.
+
+        :raises queue.Full: If the queue is full.
+        """
+        job = _Job(image, px)
+        self._count("requests")
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._count("rejected")
+            raise
+        return job
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def _work(self, engine):
+        stop = False
+        while not stop:
+            job = self._queue.get()
+            if job is None:
+                return
+
+            batch = [job]
+            # An idle server answers right away, the window only applies under load
+            waiting = not self._queue.empty()
+            deadline = time.perf_counter() + self.batch_window
+            while waiting and len(batch) < self.max_batch:
+                try:
+                    # Take what is queued already, then wait until the window closes
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        job = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+
+            self._run_batch(engine, batch)
+
+    def _run_batch(self, engine, batch):
+        from .ocrmac import OCR, _to_pixels
+
+        # Drop the requests that were answered with 504 or are about to be
+        start = time.perf_counter()
+        live = []
+        for job in batch:
+            if job.cancelled or start - job.enqueued >= self.timeout:
+                job.error = TimeoutError("OCR did not start in time.")
+                job.done.set()
+            else:
+                live.append(job)
+        self._count("dropped", len(batch) - len(live))
+        if not live:
+            return
+
+        # Identical images are recognized once for the whole batch
+        groups = {}
+        for job in live:
+            groups.setdefault(job.image, []).append(job)
+        self._count("batches")
+        self._count("batched", len(live))
+        self._count("deduplicated", len(live) - len(groups))
+
+        for image, jobs in groups.items():
+            start = time.perf_counter()
+            try:
+                ocr = OCR(image, engine=engine, **self.ocr_options)
+                res = ocr.recognize()
+                for job in jobs:
+                    job.result = _to_pixels(res, *ocr.size) if job.px else res
+            except Exception as e:
+                for job in jobs:
+                    job.error = e
+                self._count("errors", len(jobs))
+            finally:
+                now = time.perf_counter()
+                for job in jobs:
+                    self.latency("queue_wait", start - job.enqueued)
+                    self.latency("request", now - job.enqueued)
+                    job.done.set()
+
+    def metrics(self):
+        """The metrics in the Prometheus text format"""
+        with self._lock:
+            counters = dict(self._counters)
+
+        lines = [
+            "# TYPE ocrmac_queue_depth gauge",
+            f"ocrmac_queue_depth {self.queue_depth}",
+            f"ocrmac_queue_capacity {self._queue.maxsize}",
+            f"ocrmac_workers {self.workers}",
+        ]
+        for name, value in counters.items():
+            lines.append(f"# TYPE ocrmac_{name}_total counter")
+            lines.append(f"ocrmac_{name}_total {value}")
+
+        for stage, stats in self.latency.summary().items():
+            name = f"ocrmac_{stage}_seconds"
+            lines.append(f"# TYPE {name} summary")
+            for quantile in ("p50", "p95", "p99"):
+                lines.append(f'{name}{{quantile="0.{quantile[1:]}"}} {stats[quantile]:.6f}')
+            lines.append(f"{name}_sum {stats['total']:.6f}")
+            lines.append(f"{name}_count {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _results_json(results):
+    return [
+        {"text": item} if isinstance(item, str) else {"text": item[0], "confidence": item[1], "bbox": list(item[2])}
+        for item in results
+    ]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass  # access logs would dominate the output at high request rates
+
+    def _send(self, status, body, content_type="application/json", headers=()):
+        data = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, payload, headers=()):
+        self._send(status, json.dumps(payload, ensure_ascii=False), headers=headers)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/metrics":
+            self._send(200, self.server.ocr_server.metrics(), content_type="text/plain; version=0.0.4")
+        elif path == "/health":
+            self._send(200, "ok", content_type="text/plain")
+        else:
+            self._send_json(404, {"error": f"Not found: {path}"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/ocr":
+            self._send_json(404, {"error": f"Not found: {url.path}"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            self._send_json(400, {"error": "Please send the encoded image as request body."})
+            return
+        image = self.rfile.read(length)
+        px = parse_qs(url.query).get("px", ["0"])[0].lower() in {"1", "true", "yes"}
+
+        server = self.server.ocr_server
+        try:
+            job = server.submit(image, px=px)
+        except queue.Full:
+            self._send_json(503, {"error": "Queue is full, please retry later."}, headers=[("Retry-After", "1")])
+            return
+
+        if not job.done.wait(server.timeout):
+            job.cancelled = True
+            server._count("timeouts")
+            self._send_json(504, {"error": "OCR did not finish in time."})
+        elif job.error is not None:
+            status = 400 if isinstance(job.error, (ValueError, OSError)) else 500
+            self._send_json(status, {"error": f"{type(job.error).__name__}: {job.error}"})
+        else:
+            self._send_json(200, {"results": _results_json(job.result)})
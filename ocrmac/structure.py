@@ -0,0 +1,163 @@
+"""Hierarchical OCR results: paragraphs, lines and tokens.
+
+Bounding boxes use the normalized Vision convention, (x, y, width, height) with the
+origin in the bottom-left corner, see `ocrmac.text_from_image`.
+"""
+
+import numpy as np
+
+from .result import OCRResult
+
+
+class StructuredResult:
+    """Lines and their tokens, stored as two columnar results and an offset array.
+
+    The tokens of line i are ``tokens[line_offsets[i]:line_offsets[i + 1]]``, so the
+    token / line relationship is kept without one object per line. Paragraphs are
+    derived from the line geometry on demand.
+
+    Args:
+        tokens (OCRResult): All tokens, ordered line by line.
+        lines (OCRResult): One entry per line with the line text and box.
+        line_offsets (array-like): Start of each line in `tokens` plus the total
+            number of tokens, shape (len(lines) + 1,).
+    """
+
+    __slots__ = ("tokens", "lines", "line_offsets")
+
+    def __init__(self, tokens, lines, line_offsets):
+        self.tokens = tokens
+        self.lines = lines
+        self.line_offsets = np.asarray(line_offsets, dtype=np.int64).reshape(-1)
+
+        if len(self.line_offsets) != len(lines) + 1 or self.line_offsets[-1] != len(tokens):
+            raise ValueError("line_offsets must have one entry per line plus the number of tokens.")
+
+    @classmethod
+    def from_lines(cls, lines):
+        """
+        Build from lines that already contain their tokens, e.g. a LiveText analysis.
+
+        :param lines: Iterable of (text, confidence, bbox, tokens) with tokens a list of
+            (text, confidence, bbox).
+        """
+        line_items, token_items, offsets = [], [], [0]
+        for text, confidence, bbox, tokens in lines:
+            line_items.append((text, confidence, bbox))
+            token_items.extend(tokens)
+            offsets.append(len(token_items))
+        return cls(OCRResult.from_list(token_items), OCRResult.from_list(line_items), offsets)
+
+    @classmethod
+    def from_results(cls, results, tolerance=0.5):
+        """
+        Group flat results into lines by geometry, e.g. Vision observations.
+
+        Two boxes are on the same line if their vertical overlap covers at least
+        `tolerance` of the smaller box. Tokens of a line are sorted left to right and
+        joined with a space.
+
+        :param results: List of (text, confidence, bbox).
+        :param tolerance: Required vertical overlap. Defaults to 0.5.
+        """
+        groups = []  # [bottom, top, items]
+        for item in sorted(results, key=lambda item: -(item[2][1] + item[2][3] / 2)):
+            _, _, (x, y, w, h) = item
+            if groups:
+                bottom, top, items = groups[-1]
+                overlap = min(top, y + h) - max(bottom, y)
+                if overlap >= tolerance * min(h, top - bottom):
+                    groups[-1] = [min(bottom, y), max(top, y + h), items + [item]]
+                    continue
+            groups.append([y, y + h, [item]])
+
+        lines = []
+        for _, _, items in groups:
+            items = sorted(items, key=lambda item: item[2][0])
+            text = " ".join(text for text, _, _ in items)
+            confidence = float(np.mean([confidence for _, confidence, _ in items]))
+            lines.append((text, confidence, _union([bbox for _, _, bbox in items]), items))
+        return cls.from_lines(lines)
+
+    def __len__(self):
+        """Number of lines"""
+        return len(self.lines)
+
+    def __repr__(self):
+        return f"StructuredResult({len(self.lines)} lines, {len(self.tokens)} tokens)"
+
+    @property
+    def text(self):
+        """The text of all lines, one line per row"""
+        return "\n".join(self.lines.texts)
+
+    def line_tokens(self, index):
+        """The tokens of one line as OCRResult"""
+        return self.tokens[int(self.line_offsets[index]):int(self.line_offsets[index + 1])]
+
+    def token_lines(self):
+        """Index of the line of every token, shape (len(tokens),)"""
+        return np.repeat(np.arange(len(self.lines)), np.diff(self.line_offsets))
+
+    def paragraph_offsets(self, gap=1.0):
+        """
+        Group consecutive lines into paragraphs.
+
+        A line starts a new paragraph if the vertical gap to the previous line is larger
+        than `gap` times the median line height, or if the two don't overlap horizontally.
+
+        :returns: Start of each paragraph in `lines` plus the number of lines.
+        """
+        boxes = self.lines.bboxes
+        if not len(boxes):
+            return np.zeros(1, dtype=np.int64)
+
+        limit = gap * float(np.median(boxes[:, 3]))
+        previous, current = boxes[:-1], boxes[1:]
+        vertical_gap = previous[:, 1] - (current[:, 1] + current[:, 3])
+        horizontal_overlap = np.minimum(previous[:, 0] + previous[:, 2], current[:, 0] + current[:, 2]) - np.maximum(
+            previous[:, 0], current[:, 0]
+        )
+        breaks = np.flatnonzero((vertical_gap > limit) | (horizontal_overlap <= 0)) + 1
+        return np.concatenate([[0], breaks, [len(boxes)]]).astype(np.int64)
+
+    def paragraphs(self, gap=1.0):
+        """
+        Paragraphs as OCRResult, see `paragraph_offsets`.
+
+        The text is the lines joined with newlines, the confidence the mean of the
+        lines and the box the union of the line boxes.
+        """
+        offsets = self.paragraph_offsets(gap)
+        texts, confidences, bboxes = [], [], []
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            texts.append("\n".join(self.lines.texts[start:end]))
+            confidences.append(float(self.lines.confidences[start:end].mean()))
+            bboxes.append(_union(self.lines.bboxes[start:end]))
+        return OCRResult(texts, confidences, np.array(bboxes, dtype=np.float32).reshape(-1, 4))
+
+    def to_dict(self, gap=1.0):
+        """Nested dicts: paragraphs with their lines with their tokens"""
+
+        def item(text, confidence, bbox):
+            return {"text": text, "confidence": confidence, "bbox": bbox}
+
+        offsets = self.paragraph_offsets(gap)
+        paragraphs = []
+        for (text, confidence, bbox), start, end in zip(self.paragraphs(gap), offsets[:-1], offsets[1:]):
+            lines = []
+            for index in range(start, end):
+                line = item(*self.lines[int(index)])
+                line["tokens"] = [item(*token) for token in self.line_tokens(int(index))]
+                lines.append(line)
+            paragraph = item(text, confidence, bbox)
+            paragraph["lines"] = lines
+            paragraphs.append(paragraph)
+        return {"paragraphs": paragraphs}
+
+
+def _union(bboxes):
+    boxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+    x1, y1 = boxes[:, 0].min(), boxes[:, 1].min()
+    x2, y2 = (boxes[:, 0] + boxes[:, 2]).max(), (boxes[:, 1] + boxes[:, 3]).max()
+    return [float(x1), float(y1), float(x2 - x1), float(y2 - y1)]
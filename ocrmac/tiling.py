@@ -0,0 +1,185 @@
+"""Tiled OCR for very large images.
+
+Bounding boxes use the normalized Vision convention throughout: (x, y, width, height)
+with the origin in the bottom-left corner, see `ocrmac.text_from_image`.
+"""
+
+import math
+from collections import defaultdict
+
+from .images import open_image
+
+
+def tile_grid(width, height, tile_size, overlap=0):
+    """
+    Split an image into overlapping tiles.
+
+    :param width: Image width in pixels.
+    :param height: Image height in pixels.
+    :param tile_size: Tile size in pixels, int or (width, height).
+    :param overlap: Overlap of neighbouring tiles in pixels, should be larger than
+        the text height so that every line is complete in at least one tile. Defaults to 0.
+
+    :returns: List of (left, top, right, bottom) pixel boxes covering the image,
+        row by row. The last tile of a row / column is aligned to the image edge.
+    """
+    tile_width, tile_height = (tile_size, tile_size) if isinstance(tile_size, int) else tile_size
+
+    if min(tile_width, tile_height) <= overlap:
+        raise ValueError("Invalid overlap. Overlap must be smaller than the tile size.")
+
+    def starts(length, tile):
+        if length <= tile:
+            return [0]
+        stride = tile - overlap
+        count = math.ceil((length - tile) / stride) + 1
+        return [min(i * stride, length - tile) for i in range(count)]
+
+    return [
+        (left, top, min(left + tile_width, width), min(top + tile_height, height))
+        for top in starts(height, tile_height)
+        for left in starts(width, tile_width)
+    ]
+
+
+def remap_bbox(bbox, crop, width, height):
+    """
+    Map a normalized bbox of a crop into the normalized coordinates of the full image.
+
+    :param bbox: (x, y, width, height) relative to the crop, bottom-left origin.
+    :param crop: (left, top, right, bottom) pixel box of the crop in the full image.
+    :param width: Width of the full image in pixels.
+    :param height: Height of the full image in pixels.
+
+    :returns: [x, y, width, height] relative to the full image, bottom-left origin.
+    """
+    x, y, w, h = bbox
+    left, top, right, bottom = crop
+    crop_width, crop_height = right - left, bottom - top
+
+    return [
+        (left + x * crop_width) / width,
+        (height - bottom + y * crop_height) / height,
+        w * crop_width / width,
+        h * crop_height / height,
+    ]
+
+
+def region_to_crop(region, width, height):
+    """
+    Convert a normalized region into a pixel crop box, the inverse of `remap_bbox`.
+
+    :param region: (x, y, width, height) relative to the image, bottom-left origin.
+    :param width: Image width in pixels.
+    :param height: Image height in pixels.
+
+    :returns: (left, top, right, bottom) pixel box, clipped to the image.
+    """
+    x, y, w, h = region
+    if w <= 0 or h <= 0:
+        raise ValueError("Invalid region. Width and height must be positive.")
+
+    left = min(max(round(x * width), 0), width - 1)
+    top = min(max(round((1 - y - h) * height), 0), height - 1)
+    right = min(max(round((x + w) * width), left + 1), width)
+    bottom = min(max(round((1 - y) * height), top + 1), height)
+    return left, top, right, bottom
+
+
+def _overlap(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    return iw * ih
+
+
+def merge_detections(detections, containment=0.7, cell_size=None):
+    """
+    Remove detections that are duplicated in the overlap regions of tiles.
+
+    Two detections are duplicates if the intersection of their boxes covers at least
+    `containment` of the smaller box. Of each group the largest box is kept, as the
+    smaller ones are usually clipped at a tile edge, ties are broken by confidence.
+    Candidates are looked up in a uniform grid, so the merge is close to linear in
+    the number of detections instead of comparing all pairs.
+
+    :param detections: List of (text, confidence, [x, y, w, h]) in full-image coordinates.
+    :param containment: Fraction of the smaller box that must be covered. Defaults to 0.7.
+    :param cell_size: Grid cell size in normalized units. Defaults to the median box size.
+
+    :returns: List of the kept detections, sorted top to bottom and left to right.
+    """
+    if not detections:
+        return []
+
+    if cell_size is None:
+        sizes = sorted(max(bbox[2], bbox[3]) for _, _, bbox in detections)
+        cell_size = max(sizes[len(sizes) // 2], 1e-3)
+
+    def cells(bbox):
+        x, y, w, h = bbox
+        for cx in range(int(x // cell_size), int((x + w) // cell_size) + 1):
+            for cy in range(int(y // cell_size), int((y + h) // cell_size) + 1):
+                yield cx, cy
+
+    order = sorted(detections, key=lambda d: (d[2][2] * d[2][3], d[1]), reverse=True)
+    grid = defaultdict(list)
+    kept = []
+
+    for detection in order:
+        bbox = detection[2]
+        area = bbox[2] * bbox[3]
+        seen = set()
+        duplicate = False
+        for cell in cells(bbox):
+            for index in grid[cell]:
+                if index in seen:
+                    continue
+                seen.add(index)
+                other = kept[index][2]
+                smaller = min(area, other[2] * other[3])
+                if smaller > 0 and _overlap(bbox, other) >= containment * smaller:
+                    duplicate = True
+                    break
+            if duplicate:
+                break
+
+        if not duplicate:
+            for cell in cells(bbox):
+                grid[cell].append(len(kept))
+            kept.append(detection)
+
+    return sorted(kept, key=lambda d: (-(d[2][1] + d[2][3]), d[2][0]))
+
+
+def recognize_tiled(image, recognize, tile_size, overlap=0, map=map, containment=0.7):
+    """
+    Run OCR tile by tile and stitch the results.
+
+    :param image: Image input, see `ocrmac.text_from_image`.
+    :param recognize: Callable taking a PIL image and returning detailed results,
+        e.g. the `recognize` method of an engine.
+    :param tile_size: Tile size in pixels, int or (width, height).
+    :param overlap: Overlap of neighbouring tiles in pixels. Defaults to 0.
+    :param map: Map function used to run `recognize` on the tiles, pass e.g. the map
+        of an executor to process tiles in parallel. Defaults to the builtin map.
+    :param containment: See `merge_detections`. Defaults to 0.7.
+
+    :returns: List of (text, confidence, [x, y, w, h]) relative to the full image.
+    """
+    image = open_image(image)
+    width, height = image.size
+    crops = tile_grid(width, height, tile_size, overlap)
+
+    detections = []
+    for crop, results in zip(crops, map(recognize, (image.crop(crop) for crop in crops))):
+        for item in results:
+            if isinstance(item, str):
+                raise ValueError("Tiled OCR needs bounding boxes, please set detail=True.")
+            text, confidence, bbox = item
+            detections.append((text, confidence, remap_bbox(bbox, crop, width, height)))
+
+    return merge_detections(detections, containment=containment)
@@ -10,7 +10,7 @@ here = Path(__file__).parent
 readme = (here / "README.md").read_text(encoding="utf-8") if (here / "README.md").exists() else ""
 history = (here / "HISTORY.md").read_text(encoding="utf-8") if (here / "HISTORY.md").exists() else ""
 
-requirements = ["Click>=7.0", "pyobjc-framework-Vision", "pillow"]
+requirements = ["Click>=7.0", "pyobjc-framework-Vision", "pillow", "numpy"]
 
 test_requirements = [
     "pytest>=3",
@@ -0,0 +1,60 @@
+"""Tests for `ocrmac.aio`, using a fake analyzer that completes on a timer."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ocrmac import aio
+
+
+class FakeAnalyzer:
+    """Calls the completion handler from a timer thread, like VKCImageAnalyzer does."""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+
+    def processRequest_progressHandler_completionHandler_(self, request, progress_handler, completion_handler):
+        def complete():
+            progress_handler(1.0)
+            if self.error:
+                completion_handler(None, self.error)
+            else:
+                completion_handler(f"analysis of {request}", None)
+
+        threading.Timer(self.delay, complete).start()
+
+
+def test_analyze_returns_analysis():
+    assert asyncio.run(aio.analyze(FakeAnalyzer(), "img")) == "analysis of img"
+
+
+def test_analyses_overlap():
+    async def main():
+        return await asyncio.gather(*(aio.analyze(FakeAnalyzer(delay=0.2), i) for i in range(10)))
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+
+    assert results == [f"analysis of {i}" for i in range(10)]
+    assert time.perf_counter() - start < 1.0
+
+
+def test_timeout():
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(aio.analyze(FakeAnalyzer(delay=0.5), "img", timeout=0.05))
+
+
+def test_error():
+    with pytest.raises(RuntimeError, match="Error during analysis: boom"):
+        asyncio.run(aio.analyze(FakeAnalyzer(error="boom"), "img"))
+
+
+def test_pump_is_called_while_waiting():
+    calls = []
+
+    result = asyncio.run(aio.analyze(FakeAnalyzer(delay=0.05), "img", pump=lambda: calls.append(1)))
+
+    assert result == "analysis of img"
+    assert len(calls) > 1
@@ -0,0 +1,118 @@
+"""Tests for `ocrmac.annotate`."""
+import pytest
+from PIL import Image
+
+from ocrmac import annotate, ocrmac
+
+RESULTS = [("box", 1.0, [0.25, 0.25, 0.5, 0.5])]
+
+
+class StubEngine:
+    def recognize(self, image):
+        return RESULTS
+
+
+def test_load_font_is_cached():
+    first = annotate.load_font("does-not-exist.ttf", 14)
+
+    assert annotate.load_font("does-not-exist.ttf", 14) is first
+    assert annotate.load_font("does-not-exist.ttf", 15) is not first
+
+
+def test_annotate_image():
+    image = Image.new("RGB", (100, 100), "white")
+
+    result = annotate.annotate_image(image, RESULTS, color="red", font="does-not-exist.ttf")
+
+    assert result is image
+    assert image.getpixel((25, 50)) == (255, 0, 0)  # left edge of the box
+    assert image.getpixel((50, 50)) == (255, 255, 255)
+
+
+def test_preview_image(tmp_path):
+    path = tmp_path / "large.jpg"
+    Image.new("RGB", (2000, 1000), "white").save(path)
+
+    assert annotate.preview_image(str(path), 200).size == (200, 100)
+    assert annotate.preview_image(path.read_bytes(), 200).size == (200, 100)
+    assert annotate.preview_image(Image.new("RGB", (400, 800)), 200).size == (100, 200)
+    assert annotate.preview_image(Image.new("RGB", (40, 80)), 200).size == (40, 80)
+
+
+def test_annotate_pil_preview():
+    ocr = ocrmac.OCR(Image.new("RGB", (1000, 500), "white"), engine=StubEngine())
+
+    preview = ocr.annotate_PIL(max_size=100, font="does-not-exist.ttf")
+
+    assert preview.size == (100, 50)
+    assert ocr.res == RESULTS
+    assert ocr.annotate_PIL(font="does-not-exist.ttf").size == (1000, 500)
+
+
+def test_contact_sheet():
+    ocrs = [ocrmac.OCR(Image.new("RGB", (300 + 100 * i, 200), "white"), engine=StubEngine()) for i in range(5)]
+
+    sheet = annotate.contact_sheet(ocrs, columns=2, tile_size=64, padding=4)
+
+    assert sheet.size == (2 * 68 + 4, 3 * 68 + 4)
+    assert all(ocr.res == RESULTS for ocr in ocrs)
+    with pytest.raises(ValueError):
+        annotate.contact_sheet([])
+
+
+def test_annotate_png_does_not_touch_pyplot():
+    pytest.importorskip("matplotlib")
+    import gc
+    import io
+    import weakref
+
+    import matplotlib.pyplot as plt
+
+    figures = plt.get_fignums()
+    ocr = ocrmac.OCR(Image.new("RGB", (100, 100), "white"), engine=StubEngine())
+
+    png = ocr.annotate_png(figsize=(2, 2), dpi=50)
+
+    assert png.startswith(b"\x89PNG")
+    assert Image.open(io.BytesIO(png)).size == (100, 100)
+    assert plt.get_fignums() == figures
+
+    figure = ocr.annotate_matplotlib(figsize=(2, 2), pyplot=False)
+    reference = weakref.ref(figure)
+    del figure
+    gc.collect()  # figures and axes reference each other
+    assert reference() is None
+    assert plt.get_fignums() == figures
+
+
+def test_annotate_figure():
+    pytest.importorskip("matplotlib")
+    from matplotlib.collections import LineCollection
+
+    image = Image.new("RGB", (200, 100), "white")
+    figure = annotate.annotate_figure(image, RESULTS * 3, figsize=(2, 1))
+
+    (ax,) = figure.axes
+    (collection,) = [artist for artist in ax.collections if isinstance(artist, LineCollection)]
+    assert len(collection.get_segments()) == 3
+    # The box spans x 50..150 and y 25..75 in pixels, the text is at the lower left corner
+    assert collection.get_segments()[0].tolist() == [[50, 75], [150, 75], [150, 25], [50, 25], [50, 75]]
+    assert [(text.get_text(), text.get_position()) for text in ax.texts] == [("box", (50, 75))] * 3
+
+    figure = annotate.annotate_figure(image, RESULTS, texts=False)
+    assert len(figure.axes[0].texts) == 0
+    assert annotate.figure_to_png(figure, dpi=10).startswith(b"\x89PNG")
+
+
+def test_annotate_matplotlib_pyplot():
+    pytest.importorskip("matplotlib")
+    import matplotlib.pyplot as plt
+
+    ocr = ocrmac.OCR(Image.new("RGB", (100, 100), "white"), engine=StubEngine())
+
+    figure = ocr.annotate_matplotlib(figsize=(2, 2))
+    try:
+        assert figure.number in plt.get_fignums()
+        assert len(figure.axes[0].texts) == 1
+    finally:
+        plt.close(figure)
@@ -0,0 +1,71 @@
+"""Tests for `ocrmac.cache`, these run without the Apple frameworks."""
+import os
+
+from PIL import Image
+
+from ocrmac.cache import ResultCache, cache_key
+
+THIS_FOLDER = os.path.dirname(os.path.abspath(__file__))
+TEST_IMAGE = os.path.join(THIS_FOLDER, "test.png")
+RESULTS = [("Sign up for GitHub", 0.5, [0.1, 0.2, 0.3, 0.04])]
+
+
+def test_key_depends_on_content_and_options():
+    with open(TEST_IMAGE, "rb") as f:
+        data = f.read()
+
+    assert cache_key(TEST_IMAGE, framework="vision") == cache_key(data, framework="vision")
+    assert cache_key(TEST_IMAGE, framework="vision") != cache_key(TEST_IMAGE, framework="livetext")
+    assert cache_key(data, recognition_level="fast") != cache_key(data[:-1], recognition_level="fast")
+    assert cache_key(Image.new("L", (4, 2))) != cache_key(Image.new("L", (2, 4)))
+
+
+def test_recognize_computes_once():
+    cache = ResultCache()
+    calls = []
+
+    def recognize(image):
+        calls.append(image)
+        return RESULTS
+
+    assert cache.recognize(TEST_IMAGE, recognize, framework="vision") == RESULTS
+    assert cache.recognize(TEST_IMAGE, recognize, framework="vision") == RESULTS
+    assert len(calls) == 1
+    assert isinstance(calls[0], bytes)
+    assert cache.cache_info()[:2] == (1, 1)
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", RESULTS)
+    cache.put("b", RESULTS)
+    cache.get("a")
+    cache.put("c", RESULTS)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == RESULTS
+    assert cache.cache_info().evictions == 1
+    assert len(cache) == 2
+
+
+def test_max_bytes():
+    cache = ResultCache(max_bytes=150)
+    for key in "abcd":
+        cache.put(key, RESULTS)
+
+    info = cache.cache_info()
+    assert info.size <= 150
+    assert info.entries < 4
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    cache = ResultCache(path=path)
+    cache.put("a", RESULTS + ["plain text"])
+    cache.close()
+
+    cache = ResultCache(path=path)
+    assert cache.get("a") == RESULTS + ["plain text"]
+    assert cache.cache_info().disk_hits == 1
+    assert cache.get("a") == RESULTS + ["plain text"]
+    assert cache.cache_info().disk_hits == 1
@@ -0,0 +1,107 @@
+"""Tests for the `ocrmac` console script, using a stub engine."""
+import json
+import os
+
+from click.testing import CliRunner
+from PIL import Image
+
+from ocrmac import cli
+
+ENGINE = "tests.test_cli:PathEngine"
+
+
+class PathEngine:
+    """Returns the size of the image as text, fails for images named 'broken'."""
+
+    def recognize(self, image):
+        if "broken" in image:
+            raise ValueError("cannot identify image file")
+        with Image.open(image) as im:
+            return [(f"{im.width}x{im.height}", 1.0, [0.0, 0.0, 1.0, 1.0])]
+
+
+def make_tree(root):
+    os.makedirs(root / "sub")
+    Image.new("RGB", (10, 20)).save(root / "a.png")
+    Image.new("RGB", (30, 40)).save(root / "sub" / "b.jpg")
+    (root / "notes.txt").write_text("not an image")
+    (root / "broken.png").write_bytes(b"")
+
+
+def read_records(path):
+    with open(path) as f:
+        return {record["path"]: record for record in map(json.loads, f)}
+
+
+def test_run_directory(tmp_path):
+    make_tree(tmp_path)
+    output = tmp_path / "out.jsonl"
+
+    result = CliRunner().invoke(cli.main, ["run", str(tmp_path), "-o", str(output), "--engine", ENGINE])
+
+    assert result.exit_code == 0, result.output
+    records = read_records(output)
+    assert set(records) == {str(tmp_path / "a.png"), str(tmp_path / "sub" / "b.jpg"), str(tmp_path / "broken.png")}
+    assert records[str(tmp_path / "sub" / "b.jpg")]["results"][0]["text"] == "30x40"
+    assert "ValueError" in records[str(tmp_path / "broken.png")]["error"]
+    assert "3 images" in result.output and "1 errors" in result.output
+
+
+def test_glob_and_stdout(tmp_path):
+    make_tree(tmp_path)
+
+    result = CliRunner().invoke(cli.main, ["run", str(tmp_path / "**" / "*.jpg"), "--engine", ENGINE])
+
+    assert result.exit_code == 0
+    # depending on the click version, the statistics on stderr are mixed into the output
+    records = [json.loads(line) for line in result.output.splitlines() if line.startswith("{")]
+    assert [r["results"][0]["text"] for r in records] == ["30x40"]
+
+
+def test_resume_skips_completed(tmp_path):
+    make_tree(tmp_path)
+    output = tmp_path / "out.jsonl"
+    runner = CliRunner()
+    runner.invoke(cli.main, ["run", str(tmp_path / "a.png"), "-o", str(output), "--engine", ENGINE])
+
+    result = runner.invoke(cli.main, ["run", str(tmp_path), "-o", str(output), "--resume", "--engine", ENGINE])
+
+    assert "1 skipped" in result.output
+    with open(output) as f:
+        assert len(f.readlines()) == 3
+
+
+def test_parallel_workers(tmp_path):
+    make_tree(tmp_path)
+    output = tmp_path / "out.jsonl"
+
+    result = CliRunner().invoke(cli.main, ["run", str(tmp_path), "-o", str(output), "-j", "2", "--engine", ENGINE])
+
+    assert result.exit_code == 0, result.output
+    assert len(read_records(output)) == 3
+
+
+def test_serve(monkeypatch):
+    from ocrmac.server import OCRServer
+
+    servers = []
+    monkeypatch.setattr(OCRServer, "serve_forever", lambda self: servers.append(self))
+
+    result = CliRunner().invoke(cli.main, ["serve", "--port", "0", "-j", "2", "--engine", ENGINE])
+
+    assert result.exit_code == 0, result.output
+    assert "Serving OCR on http://127.0.0.1:" in result.output
+    assert servers[0].workers == 2
+    servers[0]._httpd.server_close()
+
+
+def test_run_registered_engine(tmp_path):
+    make_tree(tmp_path)
+    os.remove(tmp_path / "broken.png")
+    output = tmp_path / "out.jsonl"
+
+    result = CliRunner().invoke(cli.main, ["run", str(tmp_path), "-o", str(output), "--engine", "stub"])
+
+    assert result.exit_code == 0, result.output
+    records = read_records(output)
+    assert len(records) == 2 and all("results" in record for record in records.values())
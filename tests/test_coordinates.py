@@ -0,0 +1,45 @@
+"""Tests for `ocrmac.coordinates`, these run without the Apple frameworks."""
+import numpy as np
+import pytest
+
+from ocrmac import coordinates
+
+BBOXES = np.random.default_rng(0).uniform(0, 0.5, size=(50, 4))
+
+
+def test_pil_batch_matches_scalar():
+    batch = coordinates.convert_coordinates_pil_batch(BBOXES, 640, 480)
+
+    for bbox, row in zip(BBOXES, batch):
+        assert tuple(row) == coordinates.convert_coordinates_pil(bbox, 640, 480)
+
+
+def test_pyplot_batch_matches_scalar():
+    batch = coordinates.convert_coordinates_pyplot_batch(BBOXES, 640, 480)
+
+    for bbox, row in zip(BBOXES, batch):
+        assert tuple(row) == coordinates.convert_coordinates_pyplot(bbox, 640, 480)
+
+
+def test_pil_to_vision_roundtrip():
+    pixels = coordinates.convert_coordinates_pil_batch(BBOXES, 640, 480)
+
+    assert coordinates.convert_pil_to_vision_batch(pixels, 640, 480) == pytest.approx(BBOXES)
+
+
+def test_flip_y():
+    flipped = coordinates.flip_y_batch([[0.1, 0.2, 0.3, 0.4]])
+
+    assert flipped == pytest.approx(np.array([[0.1, 0.4, 0.3, 0.4]]))
+    assert coordinates.flip_y_batch(flipped) == pytest.approx(np.array([[0.1, 0.2, 0.3, 0.4]]))
+
+
+def test_list_input_matches_array_input():
+    assert np.array_equal(
+        coordinates.convert_coordinates_pil_batch(BBOXES.tolist(), 640, 480),
+        coordinates.convert_coordinates_pil_batch(BBOXES, 640, 480),
+    )
+
+
+def test_empty():
+    assert coordinates.convert_coordinates_pil_batch([], 10, 10).shape == (0, 4)
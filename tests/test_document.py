@@ -0,0 +1,55 @@
+"""Tests for `ocrmac.document`, using a multi-frame TIFF and a stand-in engine."""
+import functools
+
+import pytest
+from PIL import Image
+
+from ocrmac import document
+
+
+class SizeEngine:
+    """Returns the size of the page as text."""
+
+    def recognize(self, image):
+        return [(f"{image.width}x{image.height}", 1.0, [0.0, 0.0, 1.0, 1.0])]
+
+
+@pytest.fixture
+def tiff_path(tmp_path):
+    path = tmp_path / "pages.tiff"
+    frames = [Image.new("L", (100 + i, 50 + i), 255) for i in range(5)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+    return path
+
+
+def test_iter_pages(tiff_path):
+    pages = list(document.iter_pages(tiff_path))
+
+    assert [page.size for page in pages] == [(100 + i, 50 + i) for i in range(5)]
+
+
+def test_iter_pages_single_image(tmp_path):
+    path = tmp_path / "page.png"
+    Image.new("RGB", (20, 10)).save(path)
+
+    assert [page.size for page in document.iter_pages(path)] == [(20, 10)]
+
+
+def test_ocr_document_is_lazy(tiff_path):
+    results = document.ocr_document(tiff_path, engine=SizeEngine())
+
+    assert next(results) == (0, [("100x50", 1.0, [0.0, 0.0, 1.0, 1.0])])
+    assert [index for index, _ in results] == [1, 2, 3, 4]
+
+
+def test_ocr_document_workers(tiff_path):
+    results = list(document.ocr_document(tiff_path, workers=2, max_in_flight=2, engine_factory=SizeEngine))
+
+    assert [index for index, _ in results] == list(range(5))
+    assert [res[0][0] for _, res in results] == [f"{100 + i}x{50 + i}" for i in range(5)]
+
+
+def test_ocr_document_engine_factory(tiff_path):
+    results = dict(document.ocr_document(tiff_path, engine_factory=functools.partial(SizeEngine)))
+
+    assert results[4][0][0] == "104x54"
@@ -0,0 +1,98 @@
+"""Tests for `ocrmac.engines`, the engine registry and the stub engine."""
+import threading
+
+import pytest
+from PIL import Image
+
+from ocrmac import engines, ocrmac, parallel
+from ocrmac.cache import ResultCache
+
+IMAGE = Image.new("RGB", (640, 480), "white")
+
+
+class SizeEngine:
+    def __init__(self, detail=True):
+        self.detail = detail
+
+    def recognize(self, image):
+        return [f"{image.width}x{image.height}"]
+
+
+@pytest.fixture
+def size_engine():
+    engines.register_engine("size", SizeEngine, ["detail"])
+    yield "size"
+    engines.unregister_engine("size")
+
+
+def test_builtin_engines():
+    assert {"vision", "livetext", "stub"} <= set(engines.engine_names())
+    assert engines.supports("vision", "regions")
+    assert not engines.supports("livetext", "regions")
+
+    with pytest.raises(ValueError, match="Framework must be one of"):
+        engines.get_spec("tesseract")
+
+
+def test_check_options():
+    options = engines.check_options("livetext", recognition_level="accurate", confidence_threshold=0.0, detail=False, unit="line")
+
+    assert options == dict(detail=False, unit="line")
+    with pytest.raises(ValueError, match="Recognition level is not supported for Livetext framework"):
+        engines.check_options("livetext", recognition_level="fast")
+    with pytest.raises(ValueError, match="Invalid unit"):
+        engines.check_options("livetext", unit="word")
+    with pytest.raises(ValueError):
+        ocrmac.OCR(IMAGE, framework="livetext", confidence_threshold=0.5)
+
+
+def test_register_engine(size_engine):
+    assert isinstance(engines.create_engine(size_engine), SizeEngine)
+    assert ocrmac.OCR(IMAGE, framework=size_engine).recognize() == ["640x480"]
+    with pytest.raises(ValueError, match="not supported"):
+        ocrmac.OCR(IMAGE, framework=size_engine, recognition_level="fast")
+    with pytest.raises(ValueError, match="already registered"):
+        engines.register_engine(size_engine, SizeEngine)
+    with pytest.raises(ValueError, match="Invalid options"):
+        engines.register_engine("other", SizeEngine, ["colour"])
+
+
+def test_shared_engine_per_thread():
+    engine = engines.shared_engine("stub", detail=True)
+    others = []
+    thread = threading.Thread(target=lambda: others.append(engines.shared_engine("stub", detail=True)))
+    thread.start()
+    thread.join()
+
+    assert engines.shared_engine("stub", detail=True) is engine
+    assert engines.shared_engine("stub", detail=False) is not engine
+    assert others[0] is not engine
+
+
+def test_stub_engine_is_deterministic():
+    engine = engines.StubEngine()
+    results = engine.recognize(IMAGE)
+
+    assert results == engines.StubEngine().recognize(IMAGE.copy())
+    assert results != engine.recognize(Image.new("RGB", (640, 480), "black"))
+    assert len(results) > 10
+    assert all(0 <= x and x + w <= 1 and 0 <= y and y + h <= 1 for _, _, (x, y, w, h) in results)
+
+    lines = engines.StubEngine(unit="line").recognize(IMAGE)
+    assert 0 < len(lines) < len(results)
+    assert engines.StubEngine(detail=False).recognize(IMAGE) == [text for text, _, _ in results]
+    assert all(confidence >= 0.5 for _, confidence, _ in engines.StubEngine(confidence_threshold=0.5).recognize(IMAGE))
+
+
+def test_stub_framework_end_to_end():
+    cache = ResultCache()
+
+    results = ocrmac.OCR(IMAGE, framework="stub", cache=cache).recognize()
+
+    assert results == engines.StubEngine().recognize(IMAGE)
+    assert ocrmac.OCR(IMAGE, framework="stub", cache=cache).recognize() == results
+    assert cache.cache_info().hits == 1
+    assert list(ocrmac.OCR.recognize_batch([IMAGE, IMAGE], framework="stub")) == [results, results]
+
+    parallel_results = dict(parallel.parallel_recognize([IMAGE, IMAGE], workers=2, framework="stub"))
+    assert parallel_results == {0: results, 1: results}
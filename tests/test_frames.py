@@ -0,0 +1,115 @@
+"""Tests for `ocrmac.frames`, using synthetic frames and a stand-in engine."""
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from ocrmac import frames
+
+WIDTH, HEIGHT = 320, 160
+
+
+class BlobEngine:
+    """Detects each connected group of dark pixels as one word, its text is the gray value.
+
+    Keeps the sizes of the images it was called with.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def recognize(self, image):
+        self.calls.append(image.size)
+        gray = np.asarray(image.convert("L"))
+        results = []
+        for left, top, right, bottom in frames.block_regions(gray < 128, 1, image.width, image.height):
+            text = str(int(gray[top, left]))
+            bbox = [left / image.width, 1 - bottom / image.height, (right - left) / image.width, (bottom - top) / image.height]
+            results.append((text, 1.0, bbox))
+        return results
+
+
+def frame(words):
+    """White frame with a filled rectangle per (left, top, right, bottom, gray)"""
+    image = Image.new("L", (WIDTH, HEIGHT), 255)
+    draw = ImageDraw.Draw(image)
+    for left, top, right, bottom, gray in words:
+        draw.rectangle((left, top, right - 1, bottom - 1), fill=gray)
+    return image
+
+
+def normalized(results):
+    return sorted((text, tuple(round(value, 6) for value in bbox)) for text, _, bbox in results)
+
+
+def test_changed_blocks():
+    previous = np.zeros((40, 70), dtype=np.uint8)
+    current = previous.copy()
+    current[35, 65] = 255
+    current[0, 0] = 10  # below the tolerance
+
+    mask = frames.changed_blocks(previous, current, block_size=16)
+
+    assert mask.shape == (3, 5)
+    assert mask.sum() == 1 and mask[2, 4]
+    with pytest.raises(ValueError):
+        frames.changed_blocks(previous, current[:-1])
+
+
+def test_block_regions():
+    mask = np.zeros((4, 6), dtype=bool)
+    mask[0, 0] = mask[1, 1] = True  # diagonal neighbours are connected
+    mask[3, 5] = True
+
+    regions = frames.block_regions(mask, 10, 55, 38)
+
+    assert sorted(regions) == [(0, 0, 20, 20), (50, 30, 55, 38)]
+
+
+def test_ocr_frames_reuses_and_merges():
+    engine = BlobEngine()
+    first = [(10, 10, 60, 30, 0), (200, 100, 280, 120, 40)]
+    changed = [(10, 10, 60, 30, 0), (200, 100, 280, 120, 80)]
+    stream = [frame(first), frame(first), frame(changed), frame([(0, 0, WIDTH, HEIGHT, 0)])]
+
+    results = [res for _, res in frames.ocr_frames(stream, engine=engine)]
+
+    assert engine.calls[0] == (WIDTH, HEIGHT)
+    assert len(engine.calls) == 3  # the identical second frame is not recognized
+    assert results[1] == results[0]
+    # only the changed word is recognized again, as a crop
+    assert engine.calls[1][0] < WIDTH and engine.calls[1][1] < HEIGHT
+    assert normalized(results[2]) == normalized(BlobEngine().recognize(stream[2]))
+    assert engine.calls[2] == (WIDTH, HEIGHT)  # most blocks changed
+    assert [text for text, _, _ in results[3]] == ["0"]
+
+
+def test_regions_grow_over_cut_words():
+    engine = BlobEngine()
+    incremental = frames.IncrementalOCR(engine.recognize, block_size=16, margin=0)
+    wide = (10, 10, 300, 30, 0)
+
+    incremental.update(frame([wide]))
+    # a new word touches the right end of the wide word
+    results = incremental.update(frame([wide, (290, 30, 310, 40, 60)]))
+
+    assert normalized(results) == normalized(BlobEngine().recognize(frame([wide, (290, 30, 310, 40, 60)])))
+    assert incremental.stats == dict(skipped=0, partial=1, full=1)
+
+
+def test_slow_drift_is_detected():
+    engine = BlobEngine()
+    incremental = frames.IncrementalOCR(engine.recognize, tolerance=24)
+
+    incremental.update(frame([(10, 10, 60, 30, 100)]))
+    for gray in (90, 80, 70):  # each step is below the tolerance, the sum is not
+        results = incremental.update(frame([(10, 10, 60, 30, gray)]))
+
+    assert incremental.stats == dict(skipped=2, partial=1, full=1)
+    assert [text for text, _, _ in results] == ["70"]
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        frames.IncrementalOCR(BlobEngine().recognize, block_size=0)
+    with pytest.raises(ValueError):
+        frames.IncrementalOCR(BlobEngine().recognize, max_changed=2)
@@ -0,0 +1,67 @@
+"""Tests for the image input handling, these run without the Apple frameworks."""
+import io
+import os
+import pathlib
+
+import pytest
+from PIL import Image
+
+from ocrmac import images
+
+THIS_FOLDER = os.path.dirname(os.path.abspath(__file__))
+TEST_IMAGE = os.path.join(THIS_FOLDER, "test.png")
+
+
+def test_path_is_passed_through_unchanged():
+    with open(TEST_IMAGE, "rb") as f:
+        assert images.image2buf(TEST_IMAGE) == f.read()
+
+
+def test_bytes_are_passed_through_unchanged():
+    data = b"\x89PNG not really"
+    assert images.image2buf(data) is data
+
+
+@pytest.mark.parametrize("mode,fmt", [("RGB", "BMP"), ("RGBA", "TIFF"), ("L", "BMP"), ("I;16", "TIFF")])
+def test_raw_bitmap_is_lossless(mode, fmt):
+    image = Image.new(mode, (17, 9))
+    image.putpixel((3, 4), 200)
+
+    decoded = Image.open(io.BytesIO(images.image2buf(image)))
+
+    assert decoded.format == fmt
+    assert decoded.size == image.size
+    assert decoded.getpixel((3, 4)) == image.getpixel((3, 4))
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        images.image2buf(42)
+
+
+def test_normalize_inputs():
+    with open(TEST_IMAGE, "rb") as f:
+        data = f.read()
+        f.seek(0)
+        assert images.normalize_image(f) == data
+
+    assert images.normalize_image(pathlib.Path(TEST_IMAGE)) == TEST_IMAGE
+    assert images.normalize_image(bytearray(data)) == data
+
+
+def test_numpy_input():
+    np = pytest.importorskip("numpy")
+    array = np.zeros((9, 17, 3), dtype=np.uint8)
+
+    assert images.image_size(array) == (17, 9)
+    assert images.open_image(array).size == (17, 9)
+
+
+def test_image_size_reads_header_only():
+    with open(TEST_IMAGE, "rb") as f:
+        data = f.read()
+    truncated = data[: len(data) // 2]  # header is intact, pixel data is not
+
+    assert images.image_size(truncated) == Image.open(TEST_IMAGE).size
+    with pytest.raises(OSError):
+        images.open_image(truncated)
@@ -0,0 +1,82 @@
+"""Tests for `ocrmac.instrument`, timing the stages that run without the Apple frameworks."""
+import contextlib
+
+import pytest
+from PIL import Image
+
+from ocrmac import instrument
+from ocrmac.images import image2buf, open_image, pil2buf
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name):
+        self.spans.append(name)
+        yield
+
+
+def test_disabled_by_default():
+    assert instrument.stage("encode") is instrument._DISABLED
+
+
+def test_recording(tmp_path):
+    path = tmp_path / "image.png"
+    Image.new("RGB", (64, 32)).save(path)
+
+    with instrument.recording() as recorder:
+        for _ in range(3):
+            pil2buf(open_image(path))
+        image2buf(str(path))
+
+    summary = recorder.summary()
+    assert summary["encode"]["count"] == 3
+    assert summary["load"]["count"] == 4
+    assert summary["load"]["total"] >= summary["load"]["p99"] >= summary["load"]["p50"] > 0
+    assert not instrument._hooks
+
+
+def test_hook_receives_stage_and_seconds():
+    calls = []
+    hook = lambda stage, seconds: calls.append((stage, seconds))  # noqa: E731
+
+    instrument.add_hook(hook)
+    try:
+        pil2buf(Image.new("L", (8, 8)), raw=True)
+    finally:
+        instrument.remove_hook(hook)
+    pil2buf(Image.new("L", (8, 8)))
+
+    assert [stage for stage, _ in calls] == ["encode"]
+    assert calls[0][1] >= 0
+
+
+def test_tracer_spans():
+    tracer = FakeTracer()
+
+    instrument.set_tracer(tracer)
+    try:
+        pil2buf(Image.new("L", (8, 8)))
+    finally:
+        instrument.set_tracer(None)
+
+    assert tracer.spans == ["ocrmac.encode"]
+    assert instrument.stage("encode") is instrument._DISABLED
+
+
+def test_recorder_percentiles():
+    recorder = instrument.Recorder(max_samples=100)
+    for i in range(1, 201):
+        recorder("perform", i / 1000)
+
+    stats = recorder.summary()["perform"]
+    assert stats["count"] == 200
+    assert stats["total"] == pytest.approx(sum(range(1, 201)) / 1000)
+    # percentiles over the last 100 samples (101 ms to 200 ms)
+    assert stats["p50"] == pytest.approx(0.150)
+    assert stats["p99"] == pytest.approx(0.199)
+
+    recorder.reset()
+    assert recorder.summary() == {}
@@ -3,15 +3,28 @@
 """Tests for `ocrmac` package."""
 from tempfile import TemporaryFile
 from unittest import TestCase
-import os 
+import asyncio
+import contextlib
+import os
+import pathlib
+import subprocess
+from types import SimpleNamespace
+import sys
+import threading
+import time
 from PIL import Image, ImageChops
 import math 
 
+import numpy as np
+
 import pytest
 
 #from click.testing import CliRunner
 
 from ocrmac import ocrmac
+from ocrmac.cache import ResultCache
+from ocrmac.pool import Pool
+from ocrmac.structure import StructuredResult
 #from ocrmac import cli
 
 THIS_FOLDER = os.path.dirname(os.path.abspath(__file__))
@@ -66,6 +79,7 @@ def rms_difference(image1, image2):
     return rms
 
 
+@pytest.mark.skipif(sys.platform != "darwin", reason="Needs the Apple Vision and LiveText frameworks.")
 class Test(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -123,4 +137,363 @@ class Test(TestCase):
         ref_image = Image.open(os.path.join(THIS_FOLDER, "test_output_livetext.png"))
         rms = rms_difference(annotated, ref_image)
 
-        assert rms < RMS_THRESHOLD
\ No newline at end of file
+        assert rms < RMS_THRESHOLD
+
+class StubEngine:
+    """Engine returning one fixed detection per image, counts the calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def recognize(self, image):
+        self.calls += 1
+        return [("stub", 1.0, [0.25, 0.5, 0.5, 0.25])]
+
+
+def test_batch_text_from_images_reuses_engine():
+    engine = StubEngine()
+    images = [Image.new("RGB", (40, 20)) for _ in range(3)]
+
+    results = ocrmac.batch_text_from_images(images, engine=engine)
+    assert engine.calls == 0  # lazy
+
+    results = list(results)
+    assert engine.calls == 3
+    assert results == [[("stub", 1.0, [0.25, 0.5, 0.5, 0.25])]] * 3
+
+
+def test_recognize_batch_px():
+    engine = StubEngine()
+    images = [Image.new("RGB", (40, 20)), Image.new("RGB", (80, 40))]
+
+    results = list(ocrmac.OCR.recognize_batch(images, px=True, engine=engine))
+
+    assert results[0] == [("stub", 1.0, (10.0, 5.0, 30.0, 10.0))]
+    assert results[1] == [("stub", 1.0, (20.0, 10.0, 60.0, 20.0))]
+
+
+def test_recognize_batch_validates_once():
+    with pytest.raises(ValueError):
+        ocrmac.OCR.recognize_batch([], framework="livetext", recognition_level="fast")
+
+
+def test_ocr_does_not_decode_for_px():
+    engine = StubEngine()
+    ocr = ocrmac.OCR(pathlib.Path(THIS_FOLDER, "test.png"), engine=engine)
+
+    res = ocr.recognize(px=True)
+
+    assert ocr._image is None
+    width, height = Image.open(os.path.join(THIS_FOLDER, "test.png")).size
+    assert res == [("stub", 1.0, (width / 4, height / 4, width * 3 / 4, height / 2))]
+
+
+def test_arecognize_with_engine():
+    ocr = ocrmac.OCR(Image.new("RGB", (40, 20)), engine=StubEngine())
+
+    res = asyncio.run(ocr.arecognize(px=True))
+
+    assert res == [("stub", 1.0, (10.0, 5.0, 30.0, 10.0))]
+    assert ocr.res == [("stub", 1.0, [0.25, 0.5, 0.5, 0.25])]
+
+
+def test_ocr_cache():
+    cache = ResultCache()
+    engine = StubEngine()
+    path = os.path.join(THIS_FOLDER, "test.png")
+
+    first = ocrmac.OCR(path, engine=engine, cache=cache).recognize()
+    second = ocrmac.OCR(pathlib.Path(path), engine=engine, cache=cache).recognize()
+
+    assert first == second
+    assert engine.calls == 1
+    assert cache.cache_info().hits == 1
+
+
+def test_ocr_tiled():
+    engine = StubEngine()
+    ocr = ocrmac.OCR(Image.new("RGB", (600, 300)), engine=engine, tile_size=256, overlap=32)
+
+    res = ocr.recognize()
+
+    assert engine.calls == 6
+    assert len(res) == 6
+    assert all(0 <= x and x + w <= 1 and 0 <= y and y + h <= 1 for _, _, (x, y, w, h) in res)
+
+
+def test_recognize_columnar():
+    ocr = ocrmac.OCR(Image.new("RGB", (40, 20)), engine=StubEngine())
+
+    res = ocr.recognize(columnar=True)
+
+    assert res.texts == ["stub"]
+    assert res.to_pixels(40, 20).tolist() == [[10.0, 5.0, 30.0, 10.0]]
+
+
+def test_ocr_preprocess():
+    engine = StubEngine()
+    ocr = ocrmac.OCR(Image.new("RGB", (400, 200)), engine=engine, preprocess={"max_size": 100, "roi": (0.5, 0.0, 0.5, 1.0)})
+
+    res = ocr.recognize(px=True)
+
+    # the stub box covers the middle of the right half, mapped back to the full image
+    assert res == [("stub", 1.0, (250.0, 50.0, 350.0, 100.0))]
+
+
+def test_ocr_regions_crop_fallback():
+    engine = StubEngine()
+    ocr = ocrmac.OCR(Image.new("RGB", (400, 200)), engine=engine, regions=[(0.0, 0.0, 0.5, 0.5), (0.5, 0.5, 0.5, 0.5)])
+
+    res = ocr.recognize(px=True)
+
+    assert engine.calls == 2
+    assert res == [("stub", 1.0, (50.0, 125.0, 150.0, 150.0)), ("stub", 1.0, (250.0, 25.0, 350.0, 50.0))]
+
+
+def test_ocr_regions_invalid():
+    with pytest.raises(ValueError):
+        ocrmac.OCR(Image.new("RGB", (40, 20)), regions=[(0.0, 0.0, 0.5, 0.5)], tile_size=256)
+    with pytest.raises(ValueError):
+        ocrmac.OCR(Image.new("RGB", (40, 20)), regions=[(0.5, 0.0, 0.6, 0.5)])
+
+
+def test_import_is_lazy():
+    """Importing ocrmac must not load the Apple frameworks or matplotlib."""
+    code = "import ocrmac.ocrmac, ocrmac.cli"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(THIS_FOLDER),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # lines look like "import time:   self [us] | cumulative | imported package"
+    imported = {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+    for module in ("Vision", "objc", "AppKit", "CoreFoundation", "Quartz", "matplotlib", "pandas", "pyarrow"):
+        assert module not in imported
+
+
+class FakeAnalyzer:
+    """Stands in for VKCImageAnalyzer, `fake_analyze` reports which one was used."""
+
+    instances = 0
+
+    def __init__(self):
+        FakeAnalyzer.instances += 1
+        self.id = FakeAnalyzer.instances
+
+
+def fake_analyze(analyzer, data, language_preference, detail, unit, timeout):
+    if data == b"slow":
+        return [], False  # timed out
+    if data == b"broken":
+        raise RuntimeError("Error during analysis")
+    return [(f"analyzer{analyzer.id}", 1.0, [0.0, 0.0, 1.0, 1.0])], True
+
+
+@pytest.fixture
+def fake_livetext(monkeypatch):
+    monkeypatch.setattr(ocrmac, "_livetext_available", lambda: True)
+    monkeypatch.setattr(ocrmac, "_analyze", fake_analyze)
+    return Pool(FakeAnalyzer)
+
+
+def test_livetext_engine_reuses_analyzer(fake_livetext):
+    engine = ocrmac.LiveTextEngine(pool=fake_livetext)
+
+    first = engine.recognize(b"image")
+    second = engine.recognize(b"image")
+
+    assert first == second
+    assert fake_livetext.created == 1
+
+
+def test_livetext_engine_drops_failed_analyzers(fake_livetext):
+    engine = ocrmac.LiveTextEngine(pool=fake_livetext)
+
+    with pytest.raises(TimeoutError):
+        engine.recognize(b"slow")
+    with pytest.raises(RuntimeError):
+        engine.recognize(b"broken")
+    engine.recognize(b"image")
+
+    assert fake_livetext.created == 3
+
+
+def test_livetext_timeout_is_not_cached(fake_livetext, monkeypatch, tmp_path):
+    monkeypatch.setattr(ocrmac, "_analyzer_pool", lambda: fake_livetext)
+    cache = ResultCache(path=str(tmp_path / "cache.sqlite"))
+    ocr = ocrmac.OCR(b"slow", framework="livetext", cache=cache)
+
+    with pytest.raises(TimeoutError):
+        ocr.recognize()
+    with pytest.raises(TimeoutError):
+        ocrmac.livetext_from_image(b"slow", cache=cache)
+    assert len(cache) == 0
+
+    # the analyzer recovered
+    monkeypatch.setattr(ocrmac, "_analyze", lambda analyzer, data, *args: fake_analyze(analyzer, b"image", *args))
+    assert ocr.recognize() != []
+    assert len(cache) == 1
+
+
+def test_arecognize_shares_cache_keys(fake_livetext, monkeypatch):
+    calls = []
+
+    async def fake_alivetext(image, *args, **kwargs):
+        calls.append(image)
+        return [("async", 1.0, [0.0, 0.0, 1.0, 1.0])]
+
+    monkeypatch.setattr(ocrmac, "alivetext_from_image", fake_alivetext)
+    monkeypatch.setattr(ocrmac, "_analyzer_pool", lambda: fake_livetext)
+    cache = ResultCache()
+    image = Image.new("RGB", (40, 20), "white")
+    path = os.path.join(THIS_FOLDER, "test.png")
+
+    res = ocrmac.OCR(image, framework="livetext", cache=cache).recognize()
+    assert asyncio.run(ocrmac.OCR(image, framework="livetext", cache=cache).arecognize()) == res
+
+    res = asyncio.run(ocrmac.OCR(path, framework="livetext", cache=cache).arecognize())
+    assert ocrmac.OCR(path, framework="livetext", cache=cache).recognize() == res
+    assert len(calls) == 1 and cache.cache_info().hits == 2
+
+
+def test_livetext_from_image_shares_cache_keys(fake_livetext, monkeypatch):
+    monkeypatch.setattr(ocrmac, "_analyzer_pool", lambda: fake_livetext)
+    cache = ResultCache()
+    image = Image.new("RGB", (40, 20), "white")
+    path = os.path.join(THIS_FOLDER, "test.png")
+
+    res = ocrmac.livetext_from_image(image, cache=cache)
+    assert ocrmac.OCR(image, framework="livetext", cache=cache).recognize() == res
+
+    res = ocrmac.OCR(path, framework="livetext", cache=cache).recognize()
+    assert ocrmac.livetext_from_image(path, cache=cache) == res
+    assert cache.cache_info()[:2] == (2, 2) and len(cache) == 2
+
+
+def test_arecognize_livetext_tiled(fake_livetext, monkeypatch):
+    calls = []
+
+    async def fake_alivetext(image, *args, **kwargs):
+        calls.append(image)
+        return [("whole", 1.0, [0.0, 0.0, 1.0, 1.0])]
+
+    monkeypatch.setattr(ocrmac, "alivetext_from_image", fake_alivetext)
+    monkeypatch.setattr(ocrmac, "_analyzer_pool", lambda: fake_livetext)
+    image = Image.new("RGB", (512, 256), "white")
+    cache = ResultCache()
+
+    res = asyncio.run(ocrmac.OCR(image, framework="livetext", tile_size=256, overlap=32, cache=cache).arecognize())
+
+    assert calls == []
+    assert len(res) > 1 and all(w < 1 for _, _, (_, _, w, _) in res)
+    assert ocrmac.OCR(image, framework="livetext", tile_size=256, overlap=32, cache=cache).recognize() == res
+    assert asyncio.run(ocrmac.OCR(image, framework="livetext").arecognize()) == [("whole", 1.0, [0.0, 0.0, 1.0, 1.0])]
+
+
+class ThreadedAnalyzer:
+    """Calls the completion handler from another thread, like VKCImageAnalyzer may."""
+
+    def __init__(self, error=None):
+        self.error = error
+
+    def processRequest_progressHandler_completionHandler_(self, request, progress, handler):
+        analysis = None if self.error else "analysis"
+        threading.Timer(0.05, handler, (analysis, self.error)).start()
+
+
+@pytest.fixture
+def fake_run_loops(monkeypatch):
+    """Per-thread stand-ins for CFRunLoop, stopping a loop only wakes its own thread."""
+    loops = {}
+
+    def current():
+        return loops.setdefault(threading.get_ident(), threading.Event())
+
+    def run(mode, seconds, return_after_source_handled):
+        loop = current()
+        loop.wait(seconds)
+        loop.clear()
+
+    core_foundation = SimpleNamespace(
+        CFRunLoopGetCurrent=current, CFRunLoopStop=lambda loop: loop.set(), CFRunLoopRunInMode=run, kCFRunLoopDefaultMode="default"
+    )
+    monkeypatch.setitem(sys.modules, "objc", SimpleNamespace(autorelease_pool=contextlib.nullcontext))
+    monkeypatch.setitem(sys.modules, "CoreFoundation", core_foundation)
+    monkeypatch.setattr(ocrmac, "_livetext_request", lambda data, language_preference: "request")
+    monkeypatch.setattr(ocrmac, "_livetext_results", lambda analysis, detail, unit: [(analysis, 1.0, [0.0, 0.0, 1.0, 1.0])])
+
+
+def test_analyze_stops_the_waiting_run_loop(fake_run_loops):
+    start = time.monotonic()
+    results, completed = ocrmac._analyze(ThreadedAnalyzer(), b"data", None, True, "token", 5.0)
+
+    assert completed and results[0][0] == "analysis"
+    assert time.monotonic() - start < 2.5
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="boom"):
+        ocrmac._analyze(ThreadedAnalyzer(error="boom"), b"data", None, True, "token", 5.0)
+    assert time.monotonic() - start < 2.5
+
+
+def test_ocr_livetext_timeout(fake_livetext, monkeypatch):
+    timeouts = []
+
+    def recording_analyze(analyzer, data, language_preference, detail, unit, timeout):
+        timeouts.append(timeout)
+        results = [("text", 1.0, [0.0, 0.0, 1.0, 1.0])]
+        return (StructuredResult.from_results(results) if unit == "structured" else results), True
+
+    monkeypatch.setattr(ocrmac, "_analyze", recording_analyze)
+    monkeypatch.setattr(ocrmac, "_analyzer_pool", lambda: fake_livetext)
+    image = Image.new("RGB", (40, 20))
+
+    ocrmac.OCR(image, framework="livetext", timeout=2.5).recognize()
+    ocrmac.OCR(image, framework="livetext", timeout=3.5).recognize(structured=True)
+    ocrmac.OCR(image, framework="livetext").recognize(structured=True)
+
+    assert timeouts == [2.5, 3.5, 10.0]
+    with pytest.raises(ValueError, match="Timeout is not supported"):
+        ocrmac.OCR(image, timeout=2.5)
+
+
+def test_livetext_engine_validates(fake_livetext):
+    with pytest.raises(ValueError):
+        ocrmac.LiveTextEngine(unit="word", pool=fake_livetext)
+    assert isinstance(ocrmac.create_engine("livetext"), ocrmac.LiveTextEngine)
+
+
+def fake_item(text, x, y, w, h, children=()):
+    """LiveText line or token, boxes with the origin in the top-left corner."""
+    box = SimpleNamespace(origin=SimpleNamespace(x=x, y=y), size=SimpleNamespace(width=w, height=h))
+    return SimpleNamespace(
+        string=lambda: text, quad=lambda: SimpleNamespace(boundingBox=lambda: box), children=lambda: list(children)
+    )
+
+
+def test_livetext_structured_single_pass():
+    line = fake_item("Hello world", 0.1, 0.1, 0.5, 0.1, [fake_item("Hello", 0.1, 0.1, 0.2, 0.1), fake_item("world", 0.4, 0.1, 0.2, 0.1)])
+    analysis = SimpleNamespace(allLines=lambda: [line, fake_item("Bye", 0.1, 0.3, 0.1, 0.1, [fake_item("Bye", 0.1, 0.3, 0.1, 0.1)])])
+
+    structured = ocrmac._livetext_results(analysis, True, "structured")
+    tokens = ocrmac._livetext_results(analysis, True, "token")
+
+    assert structured.lines.texts == ["Hello world", "Bye"]
+    assert structured.line_tokens(0).texts == ["Hello", "world"]
+    # the same tokens as the flat output
+    assert structured.tokens.texts == [text for text, _, _ in tokens]
+    assert structured.tokens.bboxes == pytest.approx(np.array([bbox for _, _, bbox in tokens]))
+    assert structured.lines[0][2] == pytest.approx([0.1, 0.8, 0.5, 0.1])
+
+
+def test_recognize_structured():
+    ocr = ocrmac.OCR(Image.new("RGB", (40, 20)), engine=StubEngine())
+
+    structured = ocr.recognize(structured=True)
+
+    assert structured.lines.texts == ["stub"]
+    with pytest.raises(ValueError):
+        ocr.recognize(px=True, structured=True)
@@ -0,0 +1,129 @@
+"""Tests for `ocrmac.parallel`, using a stand-in engine instead of the Apple frameworks."""
+import functools
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from ocrmac import ocrmac, parallel
+
+
+class EchoEngine:
+    """Returns the input as text, together with the pid and id of the engine."""
+
+    instances = 0
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def recognize(self, image):
+        if image == "fail":
+            raise RuntimeError("could not read image")
+        if self.delay and image == "slow":
+            time.sleep(self.delay)
+        return [(image, 1.0, [os.getpid(), id(self), 0, 0])]
+
+
+class TileEngine:
+    """Reports the pid of the worker and the size of every tile."""
+
+    def recognize(self, image):
+        return [(f"{os.getpid()}:{image.width}x{image.height}", 1.0, [0.25, 0.25, 0.5, 0.5])]
+
+
+class BrokenEngine:
+    def __init__(self):
+        raise ValueError("Invalid recognition level.")
+
+
+def test_ordered_results():
+    images = [f"img{i}" for i in range(20)]
+
+    results = list(parallel.parallel_recognize(images, workers=2, chunksize=3, engine_factory=EchoEngine))
+
+    assert [input_id for input_id, _ in results] == images
+    assert [res[0][0] for _, res in results] == images
+
+
+def test_engine_created_once_per_worker():
+    results = parallel.parallel_recognize([f"img{i}" for i in range(30)], workers=2, engine_factory=EchoEngine)
+
+    engines = {tuple(res[0][2][:2]) for _, res in results}
+    assert 1 <= len(engines) <= 2
+
+
+def test_unordered_yields_fast_results_first():
+    images = [("a", "slow"), ("b", "fast")]
+
+    results = list(
+        parallel.parallel_recognize(images, workers=2, ordered=False, engine_factory=functools.partial(EchoEngine, delay=2.0))
+    )
+
+    assert [input_id for input_id, _ in results] == ["b", "a"]
+
+
+def test_max_in_flight_limits_reading_ahead():
+    consumed = []
+
+    def images():
+        for i in range(100):
+            consumed.append(i)
+            yield f"img{i}"
+
+    results = parallel.parallel_recognize(images(), workers=2, max_in_flight=4, engine_factory=EchoEngine)
+    next(results)
+    assert len(consumed) == 4
+    next(results)
+    assert len(consumed) == 5
+    results.close()
+
+    consumed.clear()
+    results = parallel.parallel_recognize(images(), workers=2, chunksize=2, max_in_flight=4, engine_factory=EchoEngine)
+    for _ in range(2):
+        next(results)
+        assert len(consumed) == 4
+    next(results)
+    assert len(consumed) == 6
+    results.close()
+
+
+def test_errors():
+    images = ["img0", "fail", "img2"]
+
+    with pytest.raises(RuntimeError, match="could not read image"):
+        list(parallel.parallel_recognize(images, workers=1, engine_factory=EchoEngine))
+
+    results = dict(parallel.parallel_recognize(images, workers=1, errors="return", engine_factory=EchoEngine))
+    assert isinstance(results["fail"], RuntimeError)
+    assert results["img2"][0][0] == "img2"
+
+
+def test_engine_error_is_propagated():
+    with pytest.raises(ValueError, match="Invalid recognition level"):
+        list(parallel.parallel_recognize(["img0"], workers=1, engine_factory=BrokenEngine))
+
+
+def test_worker_pool_is_reused():
+    with parallel.WorkerPool(workers=2, engine_factory=EchoEngine) as pool:
+        first = dict(pool.recognize([f"img{i}" for i in range(10)]))
+        second = dict(parallel.parallel_recognize(["img0", "img1"], pool=pool))
+        engines = {tuple(res[0][2][:2]) for res in list(first.values()) + list(second.values())}
+
+        assert second["img0"][0][0] == "img0"
+        assert 1 <= len(engines) <= 2
+        with pytest.raises(ValueError, match="pool"):
+            parallel.parallel_recognize(["img0"], workers=2, pool=pool)
+
+
+def test_tiles_on_worker_pool():
+    image = Image.new("L", (512, 256))
+
+    with parallel.WorkerPool(workers=2, engine_factory=TileEngine) as pool:
+        first = ocrmac.OCR(image, tile_size=256, tile_workers=pool).recognize()
+        second = ocrmac.OCR(image, tile_size=256, tile_workers=pool).recognize()
+
+    assert len(first) == 2
+    assert {text.split(":")[1] for text, _, _ in first} == {"256x256"}
+    # the same two warm workers served both calls
+    assert len({text.split(":")[0] for text, _, _ in first + second}) <= 2
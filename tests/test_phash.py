@@ -0,0 +1,145 @@
+"""Tests for `ocrmac.phash`, the near-duplicate index in front of the OCR."""
+import io
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from ocrmac import ocrmac, phash
+
+
+def page(text="Hello", cursor=False, clock="12:00"):
+    """A synthetic screenshot, optionally with a cursor and a different clock"""
+    image = Image.new("RGB", (400, 300), "white")
+    draw = ImageDraw.Draw(image)
+    for row in range(10):
+        draw.rectangle((20, 20 + row * 25, 20 + (row * 37) % 300 + 60, 32 + row * 25), fill="black")
+    draw.text((20, 280), text, fill="black")
+    draw.text((350, 5), clock, fill="black")
+    if cursor:
+        draw.rectangle((200, 150, 201, 162), fill="black")
+    return image
+
+
+class CountingEngine:
+    def __init__(self):
+        self.calls = 0
+
+    def recognize(self, image):
+        self.calls += 1
+        return [(f"call {self.calls}", 1.0, [0.0, 0.0, 1.0, 1.0])]
+
+
+def test_dhash_near_duplicates():
+    original = phash.dhash(page())
+
+    assert phash.dhash(page()) == original
+    assert phash.hamming(phash.dhash(page(cursor=True)), original) <= 4
+    assert phash.hamming(phash.dhash(page(clock="12:01")), original) <= 4
+    assert phash.hamming(phash.dhash(page().rotate(90)), original) > 10
+    assert phash.dhash(page(), hash_size=16).bit_length() <= 256
+
+
+def test_dhash_bit_count():
+    # 25 bits don't fill whole bytes, the padding must not end up in the hash
+    rng = random.Random(0)
+    hashes = [phash.dhash(Image.effect_noise((60, 50), 64).rotate(rng.randrange(360)), hash_size=5) for _ in range(200)]
+    assert max(value.bit_length() for value in hashes) == 25
+
+    index = phash.MultiIndexHash(25, max_distance=2)
+    for value in hashes:
+        index.add(value, value)
+    assert all(len(table) > 1 for table in index._tables)
+
+
+def test_dhash_inputs(tmp_path):
+    buffer = io.BytesIO()
+    page().save(buffer, format="PNG")
+    path = tmp_path / "page.png"
+    path.write_bytes(buffer.getvalue())
+
+    assert phash.dhash(buffer.getvalue()) == phash.dhash(str(path)) == phash.dhash(page())
+
+
+@pytest.mark.parametrize("structure", [phash.BKTree, lambda: phash.MultiIndexHash(64, max_distance=3)])
+def test_search_matches_brute_force(structure):
+    rng = random.Random(0)
+    hashes = [rng.getrandbits(64) for _ in range(2000)]
+    # near-duplicates of a few hashes
+    hashes += [hashes[i] ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for i in range(100)]
+    tree = structure()
+    for index, value in enumerate(hashes):
+        tree.add(value, index)
+
+    assert len(tree) == len(hashes)
+    for query in hashes[:50] + [rng.getrandbits(64) for _ in range(50)]:
+        expected = sorted(index for index, value in enumerate(hashes) if phash.hamming(query, value) <= 3)
+        assert sorted(index for _, _, index in tree.search(query, 3)) == expected
+
+    assert tree.nearest(hashes[0], 0)[2] == 0
+    assert structure().nearest(0, 3) is None
+
+
+def test_multi_index_hash_max_distance():
+    index = phash.MultiIndexHash(16, max_distance=2)
+    index.add(0b1111, "a")
+
+    assert [value for _, _, value in index.search(0b1100)] == ["a"]
+    assert index.search(0b1000) == []
+    with pytest.raises(ValueError):
+        index.search(0, 3)
+    with pytest.raises(ValueError):
+        phash.MultiIndexHash(16, max_distance=16)
+
+
+def test_index_reuses_near_duplicates():
+    engine = CountingEngine()
+    index = phash.NearDuplicateIndex(max_distance=4)
+
+    first = index.recognize(page(), engine.recognize, key="a", framework="stub")
+    again = index.recognize(page(cursor=True), engine.recognize, key="b", framework="stub")
+    other_options = index.recognize(page(cursor=True), engine.recognize, key="c", framework="other")
+    different = index.recognize(page().rotate(90), engine.recognize, key="d", framework="stub")
+
+    assert engine.calls == 3
+    assert again is first
+    assert other_options != first and different != first
+    assert index.links["b"][0] == "a"
+    assert set(index.links) == {"b"}
+    assert (index.hits, index.misses, len(index)) == (1, 3, 3)
+    assert index.match(page(clock="12:01"), framework="stub").key == "a"
+    assert index.match(page(), framework="missing") is None
+
+
+def test_index_policy_ocr():
+    engine = CountingEngine()
+    index = phash.NearDuplicateIndex(policy="ocr")
+
+    index.recognize(page(), engine.recognize, framework="stub")
+    results = index.recognize(page(cursor=True), engine.recognize, framework="stub")
+
+    assert engine.calls == 2
+    assert results[0][0] == "call 2"
+    assert index.links == {1: (0, index.links[1][1])}
+
+    with pytest.raises(ValueError):
+        phash.NearDuplicateIndex(policy="unknown")
+
+
+def test_ocr_dedupe(tmp_path):
+    engine = CountingEngine()
+    index = phash.NearDuplicateIndex()
+    paths = []
+    for name, image in [("a.png", page()), ("b.png", page(cursor=True)), ("c.png", page().rotate(90))]:
+        image.save(tmp_path / name)
+        paths.append(str(tmp_path / name))
+
+    first = ocrmac.OCR(paths[0], engine=engine, dedupe=index).recognize()
+    assert ocrmac.OCR(paths[1], engine=engine, dedupe=index).recognize() == first
+    assert engine.calls == 1
+    assert index.links[paths[1]][0] == paths[0]
+
+    batch = list(ocrmac.OCR.recognize_batch(paths, engine=engine, dedupe=index))
+    assert batch[:2] == [first, first]
+    assert engine.calls == 2
+    assert list(ocrmac.batch_text_from_images(paths[2:], engine=engine, dedupe=index)) == [batch[2]]
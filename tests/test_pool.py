@@ -0,0 +1,89 @@
+"""Tests for `ocrmac.pool`."""
+import threading
+
+import pytest
+
+from ocrmac.pool import Pool
+
+
+class FakeAnalyzer:
+    instances = 0
+
+    def __init__(self):
+        FakeAnalyzer.instances += 1
+        self.id = FakeAnalyzer.instances
+
+
+def test_reuse_sequential():
+    pool = Pool(FakeAnalyzer)
+
+    with pool.acquire() as first:
+        pass
+    with pool.acquire() as second:
+        pass
+
+    assert first is second
+    assert (pool.created, pool.reused) == (1, 1)
+    assert len(pool) == 1
+
+
+def test_concurrent_users_get_distinct_objects():
+    pool = Pool(FakeAnalyzer, max_idle=2)
+
+    a, b, c = pool.get(), pool.get(), pool.get()
+    assert len({a.id, b.id, c.id}) == 3
+    for obj in (a, b, c):
+        pool.release(obj)
+
+    # at most max_idle are kept
+    assert len(pool) == 2
+
+
+def test_dropped_on_error():
+    pool = Pool(FakeAnalyzer)
+
+    with pytest.raises(TimeoutError):
+        with pool.acquire():
+            raise TimeoutError()
+    pool.release(pool.get(), reuse=False)
+
+    assert len(pool) == 0
+    assert pool.created == 2
+
+
+def test_threads():
+    pool = Pool(FakeAnalyzer, max_idle=4)
+    in_use = set()
+    lock = threading.Lock()
+    clashes = []
+
+    def work():
+        for _ in range(200):
+            with pool.acquire() as analyzer:
+                with lock:
+                    if analyzer.id in in_use:
+                        clashes.append(analyzer.id)
+                    in_use.add(analyzer.id)
+                with lock:
+                    in_use.discard(analyzer.id)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not clashes
+    assert pool.created + pool.reused == 1600
+    assert pool.created <= 8
+
+
+def test_clear():
+    pool = Pool(FakeAnalyzer)
+    pool.release(pool.get())
+
+    pool.clear()
+
+    assert len(pool) == 0
+    with pytest.raises(ValueError):
+        Pool(FakeAnalyzer, max_idle=-1)
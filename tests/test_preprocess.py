@@ -0,0 +1,89 @@
+"""Tests for `ocrmac.preprocess`."""
+import pytest
+from PIL import Image, ImageDraw
+
+from ocrmac.preprocess import Preprocessor, content_box, make_preprocessor
+
+WIDTH, HEIGHT = 800, 400
+WORD = (300, 150, 500, 200)  # left, top, right, bottom
+
+
+def box_engine(image):
+    """Detects the dark pixels of the image as one word."""
+    left, top, right, bottom = image.convert("L").point(lambda p: 255 if p < 128 else 0).getbbox()
+    return [
+        (
+            f"{image.mode} {image.width}x{image.height}",
+            1.0,
+            [left / image.width, 1 - bottom / image.height, (right - left) / image.width, (bottom - top) / image.height],
+        )
+    ]
+
+
+@pytest.fixture
+def image():
+    image = Image.new("RGB", (WIDTH, HEIGHT), "white")
+    ImageDraw.Draw(image).rectangle((WORD[0], WORD[1], WORD[2] - 1, WORD[3] - 1), fill="black")
+    return image
+
+
+def expected_bbox():
+    left, top, right, bottom = WORD
+    return [left / WIDTH, 1 - bottom / HEIGHT, (right - left) / WIDTH, (bottom - top) / HEIGHT]
+
+
+def test_content_box(image):
+    assert content_box(image, padding=0) == WORD
+    assert content_box(image) == (298, 148, 502, 202)
+    assert content_box(Image.new("L", (10, 10), 255)) == (0, 0, 10, 10)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"max_size": 200},
+        {"grayscale": True},
+        {"autocrop": True},
+        {"roi": (0.25, 0.25, 0.5, 0.5)},
+        {"max_size": 100, "grayscale": True, "autocrop": True, "roi": (0.25, 0.25, 0.5, 0.5)},
+    ],
+)
+def test_boxes_refer_to_original(image, options):
+    (_, _, bbox), = Preprocessor(**options).recognize(image, box_engine)
+
+    assert bbox == pytest.approx(expected_bbox(), abs=0.01)
+
+
+def test_processed_image(image):
+    processed, crop = Preprocessor(max_size=100, grayscale=True, autocrop=True)(image)
+
+    assert processed.mode == "L"
+    assert max(processed.size) == 100
+    assert crop == (298, 148, 502, 202)
+
+
+def test_roi_crop(image):
+    processed, crop = Preprocessor(roi=(0.0, 0.5, 0.5, 0.5))(image)
+
+    # the top-left quarter
+    assert crop == (0, 0, 400, 200)
+    assert processed.size == (400, 200)
+
+
+def test_text_only_results(image):
+    res = Preprocessor(autocrop=True).recognize(image, lambda image: ["text"])
+
+    assert res == ["text"]
+
+
+def test_make_preprocessor():
+    preprocess = Preprocessor(grayscale=True)
+
+    assert make_preprocessor(None) is None
+    assert make_preprocessor(preprocess) is preprocess
+    assert make_preprocessor({"max_size": 10}).max_size == 10
+    with pytest.raises(ValueError):
+        make_preprocessor("grayscale")
+    with pytest.raises(ValueError):
+        Preprocessor(max_size=0)
@@ -0,0 +1,65 @@
+"""Tests for `ocrmac.regions`, the region math and the cropping fallback."""
+import pytest
+from PIL import Image, ImageDraw
+
+from ocrmac import ocrmac, regions
+from ocrmac.preprocess import Preprocessor
+
+WIDTH, HEIGHT = 400, 200
+
+
+def dark_box_engine(image):
+    """Detects the dark pixels of the image as one word, nothing if there are none."""
+    box = image.convert("L").point(lambda p: 255 if p < 128 else 0).getbbox()
+    if box is None:
+        return []
+    left, top, right, bottom = box
+    return [("word", 1.0, [left / image.width, 1 - bottom / image.height, (right - left) / image.width, (bottom - top) / image.height])]
+
+
+def test_remap_to_region():
+    # the center quarter of the top-right region
+    bbox = regions.remap_to_region([0.25, 0.25, 0.5, 0.5], (0.5, 0.5, 0.5, 0.5))
+
+    assert bbox == pytest.approx([0.625, 0.625, 0.25, 0.25])
+
+
+def test_remap_results():
+    results = [("a", 0.5, [0.0, 0.0, 1.0, 1.0]), "b"]
+
+    assert regions.remap_results(results, (0.1, 0.2, 0.3, 0.4)) == [("a", 0.5, pytest.approx([0.1, 0.2, 0.3, 0.4])), "b"]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [[], [(0.5, 0.5, 0.6, 0.1)], [(-0.1, 0, 0.5, 0.5)], [(0, 0, 0, 0.5)]],
+)
+def test_check_regions_invalid(value):
+    with pytest.raises(ValueError):
+        regions.check_regions(value)
+
+
+def test_check_region_options():
+    region = [(0.0, 0.0, 0.5, 0.5)]
+
+    assert regions.check_region_options(None, Preprocessor(autocrop=True), 256) is None
+    assert regions.check_region_options(region, Preprocessor(grayscale=True)) == region
+    with pytest.raises(ValueError, match="tiled"):
+        regions.check_region_options(region, tile_size=256)
+    for preprocess in (Preprocessor(autocrop=True), Preprocessor(roi=(0.0, 0.0, 0.5, 0.5))):
+        with pytest.raises(ValueError, match="cropping preprocess"):
+            regions.check_region_options(region, preprocess)
+        # the function entry point rejects it before the framework is used
+        with pytest.raises(ValueError, match="cropping preprocess"):
+            ocrmac.text_from_image(Image.new("L", (WIDTH, HEIGHT)), preprocess=preprocess, regions=region)
+
+
+def test_recognize_regions():
+    image = Image.new("L", (WIDTH, HEIGHT), 255)
+    ImageDraw.Draw(image).rectangle((300, 20, 339, 39), fill=0)  # in the top-right quarter
+
+    res = regions.recognize_regions(image, dark_box_engine, [(0.0, 0.0, 0.5, 0.5), (0.5, 0.5, 0.5, 0.5)])
+
+    assert len(res) == 1
+    text, _, bbox = res[0]
+    assert bbox == pytest.approx([300 / WIDTH, 1 - 40 / HEIGHT, 40 / WIDTH, 20 / HEIGHT])
@@ -0,0 +1,66 @@
+"""Tests for `ocrmac.result`, these run without the Apple frameworks."""
+import numpy as np
+import pytest
+
+from ocrmac.result import OCRResult
+
+RESULTS = [
+    ("GitHub", 0.5, [0.1, 0.8, 0.2, 0.05]),
+    ("Sign up", 1.0, [0.5, 0.5, 0.25, 0.1]),
+    ("Email", 0.3, [0.6, 0.1, 0.1, 0.05]),
+]
+
+
+def test_tuple_iteration():
+    result = OCRResult.from_list(RESULTS)
+
+    assert len(result) == 3
+    assert result.bboxes.dtype == np.float32
+    for (text, conf, bbox), (ref_text, ref_conf, ref_bbox) in zip(result, RESULTS):
+        assert text == ref_text
+        assert conf == pytest.approx(ref_conf)
+        assert bbox == pytest.approx(ref_bbox)
+    assert result[1][0] == "Sign up"
+
+
+def test_to_pixels():
+    result = OCRResult.from_list(RESULTS)
+
+    pixels = result.to_pixels(200, 100)
+
+    # same as convert_coordinates_pil: (x * w, (1 - y - h) * h, (x + w) * w, (1 - y) * h)
+    assert pixels[1] == pytest.approx([100, 40, 150, 50])
+    assert pixels.shape == (3, 4)
+
+
+def test_filter():
+    result = OCRResult.from_list(RESULTS)
+
+    assert result.filter(min_confidence=0.5).texts == ["GitHub", "Sign up"]
+    assert result.filter(region=(0.4, 0.0, 0.6, 0.7)).texts == ["Sign up", "Email"]
+    assert len(result.filter(min_confidence=2.0)) == 0
+
+
+def test_detail_false_is_rejected():
+    with pytest.raises(ValueError):
+        OCRResult.from_list(["GitHub"])
+
+
+def test_pandas_export_shares_memory():
+    pytest.importorskip("pandas")
+    result = OCRResult.from_list(RESULTS)
+
+    df = result.to_pandas()
+
+    assert list(df.columns) == ["text", "confidence", "x", "y", "width", "height"]
+    assert np.shares_memory(df["x"].to_numpy(), result.bboxes)
+
+
+def test_arrow_export_shares_memory():
+    pytest.importorskip("pyarrow")
+    result = OCRResult.from_list(RESULTS)
+
+    table = result.to_arrow()
+
+    assert table.column("text").to_pylist() == ["GitHub", "Sign up", "Email"]
+    assert np.shares_memory(table.column("y").chunk(0).to_numpy(), result.bboxes)
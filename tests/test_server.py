@@ -0,0 +1,171 @@
+"""Tests for `ocrmac.server`, using stand-in engines instead of the Apple frameworks."""
+import functools
+import io
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+from PIL import Image
+
+from ocrmac.server import OCRServer
+
+
+class SizeEngine:
+    """Returns the size of the image as text, blocks while `gate` is cleared."""
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.calls = 0
+
+    def recognize(self, image):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        with Image.open(io.BytesIO(image)) as im:
+            return [(f"{im.width}x{im.height}", 1.0, [0.25, 0.5, 0.5, 0.25])]
+
+
+def png(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def post(server, data, query=""):
+    host, port = server.address
+    request = urllib.request.Request(f"http://{host}:{port}/ocr{query}", data=data, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def get(server, path):
+    host, port = server.address
+    with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=10) as response:
+        return response.read().decode()
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_ocr_request():
+    with OCRServer(engine_factory=SizeEngine, port=0, workers=2) as server:
+        status, body = post(server, png(40, 20))
+        status_px, body_px = post(server, png(40, 20), "?px=1")
+
+    assert status == 200
+    assert body == {"results": [{"text": "40x20", "confidence": 1.0, "bbox": [0.25, 0.5, 0.5, 0.25]}]}
+    assert status_px == 200
+    assert body_px["results"][0]["bbox"] == [10.0, 5.0, 30.0, 10.0]
+
+
+def test_invalid_requests():
+    with OCRServer(engine_factory=SizeEngine, port=0) as server:
+        assert post(server, b"not an image")[0] == 400
+        assert post(server, b"")[0] == 400
+        assert "ocrmac_errors_total 1" in get(server, "/metrics")
+        assert get(server, "/health") == "ok"
+
+
+def test_queue_full():
+    gate = threading.Event()
+    server = OCRServer(engine_factory=functools.partial(SizeEngine, gate), port=0, max_batch=1, max_queue=1).start()
+    try:
+        first = server.submit(png(10, 10))
+        wait_for(lambda: server.queue_depth == 0)  # taken by the worker, which is blocked
+        second = server.submit(png(10, 10))
+
+        status, body = post(server, png(10, 10))
+        assert status == 503
+        assert "ocrmac_rejected_total 1" in get(server, "/metrics")
+    finally:
+        gate.set()
+        server.shutdown()
+
+    assert first.done.is_set() and second.done.is_set()
+
+
+def test_micro_batching():
+    gate = threading.Event()
+    server = OCRServer(engine_factory=functools.partial(SizeEngine, gate), port=0, batch_window=0.0).start()
+    try:
+        jobs = [server.submit(png(10, 10))]
+        wait_for(lambda: server.queue_depth == 0)
+        jobs += [server.submit(png(10 + i, 10)) for i in range(1, 4)]
+        wait_for(lambda: server.queue_depth == 3)
+        gate.set()
+        for job in jobs:
+            assert job.done.wait(5)
+    finally:
+        gate.set()
+        server.shutdown()
+
+    metrics = server.metrics()
+    # the three requests queued while the worker was busy are processed as one batch
+    assert "ocrmac_batches_total 2" in metrics
+    assert "ocrmac_batched_total 4" in metrics
+    assert 'ocrmac_request_seconds{quantile="0.99"}' in metrics
+    assert [job.result[0][0] for job in jobs] == ["10x10", "11x10", "12x10", "13x10"]
+
+
+def test_batch_recognizes_identical_images_once():
+    gate = threading.Event()
+    engine = SizeEngine(gate)
+    server = OCRServer(engine_factory=lambda: engine, port=0, batch_window=0.0).start()
+    try:
+        jobs = [server.submit(png(10, 10))]
+        wait_for(lambda: server.queue_depth == 0)
+        jobs += [server.submit(png(20, 10)), server.submit(png(20, 10), px=True), server.submit(png(30, 10))]
+        wait_for(lambda: server.queue_depth == 3)
+        gate.set()
+        for job in jobs:
+            assert job.done.wait(5)
+    finally:
+        gate.set()
+        server.shutdown()
+
+    assert engine.calls == 3
+    assert "ocrmac_deduplicated_total 1" in server.metrics()
+    assert jobs[1].result == [("20x10", 1.0, [0.25, 0.5, 0.5, 0.25])]
+    assert jobs[2].result == [("20x10", 1.0, (5.0, 2.5, 15.0, 5.0))]
+
+
+def test_idle_server_skips_batch_window():
+    with OCRServer(engine_factory=SizeEngine, port=0, batch_window=5.0) as server:
+        start = time.perf_counter()
+        assert post(server, png(10, 10))[0] == 200
+        assert time.perf_counter() - start < 2.5
+
+
+def test_timed_out_requests_are_dropped():
+    gate = threading.Event()
+    engine = SizeEngine(gate)
+    server = OCRServer(engine_factory=lambda: engine, port=0, max_batch=1, timeout=0.2).start()
+    try:
+        server.submit(png(10, 10))
+        wait_for(lambda: server.queue_depth == 0)
+        status, _ = post(server, png(20, 10))
+        assert status == 504
+        gate.set()
+        wait_for(lambda: "ocrmac_dropped_total 1" in server.metrics())
+    finally:
+        gate.set()
+        server.shutdown()
+
+    assert engine.calls == 1
+
+
+def test_options():
+    with pytest.raises(ValueError):
+        OCRServer(engine_factory=SizeEngine, port=0, framework="livetext")
+    with pytest.raises(ValueError):
+        OCRServer(engine_factory=SizeEngine, port=0, workers=0)
@@ -0,0 +1,69 @@
+"""Tests for `ocrmac.structure`."""
+import pytest
+
+from ocrmac.structure import StructuredResult
+
+# Two paragraphs, the first with two lines of two tokens, bottom-left origin
+RESULTS = [
+    ("world", 0.8, [0.30, 0.80, 0.15, 0.05]),
+    ("Hello", 1.0, [0.10, 0.81, 0.15, 0.05]),
+    ("second", 0.9, [0.10, 0.72, 0.20, 0.05]),
+    ("line", 0.7, [0.35, 0.72, 0.10, 0.05]),
+    ("Footer", 0.6, [0.10, 0.20, 0.20, 0.05]),
+]
+
+
+def test_from_results_groups_lines():
+    structured = StructuredResult.from_results(RESULTS)
+
+    assert structured.lines.texts == ["Hello world", "second line", "Footer"]
+    assert structured.line_offsets.tolist() == [0, 2, 4, 5]
+    assert structured.line_tokens(1).texts == ["second", "line"]
+    assert structured.token_lines().tolist() == [0, 0, 1, 1, 2]
+    assert structured.lines.confidences.tolist() == pytest.approx([0.9, 0.8, 0.6])
+    assert structured.lines[0][2] == pytest.approx([0.10, 0.80, 0.35, 0.06])
+    assert structured.text == "Hello world\nsecond line\nFooter"
+
+
+def test_paragraphs():
+    structured = StructuredResult.from_results(RESULTS)
+
+    paragraphs = structured.paragraphs()
+
+    assert structured.paragraph_offsets().tolist() == [0, 2, 3]
+    assert paragraphs.texts == ["Hello world\nsecond line", "Footer"]
+    assert paragraphs[0][2] == pytest.approx([0.10, 0.72, 0.35, 0.14])
+
+
+def test_columns_are_separate_paragraphs():
+    results = [("left", 1.0, [0.05, 0.5, 0.2, 0.05]), ("right", 1.0, [0.6, 0.4, 0.2, 0.05])]
+
+    assert StructuredResult.from_results(results).paragraphs().texts == ["left", "right"]
+
+
+def test_from_lines():
+    structured = StructuredResult.from_lines(
+        [
+            ("a b", 1.0, [0, 0.5, 1, 0.5], [("a", 1.0, [0, 0.5, 0.5, 0.5]), ("b", 1.0, [0.5, 0.5, 0.5, 0.5])]),
+            ("", 1.0, [0, 0, 1, 0.5], []),
+        ]
+    )
+
+    assert len(structured) == 2
+    assert len(structured.line_tokens(1)) == 0
+    assert structured.to_dict()["paragraphs"][0]["lines"][0]["tokens"][1]["text"] == "b"
+
+
+def test_empty():
+    structured = StructuredResult.from_results([])
+
+    assert len(structured) == 0
+    assert structured.paragraphs().texts == []
+    assert structured.to_dict() == {"paragraphs": []}
+
+
+def test_invalid_offsets():
+    structured = StructuredResult.from_results(RESULTS)
+
+    with pytest.raises(ValueError):
+        StructuredResult(structured.tokens, structured.lines, [0, 5])
@@ -0,0 +1,86 @@
+"""Tests for `ocrmac.tiling`, using synthetic detections."""
+import pytest
+from PIL import Image, ImageDraw
+
+from ocrmac import tiling
+
+WIDTH, HEIGHT = 1000, 600
+# Pixel boxes (left, top, right, bottom) of the synthetic words, keyed by their gray value
+WORDS = {
+    10: (5, 5, 60, 25),
+    20: (230, 100, 290, 120),  # crosses the first vertical tile edge
+    30: (500, 230, 560, 280),  # crosses the first horizontal tile edge
+    40: (900, 560, 995, 590),
+    50: (420, 400, 470, 420),
+}
+
+
+def synthetic_engine(crop):
+    """Detects every gray value as a word, including words clipped at the crop edge."""
+    results = []
+    for value in sorted(value for _, value in crop.getcolors() if value):
+        left, top, right, bottom = crop.point(lambda p, v=value: 255 if p == v else 0).getbbox()
+        x, w = left / crop.width, (right - left) / crop.width
+        y, h = 1 - bottom / crop.height, (bottom - top) / crop.height
+        results.append((f"word{value}", 1.0, [x, y, w, h]))
+    return results
+
+
+def vision_bbox(box):
+    left, top, right, bottom = box
+    return [left / WIDTH, 1 - bottom / HEIGHT, (right - left) / WIDTH, (bottom - top) / HEIGHT]
+
+
+@pytest.fixture
+def image():
+    image = Image.new("L", (WIDTH, HEIGHT))
+    draw = ImageDraw.Draw(image)
+    for value, (left, top, right, bottom) in WORDS.items():
+        draw.rectangle((left, top, right - 1, bottom - 1), fill=value)
+    return image
+
+
+def test_tile_grid_covers_image():
+    tiles = tiling.tile_grid(WIDTH, HEIGHT, 256, overlap=64)
+
+    assert tiles[0] == (0, 0, 256, 256)
+    assert max(t[2] for t in tiles) == WIDTH
+    assert max(t[3] for t in tiles) == HEIGHT
+    assert all(t[2] - t[0] == 256 and t[3] - t[1] == 256 for t in tiles)
+    assert tiling.tile_grid(100, 50, 256) == [(0, 0, 100, 50)]
+
+
+def test_remap_bbox():
+    crop = (200, 100, 400, 300)
+    # the bottom-left quarter of the crop
+    bbox = tiling.remap_bbox([0, 0, 0.5, 0.5], crop, 1000, 500)
+
+    assert bbox == pytest.approx([0.2, 0.4, 0.1, 0.2])
+
+
+def test_merge_detections():
+    detections = [
+        ("line", 0.9, [0.1, 0.5, 0.4, 0.05]),
+        ("li", 0.9, [0.1, 0.5, 0.1, 0.05]),  # clipped copy at a tile edge
+        ("line", 0.8, [0.1, 0.5, 0.4, 0.05]),
+        ("other", 0.9, [0.1, 0.3, 0.4, 0.05]),
+    ]
+
+    merged = tiling.merge_detections(detections)
+
+    assert merged == [detections[0], detections[3]]
+
+
+def test_recognize_tiled(image):
+    results = tiling.recognize_tiled(image, synthetic_engine, 256, overlap=64)
+
+    assert sorted(text for text, _, _ in results) == [f"word{v}" for v in sorted(WORDS)]
+    for text, _, bbox in results:
+        assert bbox == pytest.approx(vision_bbox(WORDS[int(text[4:])]))
+
+
+def test_region_to_crop():
+    assert tiling.region_to_crop((0.2, 0.4, 0.1, 0.2), 1000, 500) == (200, 200, 300, 300)
+    assert tiling.region_to_crop((0.9, 0.0, 0.5, 1.5), 100, 100) == (90, 0, 100, 100)
+    with pytest.raises(ValueError):
+        tiling.region_to_crop((0, 0, 0, 1), 100, 100)